@@ -0,0 +1,170 @@
+"""
+Codec micro-benchmark: messages/s for the protocol encode/decode functions,
+before (format-string struct calls + slicing, as the codecs were first written)
+and after (precompiled Structs, unpack_from, FrameBuffer.recv_into).
+
+Run from the repository root:
+    python Benchmarks/codec_bench.py [--n 200000]
+"""
+
+import argparse
+import os
+import socket
+import struct
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "Server"), os.path.join(ROOT, "Client")]
+
+from Formats.codec import FrameBuffer, PAYLOAD_SERVER_LEN
+from Formats.packet_formats import MAGIC_COOKIE, PAYLOAD_TYPE, REQUEST_TYPE, HIT, STAND, ROUND_ONGOING
+import protocolServer
+import protocolClient
+
+
+# =====================
+# "Before": the original codecs
+# =====================
+
+def legacy_check_cookie_and_type(data: bytes, expected_type: int):
+    cookie, msg_type = struct.unpack("!IB", data[:5])
+    if cookie != MAGIC_COOKIE:
+        raise ValueError("Invalid magic cookie")
+    if msg_type != expected_type:
+        raise ValueError("Invalid message type")
+
+
+def legacy_decode_request(data: bytes):
+    if len(data) != 38:
+        raise ValueError("Invalid request length")
+    legacy_check_cookie_and_type(data, REQUEST_TYPE)
+    _, _, num_rounds = struct.unpack("!IBB", data[:6])
+    team_name = data[6:38].rstrip(b"\x00").decode("utf-8")
+    return num_rounds, team_name
+
+
+def legacy_decode_payload_decision(data: bytes) -> bytes:
+    if len(data) != 10:
+        raise ValueError("Invalid payload length")
+    legacy_check_cookie_and_type(data, PAYLOAD_TYPE)
+    _, _, decision = struct.unpack("!IB5s", data)
+    if decision not in (HIT, STAND):
+        raise ValueError("Invalid player decision")
+    return decision
+
+
+def legacy_encode_payload_server(result: int, rank: int = 0, suit: int = 0) -> bytes:
+    return struct.pack("!IBBHB", MAGIC_COOKIE, PAYLOAD_TYPE, result, rank, suit)
+
+
+def legacy_decode_payload_server(data: bytes):
+    if len(data) != 9:
+        raise ValueError("Invalid payload length")
+    legacy_check_cookie_and_type(data, PAYLOAD_TYPE)
+    _, _, result, rank, suit = struct.unpack("!IBBHB", data)
+    return result, rank, suit
+
+
+def legacy_recv_exact(sock: socket.socket, n: int) -> bytes:
+    chunks = []
+    received = 0
+    while received < n:
+        chunk = sock.recv(n - received)
+        if not chunk:
+            raise ConnectionError("Peer closed the TCP connection.")
+        chunks.append(chunk)
+        received += len(chunk)
+    return b"".join(chunks)
+
+
+# =====================
+# Timing
+# =====================
+
+def rate(fn, n: int) -> float:
+    """
+    Messages/s for n calls of fn (best of 5).
+    """
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        fn(n)
+        best = min(best, time.perf_counter() - t0)
+    return n / best
+
+
+def bench_decode(decode, frame):
+    def run(n):
+        for _ in range(n):
+            decode(frame)
+    return run
+
+
+def bench_encode(encode):
+    def run(n):
+        for _ in range(n):
+            encode(ROUND_ONGOING, 12, 3)
+    return run
+
+
+def bench_recv_legacy(n):
+    a, b = socket.socketpair()
+    frame = protocolServer.encode_payload_server(ROUND_ONGOING, 12, 3)
+    try:
+        for _ in range(n):
+            a.sendall(frame)
+            legacy_decode_payload_server(legacy_recv_exact(b, 9))
+    finally:
+        a.close()
+        b.close()
+
+
+def bench_recv_frames(n):
+    a, b = socket.socketpair()
+    frame = protocolServer.encode_payload_server(ROUND_ONGOING, 12, 3)
+    frames = FrameBuffer()
+    try:
+        for _ in range(n):
+            a.sendall(frame)
+            protocolClient.decode_payload_server(frames.recv_exact(b, PAYLOAD_SERVER_LEN))
+    finally:
+        a.close()
+        b.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Codec micro-benchmark")
+    parser.add_argument("--n", type=int, default=200_000, help="messages per measurement")
+    args = parser.parse_args()
+    n = args.n
+
+    request = protocolClient.encode_request(10, "bench-team")
+    decision = protocolClient.encode_payload_decision(HIT)
+    payload = protocolServer.encode_payload_server(ROUND_ONGOING, 12, 3)
+
+    cases = [
+        ("decode_request",
+         bench_decode(legacy_decode_request, request),
+         bench_decode(protocolServer.decode_request, request)),
+        ("decode_payload_decision",
+         bench_decode(legacy_decode_payload_decision, decision),
+         bench_decode(protocolServer.decode_payload_decision, decision)),
+        ("encode_payload_server",
+         bench_encode(legacy_encode_payload_server),
+         bench_encode(protocolServer.encode_payload_server)),
+        ("decode_payload_server",
+         bench_decode(legacy_decode_payload_server, payload),
+         bench_decode(protocolClient.decode_payload_server, payload)),
+        ("recv+decode 9B payload", bench_recv_legacy, bench_recv_frames),
+    ]
+
+    print(f"{'message':<26}{'before msg/s':>16}{'after msg/s':>16}{'speedup':>10}")
+    for name, before, after in cases:
+        rb = rate(before, n if "recv" not in name else n // 4)
+        ra = rate(after, n if "recv" not in name else n // 4)
+        print(f"{name:<26}{rb:>16,.0f}{ra:>16,.0f}{ra / rb:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+End-to-end benchmark suite.
+
+Four tiers:
+  codec     protocolServer / protocolClient encode + decode, messages/s
+  engine    BlackjackGame rounds/s, Deck / Shoe / Hand operations/s
+  loopback  server accept loop started in-process on 127.0.0.1, scripted
+            clients (Client/loadgen.py) playing full sessions:
+            sessions/s, rounds/s, per-round and per-decision latency
+  memory    the same server (thread engine) and Client/client.py sessions
+            over in-process transports (Formats/transport.py) instead of
+            sockets: rounds/s of the full protocol path without the kernel
+
+Results are written as JSON so runs can be compared. With --baseline the
+run fails (exit 1) if any metric is worse than the stored one by more
+than --tolerance.
+
+Run from the repository root:
+    python Benchmarks/suite.py --out bench.json
+    python Benchmarks/suite.py --baseline bench.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "Server"), os.path.join(ROOT, "Client")]
+
+from Formats.codec import FrameBuffer
+from Formats.packet_formats import HIT, STAND, ROUND_ONGOING
+import protocolServer
+import protocolClient
+from Formats.cards import CARD_COUNT
+from game import BlackjackGame, Deck, Hand, Shoe
+import server
+import eventlog
+import loadgen
+import client
+from strategy import threshold
+
+HIGHER = "higher"  # bigger is better (throughput)
+LOWER = "lower"    # smaller is better (latency)
+
+
+class Results:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name: str, value: float, unit: str, better: str) -> None:
+        self.metrics[name] = {"value": value, "unit": unit, "better": better}
+        print(f"  {name:<36}{value:>16,.3f} {unit}")
+
+
+def per_second(fn, n: int, repeat: int = 5) -> float:
+    """
+    Calls of fn(n) -> operations/s (best of `repeat`).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(n)
+        best = min(best, time.perf_counter() - t0)
+    return n / best
+
+
+# -----------------------------
+# Tier 1: codecs
+# -----------------------------
+def bench_codec(res: Results, n: int) -> None:
+    print("codec")
+    request = protocolClient.encode_request(10, "bench-team")
+    decision = protocolClient.encode_payload_decision(HIT)
+    payload = protocolServer.encode_payload_server(ROUND_ONGOING, 12, 3)
+    frames = FrameBuffer()
+    frames.feed(decision * 100)
+
+    def loop(fn, *args):
+        def run(k):
+            for _ in range(k):
+                fn(*args)
+        return run
+
+    def decode_buffered(k):
+        buf = frames.buf
+        for _ in range(k):
+            protocolServer.decode_payload_decision_from(buf, 0)
+
+    res.add("codec.decode_request", per_second(loop(protocolServer.decode_request, request), n), "msg/s", HIGHER)
+    res.add("codec.decode_payload_decision",
+            per_second(loop(protocolServer.decode_payload_decision, decision), n), "msg/s", HIGHER)
+    res.add("codec.decode_payload_decision_from", per_second(decode_buffered, n), "msg/s", HIGHER)
+    res.add("codec.encode_payload_server",
+            per_second(loop(protocolServer.encode_payload_server, ROUND_ONGOING, 12, 3), n), "msg/s", HIGHER)
+    res.add("codec.decode_payload_server",
+            per_second(loop(protocolClient.decode_payload_server, payload), n), "msg/s", HIGHER)
+    res.add("codec.encode_request", per_second(loop(protocolClient.encode_request, 10, "bench-team"), n),
+            "msg/s", HIGHER)
+    res.add("codec.encode_payload_decision",
+            per_second(loop(protocolClient.encode_payload_decision, STAND), n), "msg/s", HIGHER)
+
+
+# -----------------------------
+# Tier 2: game engine
+# -----------------------------
+def play_rounds(game: BlackjackGame, k: int) -> None:
+    """
+    k rounds of "hit below 17" straight through BlackjackGame.
+    """
+    for _ in range(k):
+        game.start_round()
+        while game.player.get_value() < 17:
+            result, _card = game.player_hit()
+            if result != ROUND_ONGOING:
+                break
+        else:
+            game.player_stand()
+
+
+def bench_engine(res: Results, n: int) -> None:
+    print("engine")
+    rounds = max(1, n // 10)
+
+    res.add("engine.rounds_fresh_deck", per_second(lambda k: play_rounds(BlackjackGame(), k), rounds),
+            "rounds/s", HIGHER)
+    res.add("engine.rounds_6deck_shoe", per_second(lambda k: play_rounds(BlackjackGame(Shoe(6)), k), rounds),
+            "rounds/s", HIGHER)
+
+    def build_decks(k):
+        for _ in range(k):
+            Deck()
+
+    def shoe_draws(k):
+        shoe = Shoe(8, penetration=1.0)
+        left = 0
+        for _ in range(k):
+            if not left:
+                shoe.shuffle()
+                left = len(shoe.cards)
+            shoe.draw_card()
+            left -= 1
+
+    def hand_ops(k):
+        hand = Hand()
+        for i in range(k):
+            if hand.is_bust():
+                hand.clear()
+            hand.add_card(i % CARD_COUNT)
+            hand.get_value()
+
+    res.add("engine.deck_build_shuffle", per_second(build_decks, rounds), "decks/s", HIGHER)
+    res.add("engine.shoe_draw", per_second(shoe_draws, n), "cards/s", HIGHER)
+    res.add("engine.hand_add_value", per_second(hand_ops, n), "ops/s", HIGHER)
+
+
+# -----------------------------
+# Tier 3: loopback sessions
+# -----------------------------
+def percentile(values: list, q: float) -> float:
+    return loadgen.percentile(sorted(values), q)
+
+
+def bench_loopback(res: Results, engine: str, connections: int, sessions: int, rounds: int) -> None:
+    print(f"loopback ({engine} engine)")
+    tcp = server.open_listener()
+    tcp.listen()
+    port = tcp.getsockname()[1]
+    eventlog.configure(console=False)  # keep per-client event lines out of the report
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        threading.Thread(target=server.serve, args=(tcp, engine), daemon=True).start()
+        args = argparse.Namespace(connections=connections, sessions=sessions, rounds=rounds,
+                                  strategy="threshold:17", team="suite")
+        stats, elapsed = asyncio.run(loadgen.run(args, "127.0.0.1", port))
+
+    prefix = f"loopback.{engine}"
+    res.add(f"{prefix}.sessions_per_s", stats.sessions / elapsed, "sessions/s", HIGHER)
+    res.add(f"{prefix}.rounds_per_s", stats.rounds / elapsed, "rounds/s", HIGHER)
+    res.add(f"{prefix}.round_p50_ms", 1000 * percentile(stats.round_times, 0.50), "ms", LOWER)
+    res.add(f"{prefix}.round_p99_ms", 1000 * percentile(stats.round_times, 0.99), "ms", LOWER)
+    res.add(f"{prefix}.decision_p50_ms", 1000 * percentile(stats.decision_rtts, 0.50), "ms", LOWER)
+    res.add(f"{prefix}.decision_p99_ms", 1000 * percentile(stats.decision_rtts, 0.99), "ms", LOWER)
+    res.add(f"{prefix}.errors", float(stats.errors), "errors", LOWER)
+
+
+# -----------------------------
+# Tier 4: in-memory sessions
+# -----------------------------
+def bench_memory(res: Results, sessions: int, rounds: int) -> None:
+    print("memory (thread engine)")
+    eventlog.configure(console=False)
+    strategy = threshold(17)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        t0 = time.perf_counter()
+        for _ in range(sessions):
+            conn = server.connect_memory()
+            try:
+                client.send_request(conn, rounds, "suite")
+                client.play_session(conn, rounds, strategy)
+            finally:
+                conn.close()
+        elapsed = time.perf_counter() - t0
+
+    res.add("memory.sessions_per_s", sessions / elapsed, "sessions/s", HIGHER)
+    res.add("memory.rounds_per_s", sessions * rounds / elapsed, "rounds/s", HIGHER)
+
+
+# -----------------------------
+# Baseline comparison
+# -----------------------------
+def regressions(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Metrics worse than baseline by more than `tolerance` (relative).
+    Metrics missing from either side are skipped.
+    """
+    failed = []
+    for name, base in baseline.items():
+        cur = current.get(name)
+        if cur is None:
+            continue
+        b, c = base["value"], cur["value"]
+        if base["better"] == HIGHER:
+            worse = c < b * (1.0 - tolerance)
+        else:
+            # A zero baseline (e.g. errors) must stay zero
+            worse = c > b * (1.0 + tolerance) if b else c > 0
+        if worse:
+            failed.append(f"{name}: {c:,.3f} vs baseline {b:,.3f} {cur['unit']}")
+    return failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Blackjack benchmark suite")
+    parser.add_argument("--tiers", nargs="+", choices=("codec", "engine", "loopback", "memory"),
+                        default=["codec", "engine", "loopback", "memory"])
+    parser.add_argument("--n", type=int, default=200_000, help="operations per micro-benchmark")
+    parser.add_argument("--engines", nargs="+", choices=("thread", "asyncio"), default=["thread", "asyncio"])
+    parser.add_argument("--connections", type=int, default=50, help="loopback: concurrent clients")
+    parser.add_argument("--sessions", type=int, default=2, help="loopback: sessions per client")
+    parser.add_argument("--rounds", type=int, default=100, help="loopback: rounds per session")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="compare against this results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    res = Results()
+    if "codec" in args.tiers:
+        bench_codec(res, args.n)
+    if "engine" in args.tiers:
+        bench_engine(res, args.n)
+    if "loopback" in args.tiers:
+        for engine in args.engines:
+            bench_loopback(res, engine, args.connections, args.sessions, args.rounds)
+    if "memory" in args.tiers:
+        bench_memory(res, args.connections * args.sessions, args.rounds)
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args),
+        },
+        "metrics": res.metrics,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["metrics"]
+        failed = regressions(res.metrics, baseline, args.tolerance)
+        if failed:
+            print(f"REGRESSIONS (> {args.tolerance:.0%}):")
+            for line in failed:
+                print("  " + line)
+            raise SystemExit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
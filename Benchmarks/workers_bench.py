@@ -0,0 +1,114 @@
+"""
+Worker-pool scaling benchmark: rounds/s served by `server.py --workers N`.
+
+For each worker count the server's worker processes are started on a
+loopback port, then client processes play back-to-back 255-round sessions
+with a simple "hit below 17" bot. Throughput should grow with workers
+until the machine runs out of cores (clients included).
+
+Run from the repository root:
+    python Benchmarks/workers_bench.py [--workers 1 2 4] [--clients 8] [--seconds 5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "Server"), os.path.join(ROOT, "Client")]
+
+from Formats.cards import CARD_HARD, CARD_ACE, hand_value
+from Formats.codec import FrameBuffer, PAYLOAD_SERVER_LEN
+from Formats.packet_formats import HIT, STAND, ROUND_ONGOING
+from protocolClient import encode_request, decode_payload_server, encode_payload_decision
+import server
+
+ROUNDS_PER_SESSION = 255
+
+
+def bot_session(port: int) -> int:
+    """
+    One full session on a fresh connection. Returns rounds played.
+    """
+    sock = socket.create_connection(("127.0.0.1", port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    frames = FrameBuffer()
+    hit, stand = encode_payload_decision(HIT), encode_payload_decision(STAND)
+    try:
+        sock.sendall(encode_request(ROUNDS_PER_SESSION, "bench"))
+        for _ in range(ROUNDS_PER_SESSION):
+            cards_seen = hard_total = aces = 0
+            standing = False
+            while True:
+                result, card = decode_payload_server(frames.recv_exact(sock, PAYLOAD_SERVER_LEN))
+                if result != ROUND_ONGOING:
+                    break
+                cards_seen += 1
+                if cards_seen != 3 and not standing:
+                    hard_total += CARD_HARD[card]  # player's cards (skip the dealer up-card)
+                    aces += CARD_ACE[card]
+                if standing or cards_seen < 3:
+                    continue
+                standing = hand_value(hard_total, aces)[0] >= 17
+                sock.sendall(stand if standing else hit)
+    finally:
+        sock.close()
+    return ROUNDS_PER_SESSION
+
+
+def client_main(port: int, seconds: float, out: multiprocessing.Queue) -> None:
+    rounds = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        rounds += bot_session(port)
+    out.put(rounds)
+
+
+def measure(workers: int, clients: int, seconds: float, engine: str) -> float:
+    reuse_port = hasattr(socket, "SO_REUSEPORT")
+    tcp = server.open_listener(reuse_port=reuse_port)
+    if not reuse_port:
+        tcp.listen()
+    port = tcp.getsockname()[1]
+    procs = server.start_workers(tcp, workers, engine, reuse_port, log_options={"console": False})
+    time.sleep(0.5)  # let workers bind + listen
+
+    out = multiprocessing.Queue()
+    t0 = time.perf_counter()
+    cl = [multiprocessing.Process(target=client_main, args=(port, seconds, out)) for _ in range(clients)]
+    for p in cl:
+        p.start()
+    rounds = sum(out.get() for _ in cl)
+    elapsed = time.perf_counter() - t0
+    for p in cl:
+        p.join()
+
+    for p in procs:
+        p.terminate()
+        p.join()
+    tcp.close()
+    return rounds / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker-pool scaling benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8, help="concurrent client processes")
+    parser.add_argument("--seconds", type=float, default=5.0, help="load duration per worker count")
+    parser.add_argument("--engine", choices=("thread", "asyncio"), default="thread")
+    args = parser.parse_args()
+
+    print(f"cores={os.cpu_count()} clients={args.clients} engine={args.engine}")
+    print(f"{'workers':>8}{'rounds/s':>14}{'vs 1 worker':>14}")
+    base = None
+    for w in args.workers:
+        rps = measure(w, args.clients, args.seconds, args.engine)
+        base = base or rps
+        print(f"{w:>8}{rps:>14,.0f}{rps / base:>13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
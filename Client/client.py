@@ -2,16 +2,22 @@
 Blackjack Hackathon Client (UDP offer listener + TCP gameplay)
 
 Flow:
-1) Listen on UDP port 13122 for OFFER packets
-2) Connect to server via TCP
+1) Listen on UDP port 13122 for OFFER packets (in the background, for the
+   whole run: discovery.py keeps a cache of live servers)
+2) Connect to a cached server via TCP (only the first session waits for an offer)
 3) Send REQUEST (rounds + team name)
 4) Play rounds using PAYLOAD messages
-5) Close TCP and go back to step 1 (run forever)
+5) Close TCP and go back to step 2 (run forever)
 """
 
+import argparse
 import socket
 import sys
+import time
+from typing import Optional
 
+from Formats.cards import CARD_RANK, CARD_SUIT, CARD_VALUE, CARD_HARD, CARD_ACE, hand_value
+from Formats.codec import FrameBuffer, PAYLOAD_SERVER_LEN, SUMMARY_LEN
 from Formats.packet_formats import (
     CLIENT_UDP_PORT,
     HIT,
@@ -19,35 +25,18 @@ from Formats.packet_formats import (
     ROUND_ONGOING,
     ROUND_WIN,
 )
+from Formats.transport import Transport
 from protocolClient import (
     ProtocolError,
     decode_offer,
     encode_request,
+    encode_policy_request,
     decode_payload_server,
+    decode_summary,
     encode_payload_decision,
 )
-
-
-# -----------------------------
-# TCP helper: recv exactly N bytes
-# -----------------------------
-
-# read tcp message
-def recv_exact(sock: socket.socket, n: int) -> bytes:
-    """Receive exactly n bytes from a TCP socket, or raise if connection closes."""
-    chunks = []  # if bytes received in pieces, save it in chunks
-    received = 0
-    while received < n:
-        try:
-            chunk = sock.recv(n - received)  # wait for more data, read n-received bytes from received data
-        except socket.timeout as e:
-            raise TimeoutError(f"Timed out while waiting for {n} bytes from server.") from e
-
-        if not chunk:
-            raise ConnectionError("Server closed the TCP connection.")
-        chunks.append(chunk)
-        received += len(chunk)
-    return b"".join(chunks)  # return all data received
+from strategy import STRATEGY_HELP, Strategy, from_spec, hit_table_from_spec
+from discovery import DiscoveryCache, ServerEntry
 
 
 # -----------------------------
@@ -101,7 +90,28 @@ def connect_tcp(server_ip: str, tcp_port: int, timeout_sec: float = 5.0) -> sock
     return tcp_sock
 
 
-def send_request(tcp_sock: socket.socket, num_rounds: int, team_name: str) -> None:
+def connect_cached(discovery: DiscoveryCache) -> tuple[socket.socket, ServerEntry]:
+    """
+    Connect to the best server in the discovery cache (waiting for an offer only
+    if none is known) and record the connect RTT.
+    """
+    server = discovery.pick(timeout=0)
+    if server is None:
+        print("Client started, listening for offer requests...")
+        server = discovery.pick()
+        print(f"Received offer from {server.ip}")
+
+    t0 = time.perf_counter()
+    try:
+        tcp_sock = connect_tcp(server.ip, server.port)
+    except OSError:
+        discovery.forget(server)  # gone or unreachable; next session tries another
+        raise
+    discovery.record_connect(server, time.perf_counter() - t0)
+    return tcp_sock, server
+
+
+def send_request(tcp_sock: Transport, num_rounds: int, team_name: str) -> None:
     """Send REQUEST packet to server."""
     req = encode_request(num_rounds, team_name)
     tcp_sock.sendall(req)  # Send REQUEST message over the established TCP connection
@@ -123,40 +133,79 @@ def prompt_decision() -> bytes:
         print("Please type 'Hit' or 'Stand' (or h/s).")  # if user types invalid input
 
 
-def play_session(tcp_sock: socket.socket, num_rounds: int) -> float:
+def play_session(tcp_sock: Transport, num_rounds: int, strategy: Optional[Strategy] = None) -> float:
     """
-    Play num_rounds rounds on an open TCP socket.
+    Play num_rounds rounds on an open TCP socket (or any other Transport).
+    strategy: decide automatically (e.g. the "auto" basic-strategy table); None = ask the user.
     Returns win_rate (0..1).
     """
     wins = 0
-    gameStarted = 0
-    decision = STAND
-    overall = 0
-
-    # According to our protocol implementation:
-    # Server->Client payload length is 9 bytes: cookie(4) + type(1) + result(1) + rank(2) + suit(1)
-    SERVER_PAYLOAD_LEN = 9
+    frames = FrameBuffer()  # one receive buffer reused for every payload of the session
 
     for r in range(1, num_rounds + 1):
         print(f"\n--- Round {r}/{num_rounds} ---")
+        cards_seen = 0
+        hard_total = 0  # player's hand, Aces counted as 1
+        aces = 0
+        dealer_up = 0
+        standing = False
 
         while True:
-            data = recv_exact(tcp_sock, SERVER_PAYLOAD_LEN)  # client read PAYLOAD TCP message from server
-            result, rank, suit = decode_payload_server(data)
+            # Server->Client payload length is 9 bytes: cookie(4) + type(1) + result(1) + rank(2) + suit(1)
+            data = frames.recv_exact(tcp_sock, PAYLOAD_SERVER_LEN)  # client read PAYLOAD TCP message from server
+            result, card = decode_payload_server(data)
 
-            print(f"Received card: rank={rank}, suit={suit} | result={result}")
-
-            overall += rank
+            print(f"Received card: rank={CARD_RANK[card]}, suit={CARD_SUIT[card]} | result={result}")
 
             if result != ROUND_ONGOING:  # if game ended
                 if result == ROUND_WIN:
                     wins += 1  # if player won, add it to his record
                 break
-            if gameStarted > 0 or decision == HIT:
-                if overall < 21:
-                    decision = prompt_decision()  # ask player to choose HIT or STAND
-                    tcp_sock.sendall(encode_payload_decision(decision))  # send PAYLOAD message with player's decision
-            gameStarted += 1
+
+            # Server deals player, player, dealer up-card. A decision is due after that
+            # and after every Hit card, until we stand (dealer cards need no answer).
+            cards_seen += 1
+            if cards_seen == 3:
+                dealer_up = CARD_VALUE[card]
+            elif not standing:
+                hard_total += CARD_HARD[card]
+                aces += CARD_ACE[card]
+
+            if standing or cards_seen < 3:
+                continue
+            if strategy is None:
+                decision = prompt_decision()  # ask player to choose HIT or STAND
+            else:
+                decision = strategy(*hand_value(hard_total, aces), dealer_up)
+            tcp_sock.sendall(encode_payload_decision(decision))  # send PAYLOAD message with player's decision
+            standing = decision == STAND
+
+    return (wins / num_rounds) if num_rounds > 0 else 0.0
+
+
+def play_policy_session(tcp_sock: Transport, num_rounds: int, summary: bool) -> float:
+    """
+    Receive num_rounds rounds the server plays for us (after a POLICY_REQUEST).
+    Nothing is sent back: with summary one SUMMARY frame per round arrives,
+    otherwise the same card/result frames as an interactive round.
+    Returns win_rate (0..1).
+    """
+    wins = 0
+    frames = FrameBuffer()
+
+    for r in range(1, num_rounds + 1):
+        if summary:
+            result, player_total, dealer_total = decode_summary(frames.recv_exact(tcp_sock, SUMMARY_LEN))
+            print(f"Round {r}/{num_rounds}: player {player_total}, dealer {dealer_total} | result={result}")
+        else:
+            print(f"\n--- Round {r}/{num_rounds} ---")
+            while True:
+                result, card = decode_payload_server(frames.recv_exact(tcp_sock, PAYLOAD_SERVER_LEN))
+                print(f"Received card: rank={CARD_RANK[card]}, suit={CARD_SUIT[card]} | result={result}")
+                if result != ROUND_ONGOING:
+                    break
+        if result == ROUND_WIN:
+            wins += 1
 
     return (wins / num_rounds) if num_rounds > 0 else 0.0
 
@@ -191,18 +240,42 @@ def prompt_team_name() -> str:
 # Main loop (runs forever)
 # -----------------------------
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Blackjack hackathon client")
+    parser.add_argument("--strategy", default=None,
+                        help="play automatically: " + STRATEGY_HELP)
+    parser.add_argument("--offload", choices=("frames", "summary"), default=None,
+                        help="send the --strategy to the server, which plays every round itself "
+                             "and streams back all frames or one summary per round")
+    args = parser.parse_args()
+    try:
+        strategy = from_spec(args.strategy) if args.strategy else None
+    except ValueError as e:
+        parser.error(str(e))
+    hit_table = None
+    if args.offload:
+        if not args.strategy:
+            parser.error("--offload needs a --strategy")
+        try:
+            hit_table = hit_table_from_spec(args.strategy)
+        except ValueError as e:
+            parser.error(str(e))
+
     team_name = prompt_team_name()  # ask player for his team's name
+    discovery = DiscoveryCache().start()  # listens for offers (UDP) from now on
 
     while True:
         try:
             num_rounds = prompt_rounds()  # ask player's for number of rounds
 
-            server_ip, tcp_port, _server_name = listen_for_offer()  # listens for offers (UDP)
-
-            tcp_sock = connect_tcp(server_ip, tcp_port)  # connect to server (TCP)
+            tcp_sock, _server = connect_cached(discovery)  # connect to server (TCP)
             try:
-                send_request(tcp_sock, num_rounds, team_name)  # REQUEST message
-                win_rate = play_session(tcp_sock, num_rounds)  # start game - receive player's win rate
+                if hit_table is None:
+                    send_request(tcp_sock, num_rounds, team_name)  # REQUEST message
+                    win_rate = play_session(tcp_sock, num_rounds, strategy)  # start game - receive player's win rate
+                else:
+                    summary = args.offload == "summary"
+                    tcp_sock.sendall(encode_policy_request(num_rounds, team_name, hit_table, summary))
+                    win_rate = play_policy_session(tcp_sock, num_rounds, summary)
                 print(f"\nFinished playing {num_rounds} rounds, win rate: {win_rate:.2%}")
             finally:
                 tcp_sock.close()  # game ended, close TCP connection
@@ -0,0 +1,145 @@
+"""
+Long-lived server discovery for the client.
+
+A background thread keeps one UDP socket bound on port 13122 for the whole
+client run and records every valid OFFER in a registry of live servers
+(last time seen, measured TCP connect RTT). A session picks a server from
+the registry immediately; only when it is empty does it wait for the next
+broadcast. Servers not heard from for `ttl` seconds expire.
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from typing import Optional
+
+from Formats.packet_formats import CLIENT_UDP_PORT
+from protocolClient import ProtocolError, decode_offer
+
+# Servers broadcast once per second; a few missed offers means it's gone
+DEFAULT_TTL = 3.5
+RTT_SMOOTHING = 0.3  # weight of a new connect RTT sample (exponential moving average)
+
+
+class ServerEntry:
+    __slots__ = ("ip", "port", "name", "last_seen", "connect_rtt")
+
+    def __init__(self, ip: str, port: int, name: str, last_seen: float):
+        self.ip = ip
+        self.port = port
+        self.name = name
+        self.last_seen = last_seen
+        self.connect_rtt: Optional[float] = None  # seconds, None until we've connected once
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.ip, self.port
+
+
+class DiscoveryCache:
+    def __init__(self, ttl: float = DEFAULT_TTL, udp_port: int = CLIENT_UDP_PORT):
+        self.ttl = ttl
+        self.udp_port = udp_port
+        self._servers: dict[tuple[str, int], ServerEntry] = {}
+        self._changed = threading.Condition()  # guards _servers; notified on every offer
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -----------------------------
+    # Background listener
+    # -----------------------------
+    def start(self) -> "DiscoveryCache":
+        udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # create UDP socket with IPv4 protocol
+        udp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # allow 2 clients to same port
+        udp_sock.bind(("", self.udp_port))
+        udp_sock.settimeout(0.5)  # wake up now and then to notice stop()
+
+        self._thread = threading.Thread(target=self._listen, args=(udp_sock,), name="discovery", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _listen(self, udp_sock: socket.socket) -> None:
+        try:
+            while not self._stop.is_set():
+                try:
+                    data, addr = udp_sock.recvfrom(1024)  # addr = (ip, port)
+                    tcp_port, server_name = decode_offer(data)
+                except socket.timeout:
+                    continue
+                except ProtocolError:
+                    continue  # not a valid offer -> ignore
+                self.offer(addr[0], tcp_port, server_name)
+        finally:
+            udp_sock.close()
+
+    def offer(self, ip: str, port: int, name: str) -> None:
+        """
+        Record an OFFER (called by the listener thread).
+        """
+        now = time.monotonic()
+        with self._changed:
+            entry = self._servers.get((ip, port))
+            if entry is None:
+                self._servers[ip, port] = ServerEntry(ip, port, name, now)
+            else:
+                entry.name = name
+                entry.last_seen = now
+            self._changed.notify_all()
+
+    # -----------------------------
+    # Registry
+    # -----------------------------
+    def _expire(self, now: float) -> None:
+        stale = [key for key, e in self._servers.items() if now - e.last_seen > self.ttl]
+        for key in stale:
+            del self._servers[key]
+
+    def servers(self) -> list[ServerEntry]:
+        """
+        Live servers, most recently seen first.
+        """
+        with self._changed:
+            self._expire(time.monotonic())
+            return sorted(self._servers.values(), key=lambda e: e.last_seen, reverse=True)
+
+    def pick(self, timeout: Optional[float] = None) -> Optional[ServerEntry]:
+        """
+        Best live server right away if there is one, else wait for an offer
+        (up to `timeout` seconds, None = forever). Servers never connected to
+        come first (to get an RTT for them), then the lowest connect RTT.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if self._servers:
+                    return min(
+                        self._servers.values(),
+                        key=lambda e: (e.connect_rtt is not None, e.connect_rtt or 0.0, now - e.last_seen),
+                    )
+                if deadline is not None and now >= deadline:
+                    return None
+                self._changed.wait(None if deadline is None else deadline - now)
+
+    def record_connect(self, entry: ServerEntry, rtt: float) -> None:
+        with self._changed:
+            if entry.connect_rtt is None:
+                entry.connect_rtt = rtt
+            else:
+                entry.connect_rtt += RTT_SMOOTHING * (rtt - entry.connect_rtt)
+
+    def forget(self, entry: ServerEntry) -> None:
+        """
+        Drop a server we couldn't connect to; it comes back with its next offer.
+        """
+        with self._changed:
+            if self._servers.get(entry.address) is entry:
+                del self._servers[entry.address]
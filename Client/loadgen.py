@@ -0,0 +1,300 @@
+"""
+Headless load generator for the Blackjack server.
+
+Opens many concurrent TCP connections on one asyncio event loop. Each one
+plays back-to-back sessions with the same message flow as
+client.play_session (REQUEST, then per round: 3 reveal payloads,
+decisions until Stand / bust, dealer cards, final result), with an
+automatic strategy from strategy.py instead of prompts.
+
+Reports rounds/s, TCP connection setup time, per-round time, and
+p50/p95/p99 per-decision round-trip latency (decision sent -> next
+payload received).
+
+With --mux K every connection instead carries K concurrent sessions as
+MUX envelopes (session ids 0..K-1), each playing --sessions sessions.
+
+Usage (from the repository root):
+    python Client/loadgen.py --port 5555 --connections 1000 --sessions 2 --rounds 255
+    python Client/loadgen.py --port 5555 --connections 10 --mux 100 --rounds 255
+    python Client/loadgen.py --discover ...   # take server IP/port from the first OFFER
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import time
+
+from Formats.cards import CARD_VALUE, CARD_HARD, CARD_ACE, hand_value
+from Formats.codec import ProtocolError, PAYLOAD_SERVER_LEN, MUX_HEADER_LEN, encode_mux, decode_mux_header_from
+from Formats.packet_formats import HIT, STAND, ROUND_ONGOING, ROUND_WIN, ROUND_TIE
+from client import listen_for_offer
+from protocolClient import (
+    encode_request,
+    decode_payload_server,
+    encode_payload_decision,
+)
+from strategy import STRATEGY_HELP, Strategy, from_spec
+
+# Decision frames never change; encode them once
+DECISION_FRAMES = {HIT: encode_payload_decision(HIT), STAND: encode_payload_decision(STAND)}
+
+
+class Stats:
+    def __init__(self):
+        self.rounds = 0
+        self.sessions = 0
+        self.errors = 0
+        self.results = {ROUND_WIN: 0, ROUND_TIE: 0}
+        self.connect_times = []   # seconds per TCP connect
+        self.decision_rtts = []   # seconds per decision round trip
+        self.round_times = []     # seconds per round (previous result -> this result)
+
+
+# -----------------------------
+# One bot session
+# -----------------------------
+async def play_session(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    num_rounds: int,
+    strategy: Strategy,
+    stats: Stats,
+) -> None:
+    """
+    Same flow as client.play_session, answered by `strategy`.
+    """
+    rtts = stats.decision_rtts
+    clock = time.perf_counter
+    round_start = clock()
+
+    for _ in range(num_rounds):
+        cards_seen = 0
+        hard_total = 0
+        aces = 0
+        dealer_up = 0
+        standing = False
+        sent_at = 0.0
+
+        while True:
+            data = await reader.readexactly(PAYLOAD_SERVER_LEN)
+            if sent_at:
+                rtts.append(clock() - sent_at)
+                sent_at = 0.0
+            result, card = decode_payload_server(data)
+
+            if result != ROUND_ONGOING:
+                if result in stats.results:
+                    stats.results[result] += 1
+                break
+
+            cards_seen += 1
+            if cards_seen == 3:
+                dealer_up = CARD_VALUE[card]
+            elif not standing:
+                hard_total += CARD_HARD[card]
+                aces += CARD_ACE[card]
+
+            if standing or cards_seen < 3:
+                continue
+            decision = strategy(*hand_value(hard_total, aces), dealer_up)
+            writer.write(DECISION_FRAMES[decision])
+            sent_at = clock()
+            standing = decision == STAND
+
+        stats.rounds += 1
+        now = clock()
+        stats.round_times.append(now - round_start)
+        round_start = now
+
+
+async def connection_worker(host: str, port: int, sessions: int, num_rounds: int,
+                            strategy: Strategy, stats: Stats, team_name: str) -> None:
+    for _ in range(sessions):
+        t0 = time.perf_counter()
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            stats.errors += 1
+            continue
+        stats.connect_times.append(time.perf_counter() - t0)
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        try:
+            writer.write(encode_request(num_rounds, team_name))
+            await play_session(reader, writer, num_rounds, strategy, stats)
+            stats.sessions += 1
+        except (OSError, asyncio.IncompleteReadError, ConnectionError, ProtocolError):
+            stats.errors += 1
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+# -----------------------------
+# Multiplexed connections
+# -----------------------------
+class MuxChannel:
+    """
+    One session id on a multiplexed connection, shaped like a stream pair for
+    play_session: `reader` is fed the session's frames by demux(), write()
+    wraps outgoing frames in an envelope.
+    """
+
+    def __init__(self, session_id: int, writer: asyncio.StreamWriter):
+        self.session_id = session_id
+        self.reader = asyncio.StreamReader()
+        self._writer = writer
+
+    def write(self, data: bytes) -> None:
+        self._writer.write(encode_mux(self.session_id, data))
+
+
+async def demux(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, channels: dict[int, MuxChannel], stats: Stats
+) -> None:
+    """
+    Route every incoming envelope body to its session's channel until EOF.
+    A malformed envelope or unknown session id counts as an error and
+    closes the connection; every channel then sees EOF.
+    """
+    try:
+        while True:
+            header = await reader.readexactly(MUX_HEADER_LEN)
+            session_id, length = decode_mux_header_from(header, 0)
+            ch = channels.get(session_id)
+            if ch is None:
+                raise ProtocolError("Unknown mux session id")
+            ch.reader.feed_data(await reader.readexactly(length))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    except ProtocolError:
+        stats.errors += 1
+        writer.transport.abort()  # the stream can't be resynchronised
+    finally:
+        for ch in channels.values():
+            ch.reader.feed_eof()
+
+
+async def mux_worker(host: str, port: int, mux: int, sessions: int, num_rounds: int,
+                     strategy: Strategy, stats: Stats, team_name: str) -> None:
+    """
+    One connection, `mux` concurrent session slots, `sessions` sessions per slot.
+    """
+    t0 = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats.errors += mux * sessions
+        return
+    stats.connect_times.append(time.perf_counter() - t0)
+    writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    channels = {i: MuxChannel(i, writer) for i in range(mux)}
+    router = asyncio.create_task(demux(reader, writer, channels, stats))
+
+    async def slot(ch: MuxChannel) -> None:
+        for _ in range(sessions):
+            try:
+                ch.write(encode_request(num_rounds, f"{team_name}-{ch.session_id}"))
+                await play_session(ch.reader, ch, num_rounds, strategy, stats)
+                stats.sessions += 1
+            except (OSError, asyncio.IncompleteReadError, ConnectionError, ProtocolError):
+                stats.errors += 1
+                return
+
+    try:
+        await asyncio.gather(*(slot(ch) for ch in channels.values()))
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        await router
+
+
+async def run(args: argparse.Namespace, host: str, port: int) -> tuple[Stats, float]:
+    stats = Stats()
+    strategy = from_spec(args.strategy)
+    t0 = time.perf_counter()
+    if getattr(args, "mux", 0):
+        await asyncio.gather(*(
+            mux_worker(host, port, args.mux, args.sessions, args.rounds, strategy, stats, f"{args.team}-{i}")
+            for i in range(args.connections)
+        ))
+    else:
+        await asyncio.gather(*(
+            connection_worker(host, port, args.sessions, args.rounds, strategy, stats, f"{args.team}-{i}")
+            for i in range(args.connections)
+        ))
+    return stats, time.perf_counter() - t0
+
+
+# -----------------------------
+# Report
+# -----------------------------
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(q * len(sorted_values)))
+    return sorted_values[k]
+
+
+def report(stats: Stats, elapsed: float) -> None:
+    print(f"sessions: {stats.sessions}  rounds: {stats.rounds}  errors: {stats.errors}  time: {elapsed:.2f}s")
+    print(f"throughput: {stats.rounds / elapsed:,.0f} rounds/s")
+    if stats.rounds:
+        print(f"win rate: {stats.results[ROUND_WIN] / stats.rounds:.2%}  "
+              f"tie rate: {stats.results[ROUND_TIE] / stats.rounds:.2%}")
+
+    ct = sorted(stats.connect_times)
+    if ct:
+        print(f"connect ms: mean {1000 * sum(ct) / len(ct):.3f}  p50 {1000 * percentile(ct, 0.50):.3f}  "
+              f"p99 {1000 * percentile(ct, 0.99):.3f}")
+
+    rt = sorted(stats.round_times)
+    if rt:
+        print(f"round ms: p50 {1000 * percentile(rt, 0.50):.3f}  p99 {1000 * percentile(rt, 0.99):.3f}")
+
+    rtt = sorted(stats.decision_rtts)
+    if rtt:
+        print(f"decision rtt ms ({len(rtt)} samples): p50 {1000 * percentile(rtt, 0.50):.3f}  "
+              f"p95 {1000 * percentile(rtt, 0.95):.3f}  p99 {1000 * percentile(rtt, 0.99):.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Blackjack load generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--discover", action="store_true", help="use the server from the first UDP offer")
+    parser.add_argument("--connections", type=int, default=100, help="concurrent connections")
+    parser.add_argument("--sessions", type=int, default=1, help="back-to-back sessions per connection slot")
+    parser.add_argument("--mux", type=int, default=0,
+                        help="concurrent sessions multiplexed on each connection (default 0: one per connection)")
+    parser.add_argument("--rounds", type=int, default=255, help="rounds per session (1..255)")
+    parser.add_argument("--strategy", default="threshold:17", help=STRATEGY_HELP)
+    parser.add_argument("--team", default="loadgen", help="team name prefix")
+    args = parser.parse_args()
+    try:
+        from_spec(args.strategy)  # fail here, not in every worker
+    except ValueError as e:
+        parser.error(str(e))
+
+    host, port = args.host, args.port
+    if args.discover:
+        host, port, _server_name = listen_for_offer()
+    if not port:
+        parser.error("give --port or --discover")
+
+    stats, elapsed = asyncio.run(run(args, host, port))
+    report(stats, elapsed)
+
+
+if __name__ == "__main__":
+    main()
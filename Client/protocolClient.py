@@ -3,12 +3,32 @@ Protocol encoding/decoding for the Blackjack game.
 This file defines the exact packet formats shared by client and server.
 """
 
-import struct
+from Formats.cards import NO_CARD
+from Formats.strategy_table import pack_table
+from Formats.codec import (
+    ProtocolError,
+    OFFER,
+    REQUEST,
+    PAYLOAD_DECISION,
+    PAYLOAD_SERVER,
+    POLICY_REQUEST,
+    SUMMARY,
+    OFFER_LEN,
+    PAYLOAD_SERVER_LEN,
+    SUMMARY_LEN,
+    check_header,
+    encode_name,
+    decode_name,
+)
 from Formats.packet_formats import (
     MAGIC_COOKIE,
     OFFER_TYPE,
     REQUEST_TYPE,
     PAYLOAD_TYPE,
+    POLICY_REQUEST_TYPE,
+    SUMMARY_TYPE,
+    REPLY_FRAMES,
+    REPLY_SUMMARY,
     HIT,
     STAND,
     ROUND_ONGOING,
@@ -17,38 +37,9 @@ from Formats.packet_formats import (
     ROUND_TIE,
 )
 
-
-# =====================
-# Exceptions
-# =====================
-
-class ProtocolError(Exception):
-    pass
-
-
-# =====================
-# Helpers
-# =====================
-
-
-# check valid message (!B = 4 bytes) and its type (offer/ payload - as expected)
-def check_cookie_and_type(data: bytes, expected_type: int):
-    cookie, msg_type = struct.unpack("!IB", data[:5])
-    if cookie != MAGIC_COOKIE:
-        raise ProtocolError("Invalid magic cookie")
-    if msg_type != expected_type:
-        raise ProtocolError("Invalid message type")
-
-
-# encode name (string) to bytes
-def encode_name(text: str, length: int) -> bytes:
-    raw = text.encode("utf-8")
-    return raw[:length].ljust(length, b"\x00")
-
-
-# decode name (bytes) to string
-def decode_name(raw: bytes) -> str:
-    return raw.rstrip(b"\x00").decode("utf-8")
+# Bound once; these run for every frame
+_pack_decision = PAYLOAD_DECISION.pack
+_unpack_payload_server = PAYLOAD_SERVER.unpack_from
 
 
 # =====================
@@ -61,16 +52,14 @@ def decode_offer(data: bytes):
     Offer format:
     cookie (4B) | type (1B) | server port (2B) | server name (32B) #total of 39 bytes
     """
-    if len(data) != 39:
+    if len(data) != OFFER_LEN:
         raise ProtocolError("Invalid offer length")
 
-    check_cookie_and_type(data, OFFER_TYPE)
-
-    _, _, port = struct.unpack("!IBH",
-                               data[:7])  # first 7 bytes: I=4 bytes (Magic cookie), B= 1 byte (type), H= 2 bytes (port)
-    server_name = decode_name(data[7:39])  # last 32 bytes: Server's name
+    # I=4 bytes (Magic cookie), B= 1 byte (type), H= 2 bytes (port), last 32 bytes: Server's name
+    cookie, msg_type, port, raw_name = OFFER.unpack_from(data)
+    check_header(cookie, msg_type, OFFER_TYPE)
 
-    return port, server_name
+    return port, decode_name(raw_name)
 
 
 # =====================
@@ -83,8 +72,7 @@ def encode_request(num_rounds: int, team_name: str) -> bytes:
     Request format:
     cookie (4B) | type (1B) | num rounds (1B) | team name (32B)
     """
-    return struct.pack(
-        "!IBB32s",
+    return REQUEST.pack(
         MAGIC_COOKIE,  # I = 4 bytes
         REQUEST_TYPE,  # B = 1 byte
         num_rounds,  # B = 1 byte
@@ -92,6 +80,23 @@ def encode_request(num_rounds: int, team_name: str) -> bytes:
     )
 
 
+# encode policy request message - the server plays all rounds with this hit table
+def encode_policy_request(num_rounds: int, team_name: str, hit_table, summary: bool = False) -> bytes:
+    """
+    Policy request format:
+    cookie (4B) | type (1B) | num rounds (1B) | team name (32B) | reply mode (1B) | packed hit table (96B)
+    hit_table: TABLE_LEN bytes in the Formats/strategy_table.py layout (1 = Hit)
+    """
+    return POLICY_REQUEST.pack(
+        MAGIC_COOKIE,
+        POLICY_REQUEST_TYPE,
+        num_rounds,
+        encode_name(team_name, 32),
+        REPLY_SUMMARY if summary else REPLY_FRAMES,
+        pack_table(hit_table),
+    )
+
+
 # =====================
 # Payload — Client → Server
 # =====================
@@ -104,25 +109,50 @@ def encode_payload_decision(decision: bytes) -> bytes:
     if decision not in (HIT, STAND):
         raise ValueError("Invalid player decision")
 
-    return struct.pack(
-        "!IB5s",
+    return _pack_decision(
         MAGIC_COOKIE,  # I= 4 bytes
         PAYLOAD_TYPE,  # B = 1 byte
         decision,  # 5 bytes
     )
 
 
+# decode payload message in place at buf[offset:] - caller guarantees the whole frame is there
+# Returns: (result, card code) - NO_CARD for a frame without a card (rank/suit = 0), whatever the result
+def decode_payload_server_from(buf, offset: int):
+    cookie, msg_type, result, rank, suit = _unpack_payload_server(buf, offset)
+    if cookie != MAGIC_COOKIE or msg_type != PAYLOAD_TYPE:
+        check_header(cookie, msg_type, PAYLOAD_TYPE)
+
+    if 0 < rank <= 13 and suit < 4:
+        return result, suit * 13 + rank - 1  # Formats.cards.card_code, inlined
+    if rank or suit:
+        raise ProtocolError("Invalid card")
+    return result, NO_CARD
+
+
 # decode payload message - round result and card value
-def decode_payload_server(data: bytes):
+def decode_payload_server(data):
     """
     Payload from server:
     cookie (4B) | type (1B) | result (1B) | rank (2B) | suit (1B) #total of 9 bytes
+    Returns: (result, card code or NO_CARD)
     """
-    if len(data) != 9:
+    if len(data) != PAYLOAD_SERVER_LEN:
         raise ProtocolError("Invalid payload length")
 
-    check_cookie_and_type(data, PAYLOAD_TYPE)
+    return decode_payload_server_from(data, 0)
+
+
+# decode summary message - one per round of a policy session with summary reply
+def decode_summary(data):
+    """
+    Summary from server:
+    cookie (4B) | type (1B) | result (1B) | player total (1B) | dealer total (1B) #total of 8 bytes
+    """
+    if len(data) != SUMMARY_LEN:
+        raise ProtocolError("Invalid summary length")
 
-    _, _, result, rank, suit = struct.unpack("!IBBHB", data)
+    cookie, msg_type, result, player_total, dealer_total = SUMMARY.unpack_from(data)
+    check_header(cookie, msg_type, SUMMARY_TYPE)
 
-    return result, rank, suit
+    return result, player_total, dealer_total
@@ -0,0 +1,97 @@
+"""
+Automatic Hit/Stand strategies for headless clients (bots, load generator).
+
+A strategy is a callable (player_total, soft, dealer_up_value) -> HIT or STAND.
+player_total/soft come from Formats.cards.hand_value, the same Ace rule
+the server's Hand uses; dealer_up_value is RANK_VALUE_MAP of the up-card.
+"""
+
+import random
+from typing import Callable
+
+from Formats.packet_formats import HIT, STAND
+from Formats.strategy_table import DEFAULT_TABLE_PATH, MAX_UP_VALUE, TABLE_LEN, load_table, threshold_table
+
+Strategy = Callable[[int, bool, int], bytes]
+
+# --strategy help shared by client.py and loadgen.py
+STRATEGY_HELP = ("auto[:PATH] | threshold[:N] | stand | random. auto plays the Server/strategy_solver.py "
+                 "table (default basic_strategy.bin), solved for an infinite deck: an approximation "
+                 "of the server's 6-deck shoe")
+
+
+def threshold(hit_below: int = 17) -> Strategy:
+    """Hit while the hand total is below hit_below."""
+    def decide(player_total: int, soft: bool, dealer_up: int) -> bytes:
+        return HIT if player_total < hit_below else STAND
+    return decide
+
+
+def always_stand() -> Strategy:
+    def decide(player_total: int, soft: bool, dealer_up: int) -> bytes:
+        return STAND
+    return decide
+
+
+def coin_flip() -> Strategy:
+    def decide(player_total: int, soft: bool, dealer_up: int) -> bytes:
+        return HIT if player_total < 21 and random.random() < 0.5 else STAND
+    return decide
+
+
+def lookup_table(hit_table) -> Strategy:
+    """
+    Precomputed basic strategy (Server/strategy_solver.py): one byte lookup per decision.
+    hit_table is the buffer returned by Formats.strategy_table.load_table.
+    """
+    row = MAX_UP_VALUE + 1
+
+    def decide(player_total: int, soft: bool, dealer_up: int) -> bytes:
+        return HIT if hit_table[(player_total * 2 + soft) * row + dealer_up] else STAND
+    return decide
+
+
+def _load(path: str):
+    """
+    load_table, with a ValueError saying how to build a missing table.
+    """
+    try:
+        return load_table(path)
+    except FileNotFoundError:
+        raise ValueError(f"No strategy table at {path!r}; build it with: "
+                         f"python Server/strategy_solver.py --out {path}") from None
+
+
+def from_spec(spec: str) -> Strategy:
+    """
+    Build a strategy from a command-line spec:
+      "auto[:PATH]"    precomputed basic-strategy table (default basic_strategy.bin)
+      "threshold[:N]"  hit below N (default 17)
+      "stand"          always stand
+      "random"         coin flip below 21
+    """
+    name, _, arg = spec.partition(":")
+    if name == "auto":
+        return lookup_table(_load(arg or DEFAULT_TABLE_PATH))
+    if name == "threshold":
+        return threshold(int(arg) if arg else 17)
+    if name == "stand":
+        return always_stand()
+    if name == "random":
+        return coin_flip()
+    raise ValueError(f"Unknown strategy: {spec!r}")
+
+
+def hit_table_from_spec(spec: str) -> bytes:
+    """
+    The hit table (strategy_table layout) for a spec, to hand the whole policy
+    to the server in a POLICY_REQUEST. "random" has no table.
+    """
+    name, _, arg = spec.partition(":")
+    if name == "auto":
+        return bytes(_load(arg or DEFAULT_TABLE_PATH))
+    if name == "threshold":
+        return threshold_table(int(arg) if arg else 17)
+    if name == "stand":
+        return bytes(TABLE_LEN)
+    raise ValueError(f"Strategy {spec!r} can't be sent to the server")
@@ -21,3 +21,45 @@ SUITS = {
     2: "♣",
     3: "♠"
 }
+
+ACE = 1
+
+# Same as RANK_VALUE_MAP, but an Ace is counted as 1 (a "hard" total)
+HARD_VALUE_MAP = {rank: (1 if rank == ACE else value) for rank, value in RANK_VALUE_MAP.items()}
+
+# One Ace may count 11 instead of 1 when that doesn't bust the hand
+SOFT_ACE_BONUS = 10
+
+
+def hand_value(hard_total: int, aces: int) -> tuple[int, bool]:
+    """
+    Best total of a hand from its hard total and number of Aces.
+    Returns: (total, soft) - soft means an Ace is currently counted as 11.
+    """
+    if aces and hard_total + SOFT_ACE_BONUS <= 21:
+        return hard_total + SOFT_ACE_BONUS, True
+    return hard_total, False
+
+
+# Canonical card encoding: one int 0..51, suit-major (code = suit * 13 + rank - 1),
+# the order of a fresh Deck and of the game journal's card bytes.
+# Everything about a card is one index into the tables below (no tuples, no dicts).
+CARD_COUNT = 52
+NO_CARD = CARD_COUNT  # "no card" (a result-only payload); every table has a slot for it
+
+
+def card_code(rank: int, suit: int) -> int:
+    return suit * 13 + rank - 1
+
+
+_RANKS = [rank for _suit in SUITS for rank in range(1, 14)]
+_SUITS = [suit for suit in SUITS for _rank in range(1, 14)]
+
+CARD_RANK = bytes(_RANKS + [0])                                      # 1..13, as on the wire
+CARD_SUIT = bytes(_SUITS + [0])                                      # 0..3, as on the wire
+CARD_VALUE = bytes([RANK_VALUE_MAP[rank] for rank in _RANKS] + [0])  # Ace = 11 (dealer up-card value)
+CARD_HARD = bytes([HARD_VALUE_MAP[rank] for rank in _RANKS] + [0])   # Ace = 1
+CARD_ACE = bytes([rank == ACE for rank in _RANKS] + [0])             # 1 for an Ace
+
+# (rank, suit) per code, for display
+CARD_TUPLES = tuple(zip(CARD_RANK[:CARD_COUNT], CARD_SUIT[:CARD_COUNT]))
@@ -0,0 +1,209 @@
+"""
+Shared codec layer for the Blackjack protocol.
+
+Every packet layout is compiled once into a struct.Struct, and frames are
+decoded in place with unpack_from() at an offset, so the hot path neither
+re-parses format strings nor slices the received bytes.
+FrameBuffer gives each connection one reusable receive buffer that is
+filled with recv_into().
+"""
+
+import struct
+
+from Formats.packet_formats import MAGIC_COOKIE, MUX_TYPE
+
+
+# =====================
+# Exceptions
+# =====================
+
+class ProtocolError(Exception):
+    pass
+
+
+# =====================
+# Packet layouts
+# =====================
+
+HEADER = struct.Struct("!IB")              # cookie (4B) | type (1B)
+OFFER = struct.Struct("!IBH32s")           # ... | server port (2B) | server name (32B)
+REQUEST = struct.Struct("!IBB32s")         # ... | num rounds (1B) | team name (32B)
+PAYLOAD_DECISION = struct.Struct("!IB5s")  # ... | decision (5B)
+PAYLOAD_SERVER = struct.Struct("!IBBHB")   # ... | result (1B) | rank (2B) | suit (1B)
+# ... | num rounds (1B) | team name (32B) | reply mode (1B) | packed hit table (96B)
+POLICY_REQUEST = struct.Struct("!IBB32sB96s")
+SUMMARY = struct.Struct("!IBBBB")          # ... | result (1B) | player total (1B) | dealer total (1B)
+MUX = struct.Struct("!IBHH")               # ... | session id (2B) | body length (2B), then the body
+
+HEADER_LEN = HEADER.size                      # 5
+OFFER_LEN = OFFER.size                        # 39
+REQUEST_LEN = REQUEST.size                    # 38
+PAYLOAD_DECISION_LEN = PAYLOAD_DECISION.size  # 10
+PAYLOAD_SERVER_LEN = PAYLOAD_SERVER.size      # 9
+POLICY_REQUEST_LEN = POLICY_REQUEST.size      # 135
+SUMMARY_LEN = SUMMARY.size                    # 8
+MUX_HEADER_LEN = MUX.size                     # 9
+
+
+# =====================
+# Helpers
+# =====================
+
+def check_header(cookie: int, msg_type: int, expected_type: int) -> None:
+    """
+    Validate an already-unpacked cookie/type pair.
+    """
+    if cookie != MAGIC_COOKIE:
+        raise ProtocolError("Invalid magic cookie")
+    if msg_type != expected_type:
+        raise ProtocolError("Invalid message type")
+
+
+def check_cookie_and_type(data, expected_type: int, offset: int = 0) -> None:
+    cookie, msg_type = HEADER.unpack_from(data, offset)
+    check_header(cookie, msg_type, expected_type)
+
+
+def encode_name(text: str, length: int) -> bytes:
+    raw = text.encode("utf-8")
+    return raw[:length].ljust(length, b"\x00")
+
+
+def decode_name(raw: bytes) -> str:
+    return raw.rstrip(b"\x00").decode("utf-8")
+
+
+# =====================
+# Mux envelope — both directions
+# =====================
+
+_unpack_mux = MUX.unpack_from
+_pack_mux = MUX.pack
+
+
+def decode_mux_header_from(buf, offset: int) -> tuple[int, int]:
+    """
+    Envelope header at buf[offset:]:
+    cookie (4B) | type (1B) | session id (2B) | body length (2B)
+    Returns: (session_id, body_length)
+    """
+    cookie, msg_type, session_id, length = _unpack_mux(buf, offset)
+    if cookie != MAGIC_COOKIE or msg_type != MUX_TYPE:
+        check_header(cookie, msg_type, MUX_TYPE)
+
+    return session_id, length
+
+
+def encode_mux(session_id: int, body: bytes) -> bytes:
+    """
+    Wrap one or more frames of a session in a MUX envelope.
+    """
+    return _pack_mux(MAGIC_COOKIE, MUX_TYPE, session_id, len(body)) + body
+
+
+# =====================
+# Receive buffer
+# =====================
+
+class FrameBuffer:
+    """
+    Reusable per-connection receive buffer.
+    Bytes land in `buf` via recv_into() (or feed() for stream APIs that hand
+    out bytes); complete frames are consumed with take() and decoded in place.
+    """
+
+    def __init__(self, size: int = 4096):
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.start = 0  # first unconsumed byte
+        self.end = 0    # one past the last received byte
+        self._heads = {}  # n -> view[:n], handed out again by recv_exact()
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def _compact(self) -> None:
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif self.start:
+            # Only a partial frame is left; move it to the front (same length, no resize)
+            n = self.end - self.start
+            self.buf[:n] = self.buf[self.start:self.end]
+            self.start, self.end = 0, n
+
+    def space(self) -> int:
+        """
+        Free bytes at the end of the buffer (after moving leftovers to the front).
+        """
+        self._compact()
+        return len(self.buf) - self.end
+
+    def recv_into(self, sock) -> int:
+        """
+        One recv_into() straight into the buffer. Returns bytes read (0 = peer closed).
+        """
+        self._compact()
+        if self.end:
+            n = sock.recv_into(self.view[self.end:])
+        else:
+            n = sock.recv_into(self.buf)
+        self.end += n
+        return n
+
+    def feed(self, data) -> None:
+        """
+        Copy already-received bytes in (asyncio streams return bytes objects).
+        """
+        n = len(data)
+        if n > self.space():
+            raise ProtocolError("Receive buffer overflow")
+        self.buf[self.end:self.end + n] = data
+        self.end += n
+
+    def take(self, n: int) -> int:
+        """
+        Consume the next n-byte frame; returns its offset in `buf`.
+        Caller checks len(self) >= n first.
+        """
+        off = self.start
+        self.start += n
+        return off
+
+    def fill(self, sock, n: int) -> None:
+        """
+        Block until at least n bytes are buffered, without consuming them
+        (e.g. to look at a message type before deciding how to read it).
+        Raises ConnectionError if the peer closes the connection.
+        """
+        self._compact()
+        want = self.start + n
+        while self.end < want:
+            got = sock.recv_into(self.view[self.end:want])
+            if not got:
+                raise ConnectionError("Peer closed the TCP connection.")
+            self.end += got
+
+    def recv_exact(self, sock, n: int):
+        """
+        Block until n bytes are buffered and consume them.
+        Returns a memoryview of exactly n bytes, valid until the next read.
+        Raises ConnectionError if the peer closes the connection.
+        """
+        self._compact()
+        want = self.start + n
+        while self.end < want:
+            if self.end:
+                got = sock.recv_into(self.view[self.end:want])
+            else:
+                got = sock.recv_into(self.buf, n)  # common case: empty buffer, no view slice
+            if not got:
+                raise ConnectionError("Peer closed the TCP connection.")
+            self.end += got
+
+        off = self.take(n)
+        if off:
+            return self.view[off:off + n]
+        head = self._heads.get(n)
+        if head is None:
+            head = self._heads[n] = self.view[:n]
+        return head
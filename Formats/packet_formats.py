@@ -12,6 +12,9 @@ MAGIC_COOKIE = 0xabcddcba
 OFFER_TYPE   = 0x2
 REQUEST_TYPE = 0x3
 PAYLOAD_TYPE = 0x4
+POLICY_REQUEST_TYPE = 0x5  # REQUEST + a Hit/Stand policy: the server plays the rounds itself
+SUMMARY_TYPE = 0x6         # one result frame per round of a policy session (summary reply)
+MUX_TYPE = 0x7             # envelope: session id + one or more frames of that session
 
 
 # ===== Network =====
@@ -28,6 +31,13 @@ ROUND_LOSS    = 0x2
 ROUND_WIN     = 0x3
 
 
+# ===== Policy offload (POLICY_REQUEST) =====
+
+# Reply modes
+REPLY_FRAMES  = 0x0   # stream every card + result PAYLOAD frame, as in interactive play
+REPLY_SUMMARY = 0x1   # only one SUMMARY frame per round
+
+
 # ===== Card Suits =====
 
 HEART   = 0
@@ -0,0 +1,83 @@
+"""
+On-disk layout of the precomputed Hit/Stand table
+(written by Server/strategy_solver.py, read by automated clients).
+
+    magic (4B) b"BJST" | version (1B) | hit table (768B, 1 = Hit, 0 = Stand)
+
+The hit table is indexed by (player total 0..31, soft 0/1, dealer up-card
+value 0..11), row-major, so a decision is a single byte lookup.
+The file can be read into memory or memory-mapped as-is.
+
+On the wire (POLICY_REQUEST) the same table travels bit-packed:
+PACKED_TABLE_LEN bytes, bit i (MSB first) = hit table byte i.
+"""
+
+import mmap
+
+MAGIC = b"BJST"
+VERSION = 1
+HEADER_LEN = len(MAGIC) + 1
+
+MAX_TOTAL = 31     # 21 + a 10-value card on a hit
+MAX_UP_VALUE = 11  # dealer up-card values run 2..11 (Ace = 11)
+TABLE_SHAPE = (MAX_TOTAL + 1, 2, MAX_UP_VALUE + 1)
+TABLE_LEN = TABLE_SHAPE[0] * TABLE_SHAPE[1] * TABLE_SHAPE[2]
+PACKED_TABLE_LEN = TABLE_LEN // 8
+
+DEFAULT_TABLE_PATH = "basic_strategy.bin"
+
+
+def table_index(total: int, soft: bool, dealer_up: int) -> int:
+    return (total * 2 + soft) * (MAX_UP_VALUE + 1) + dealer_up
+
+
+def threshold_table(hit_below: int) -> bytes:
+    """
+    Hit table for "hit while the total is below hit_below".
+    """
+    return bytes(
+        total < hit_below
+        for total in range(TABLE_SHAPE[0])
+        for _soft in range(TABLE_SHAPE[1])
+        for _up in range(TABLE_SHAPE[2])
+    )
+
+
+def pack_table(hit) -> bytes:
+    if len(hit) != TABLE_LEN:
+        raise ValueError("Invalid strategy table length")
+    packed = bytearray(PACKED_TABLE_LEN)
+    for i, h in enumerate(hit):
+        if h:
+            packed[i >> 3] |= 0x80 >> (i & 7)
+    return bytes(packed)
+
+
+def unpack_table(packed) -> bytes:
+    if len(packed) != PACKED_TABLE_LEN:
+        raise ValueError("Invalid packed strategy table length")
+    return bytes((packed[i >> 3] >> (7 - (i & 7))) & 1 for i in range(TABLE_LEN))
+
+
+def encode_table(hit: bytes) -> bytes:
+    if len(hit) != TABLE_LEN:
+        raise ValueError("Invalid strategy table length")
+    return MAGIC + bytes([VERSION]) + hit
+
+
+def load_table(path: str = DEFAULT_TABLE_PATH, use_mmap: bool = True) -> memoryview:
+    """
+    Returns a read-only view of the hit table (TABLE_LEN bytes).
+    With use_mmap the file is mapped, not read.
+    """
+    with open(path, "rb") as f:
+        if use_mmap:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+
+    if len(data) != HEADER_LEN + TABLE_LEN or data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a strategy table")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(f"{path}: unsupported strategy table version")
+    return memoryview(data)[HEADER_LEN:]
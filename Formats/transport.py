@@ -0,0 +1,133 @@
+"""
+Byte-stream transports for the blocking game flow.
+
+The server's thread engine (server.handle_client and the play_* helpers)
+and the client (client.play_session / play_policy_session) only ever call
+five methods on their connection: sendall(), recv_into(), settimeout(),
+shutdown() and close(). That subset is the Transport interface:
+- a connected socket.socket already implements it, so the network path
+  keeps using the socket directly (no wrapper call per frame)
+- memory_pair() returns two connected in-process MemoryTransport ends,
+  the socketpair() of this module: bytes go through a queue of chunks,
+  never through the kernel
+
+So full protocol sessions (real frames, real codecs, real session state
+machines) can run in one process with the server and client each on their
+own thread, see server.connect_memory().
+"""
+
+import queue
+import socket
+from typing import Optional, Protocol
+
+
+# =====================
+# Interface
+# =====================
+
+class Transport(Protocol):
+    def sendall(self, data) -> None: ...
+
+    def recv_into(self, buffer, nbytes: int = 0) -> int: ...
+
+    def settimeout(self, value: Optional[float]) -> None: ...
+
+    def shutdown(self, how: int) -> None: ...
+
+    def close(self) -> None: ...
+
+
+# =====================
+# In-memory implementation
+# =====================
+
+class _Pipe:
+    """
+    One direction of a memory connection: the chunks written but not yet
+    read, in a SimpleQueue (blocking get() in C, no Python-level lock per
+    frame). An empty chunk marks the end of the stream.
+    """
+    __slots__ = ("chunks", "pending", "closed", "eof")
+
+    def __init__(self):
+        self.chunks = queue.SimpleQueue()
+        self.pending = b""    # rest of a chunk only partly read
+        self.closed = False   # no more writes
+        self.eof = False      # reader reached the end
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.chunks.put(b"")
+
+
+class MemoryTransport:
+    """
+    One end of an in-process connection, with blocking socket semantics:
+    recv_into() waits for data and returns 0 once the peer shut down its
+    write side (and everything sent before was read), sendall() to a closed
+    direction raises BrokenPipeError (a ConnectionError, like a reset socket).
+    With settimeout(t), a recv_into() that waits longer raises TimeoutError.
+    """
+    __slots__ = ("_in", "_out", "_timeout")
+
+    def __init__(self, inbox: _Pipe, outbox: _Pipe):
+        self._in = inbox
+        self._out = outbox
+        self._timeout: Optional[float] = None
+
+    def settimeout(self, value: Optional[float]) -> None:
+        self._timeout = value
+
+    def sendall(self, data) -> None:
+        out = self._out
+        if out.closed:
+            raise BrokenPipeError("Memory transport closed.")
+        if data:
+            out.chunks.put(bytes(data))  # the caller may reuse its buffer
+
+    def recv_into(self, buffer, nbytes: int = 0) -> int:
+        inbox = self._in
+        chunk = inbox.pending
+        if not chunk:
+            if inbox.eof:
+                return 0
+            try:
+                chunk = inbox.chunks.get(timeout=self._timeout)
+            except queue.Empty:
+                raise TimeoutError("timed out") from None
+            if not chunk or inbox.eof:
+                inbox.eof = True
+                return 0
+        n = len(chunk)
+        want = nbytes or len(buffer)
+        if n <= want:
+            buffer[:n] = chunk
+            inbox.pending = b""
+            return n
+        view = memoryview(chunk)
+        buffer[:want] = view[:want]
+        inbox.pending = view[want:]
+        return want
+
+    def shutdown(self, how: int) -> None:
+        # SHUT_RD drops unread bytes and ends our reads (waking a blocked one);
+        # SHUT_WR lets the peer read to EOF
+        if how in (socket.SHUT_RD, socket.SHUT_RDWR):
+            inbox = self._in
+            inbox.eof = True
+            inbox.pending = b""
+            inbox.close()
+        if how in (socket.SHUT_WR, socket.SHUT_RDWR):
+            self._out.close()
+
+    def close(self) -> None:
+        self.shutdown(socket.SHUT_RDWR)
+
+
+def memory_pair() -> tuple[MemoryTransport, MemoryTransport]:
+    """
+    Two connected in-memory transports (like socket.socketpair()).
+    """
+    a_to_b, b_to_a = _Pipe(), _Pipe()
+    return MemoryTransport(b_to_a, a_to_b), MemoryTransport(a_to_b, b_to_a)
@@ -0,0 +1,254 @@
+"""
+Admission control and connection deadlines for the server engines.
+
+Limits, checked once per accepted connection before a thread or any
+protocol work is spent on it:
+- at most `max_sessions` connections served at once
+- at most `max_per_ip` connections from one client IP
+A connection over a limit is closed at once with a TCP reset (fast reject):
+a flood costs one accept() + close() per connection and the client fails
+immediately instead of waiting. The kernel accept queue in front of that is
+bounded by the listen `backlog`.
+
+Deadlines: every connection has an idle deadline (no complete message for
+`idle_timeout` seconds) and a whole-connection deadline (`session_timeout`).
+They all live in one TimingWheel with a single ticker (a thread for the
+thread engine, a task for the asyncio engine) instead of a socket timeout
+per read. Pushing an idle deadline back is one attribute store: the wheel
+only re-files a deadline when its slot comes up. An expired deadline closes
+the connection's socket, which wakes up the handler's blocked read or write.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Optional
+
+DEFAULT_BACKLOG = 128
+DEFAULT_IDLE_TIMEOUT = 30.0  # the per-read socket timeout this replaces
+DEFAULT_SESSION_TIMEOUT = 3600.0
+
+TICK = 0.25        # wheel resolution (seconds)
+WHEEL_SLOTS = 256  # one turn = 64 s; later deadlines wait for a later turn
+
+# Rejection reasons
+SERVER_FULL = "server full"
+IP_LIMIT = "too many connections from this IP"
+
+# Deadline kinds (Deadline.expired)
+IDLE = "idle"
+SESSION = "session"
+
+LINGER_RESET = struct.pack("ii", 1, 0)  # SO_LINGER on, 0 s: close() sends RST
+
+
+def reset_on_close(sock) -> None:
+    """
+    Make the next close() of `sock` a TCP reset: the client sees the reject
+    at once, and the server keeps no TIME_WAIT for it.
+    """
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+    except OSError:
+        pass
+
+
+# -----------------------------
+# Deadlines
+# -----------------------------
+class Deadline:
+    __slots__ = ("idle_timeout", "idle_at", "session_at", "on_expire", "expired")
+
+    def __init__(self, on_expire: Callable[[], None], idle_timeout: float, session_timeout: float):
+        now = time.monotonic()
+        self.idle_timeout = idle_timeout
+        self.idle_at = now + idle_timeout if idle_timeout else math.inf
+        self.session_at = now + session_timeout if session_timeout else math.inf
+        self.on_expire: Optional[Callable[[], None]] = on_expire
+        self.expired: Optional[str] = None  # IDLE / SESSION once it fired
+
+    @property
+    def due(self) -> float:
+        return min(self.idle_at, self.session_at)
+
+    def touch(self) -> None:
+        """
+        A complete message arrived: push the idle deadline back (no lock).
+        """
+        if self.idle_timeout:
+            self.idle_at = time.monotonic() + self.idle_timeout
+
+    def clear_session(self) -> None:
+        """
+        No whole-connection limit (multiplexed connections carry many sessions).
+        """
+        self.session_at = math.inf
+
+    def cancel(self) -> None:
+        """
+        Connection is done; the wheel drops the entry when its slot comes up.
+        """
+        self.on_expire = None
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel: slot i holds the deadlines due in tick i (mod slots).
+    """
+
+    def __init__(self, tick: float = TICK, slots: int = WHEEL_SLOTS):
+        self.tick = tick
+        self.slots: list[list[Deadline]] = [[] for _ in range(slots)]
+        self.current = int(time.monotonic() / tick)  # last tick processed
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _file(self, deadline: Deadline, due: float) -> None:
+        t = max(math.ceil(due / self.tick), self.current + 1)
+        self.slots[t % len(self.slots)].append(deadline)
+
+    def add(self, deadline: Deadline) -> Deadline:
+        due = deadline.due
+        if due != math.inf:
+            with self._lock:
+                self._file(deadline, due)
+        return deadline
+
+    def advance(self, now: float) -> list[Deadline]:
+        """
+        Process every tick up to `now`. Returns the deadlines that expired
+        (marked, not yet fired). Entries pushed back since they were filed
+        are re-filed; cancelled ones are dropped.
+        """
+        expired = []
+        target = int(now / self.tick)
+        with self._lock:
+            # Fell behind by more than a turn (e.g. suspended): one turn visits every slot
+            self.current = max(self.current, target - len(self.slots))
+            while self.current < target:
+                self.current += 1
+                i = self.current % len(self.slots)
+                entries, self.slots[i] = self.slots[i], []
+                for d in entries:
+                    if d.on_expire is None:
+                        continue
+                    due = d.due
+                    if due <= now:
+                        d.expired = SESSION if d.session_at <= now else IDLE
+                        expired.append(d)
+                    else:
+                        self._file(d, due)
+        return expired
+
+    def expire(self, now: float) -> int:
+        """
+        advance() and fire the expired deadlines. Returns how many fired.
+        """
+        fired = 0
+        for d in self.advance(now):
+            on_expire, d.on_expire = d.on_expire, None
+            if on_expire is None:
+                continue  # cancelled meanwhile
+            try:
+                on_expire()
+            except OSError:
+                pass  # already closed
+            fired += 1
+        return fired
+
+    def start(self) -> "TimingWheel":
+        """
+        Tick from a daemon thread (thread engine). Starting again is a no-op.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="deadline-wheel", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.tick)
+            self.expire(time.monotonic())
+
+    async def run_async(self) -> None:
+        """
+        Tick from the event loop (asyncio engine).
+        """
+        while True:
+            await asyncio.sleep(self.tick)
+            self.expire(time.monotonic())
+
+
+# -----------------------------
+# Admission
+# -----------------------------
+class Admission:
+    def __init__(
+        self,
+        max_sessions: int = 0,
+        max_per_ip: int = 0,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        session_timeout: float = DEFAULT_SESSION_TIMEOUT,
+        backlog: int = DEFAULT_BACKLOG,
+    ):
+        """
+        0 = no limit (max_sessions, max_per_ip) / no deadline (timeouts).
+        """
+        self.max_sessions = max_sessions
+        self.max_per_ip = max_per_ip
+        self.idle_timeout = idle_timeout
+        self.session_timeout = session_timeout
+        self.backlog = backlog
+        self.active = 0
+        self.per_ip: dict[str, int] = {}
+        self.wheel = TimingWheel()
+        self._lock = threading.Lock()
+
+    def admit(self, ip: str) -> Optional[str]:
+        """
+        Reserve a slot for a new connection from `ip`.
+        Returns None if admitted (release(ip) when it ends), else the reason to reject.
+        """
+        with self._lock:
+            if self.max_sessions and self.active >= self.max_sessions:
+                return SERVER_FULL
+            n = self.per_ip.get(ip, 0)
+            if self.max_per_ip and n >= self.max_per_ip:
+                return IP_LIMIT
+            self.active += 1
+            self.per_ip[ip] = n + 1
+            return None
+
+    def release(self, ip: str) -> None:
+        with self._lock:
+            self.active -= 1
+            n = self.per_ip[ip] - 1
+            if n:
+                self.per_ip[ip] = n
+            else:
+                del self.per_ip[ip]
+
+    def watch(self, on_expire: Callable[[], None]) -> Deadline:
+        """
+        Idle + whole-connection deadline for a new connection; on_expire()
+        runs on the wheel's ticker when one passes.
+        """
+        return self.wheel.add(Deadline(on_expire, self.idle_timeout, self.session_timeout))
+
+
+# Process-wide admission state used by the server engines
+ADMISSION = Admission()
+
+
+def configure(**kwargs) -> Admission:
+    """
+    Replace the process-wide admission state. Takes Admission's arguments.
+    """
+    global ADMISSION
+    ADMISSION = Admission(**kwargs)
+    return ADMISSION
@@ -0,0 +1,297 @@
+"""
+asyncio engine for the Blackjack server.
+
+Runs the same REQUEST -> N x round flow as server.handle_client, but every
+client is a coroutine on a single event loop instead of a dedicated thread.
+Selected with `server.py --engine asyncio`.
+
+Uses:
+- protocolServer.py for packet encode/decode
+- session.py for the per-connection round state machine
+- metrics.py for connection / error counters
+- eventlog.py for queued, non-blocking client event logging
+- admission.py for connection limits, fast rejects and idle/session deadlines
+- table.py for shared-table mode
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+
+from typing import Optional
+
+from Formats.codec import FrameBuffer, HEADER_LEN, REQUEST_LEN, POLICY_REQUEST_LEN
+from Formats.packet_formats import POLICY_REQUEST_TYPE, MUX_TYPE
+from protocolServer import ProtocolError, decode_request, decode_policy_request
+from session import GameSession
+from mux import MuxConnection
+import admission
+import eventlog
+import table
+from admission import Deadline, reset_on_close
+from eventlog import (
+    CLIENT_CONNECTED,
+    ROUND_START,
+    ROUND_END,
+    CLIENT_FINISHED,
+    TABLE_FINISHED,
+    SESSION_RECORD,
+    MUX_CONNECTED,
+    MUX_FINISHED,
+    CLIENT_DISCONNECTED,
+    CLIENT_REJECTED,
+    CLIENT_PROTOCOL_ERROR,
+    CLIENT_UNEXPECTED_ERROR,
+)
+from metrics import REGISTRY, ACTIVE_CONNECTIONS, SESSIONS_COMPLETED, PROTOCOL_ERRORS, TIMEOUTS, REJECTED
+
+
+# -----------------------------
+# Stream helpers
+# -----------------------------
+async def recv_exact(reader: asyncio.StreamReader, n: int) -> bytes:
+    """
+    Receive exactly n bytes from the client stream, or raise if the connection closes
+    (an expired deadline aborts the transport, which closes it too).
+    """
+    try:
+        return await reader.readexactly(n)
+    except asyncio.IncompleteReadError as e:
+        raise ConnectionError("Client closed the TCP connection.") from e
+
+
+async def read_request(reader: asyncio.StreamReader, first: bytes) -> tuple[int, str, Optional[tuple[bytes, bool]]]:
+    """
+    REQUEST or POLICY_REQUEST, same as server.read_request.
+    `first` is the already-read cookie + type.
+    """
+    head = first + await recv_exact(reader, REQUEST_LEN - len(first))
+    if head[4] != POLICY_REQUEST_TYPE:  # type byte, right after the cookie
+        num_rounds, team_name = decode_request(head)
+        return num_rounds, team_name, None
+
+    data = head + await recv_exact(reader, POLICY_REQUEST_LEN - REQUEST_LEN)
+    num_rounds, team_name, hit_table, summary = decode_policy_request(data)
+    return num_rounds, team_name, (hit_table, summary)
+
+
+# -----------------------------
+# Game flow (per-client coroutine)
+# -----------------------------
+async def play_one_round(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    session: GameSession,
+    frames: FrameBuffer,
+    deadline: Optional[Deadline] = None,
+) -> None:
+    """
+    One blackjack round, same flow as server.play_one_round.
+    """
+    while session.settling:  # as server.settle_replies
+        try:
+            data = await asyncio.wait_for(reader.read(frames.space()), session.reply_grace)
+        except asyncio.TimeoutError:
+            session.no_replies()
+            break
+        if not data:
+            raise ConnectionError("Client closed the TCP connection.")
+        if deadline is not None:
+            deadline.touch()
+        frames.feed(data)
+        session.receive(frames)
+    writer.write(session.start_round())
+    await writer.drain()
+
+    while not session.round_over:
+        data = await reader.read(frames.space())
+        if not data:
+            raise ConnectionError("Client closed the TCP connection.")
+        if deadline is not None:
+            deadline.touch()
+        frames.feed(data)
+        out = session.receive(frames)
+        if out:
+            writer.write(out)
+            await writer.drain()
+
+
+async def play_policy_rounds(
+    writer: asyncio.StreamWriter, session: GameSession, num_rounds: int, policy: tuple[bytes, bool]
+) -> None:
+    """
+    POLICY_REQUEST session, same as server.play_policy_rounds.
+    """
+    hit_table, summary = policy
+    for chunk in session.autoplay(num_rounds, hit_table, summary):
+        writer.write(chunk)
+        await writer.drain()
+
+
+async def play_table(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, team_name: str, num_rounds: int, deadline: Deadline
+) -> table.Seat:
+    """
+    Shared-table session, same as server.play_table. Other seats' coroutines
+    (and the deadline ticker) write this client's cards as the table moves on.
+    """
+    def send(data: bytes) -> None:
+        deadline.touch()  # waiting for the other seats is not idling
+        writer.write(data)
+
+    frames = FrameBuffer()
+    # When the seat is done, end this coroutine's pending read
+    seat = table.TABLES.seat(team_name, num_rounds, send, reader.feed_eof)
+    try:
+        while True:
+            data = await reader.read(frames.space())
+            if not data:
+                break
+            deadline.touch()
+            frames.feed(data)
+            seat.table.receive(seat, frames)
+            await writer.drain()
+    finally:
+        seat.table.leave(seat)
+    if not seat.done:
+        raise ConnectionError("Client closed the TCP connection.")
+    return seat
+
+
+async def play_mux(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, first: bytes, deadline: Optional[Deadline] = None
+) -> int:
+    """
+    Multiplexed connection, same as server.play_mux.
+    `first` is the already-read start of the first envelope.
+    """
+    log = eventlog.LOG
+    mux = MuxConnection(lambda team, session: log.record(SESSION_RECORD, team=team, **session.record()))
+    frames = FrameBuffer()
+    frames.feed(first)
+    try:
+        while True:
+            data = await reader.read(frames.space())
+            if not data:
+                return mux.sessions_finished
+            if deadline is not None:
+                deadline.touch()
+            frames.feed(data)
+            out = mux.receive(frames)
+            if out:
+                writer.write(out)
+                await writer.drain()
+    finally:
+        for team, session in mux.open_sessions():  # cut off mid-session
+            log.record(SESSION_RECORD, team=team, **session.record())
+
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Serve one TCP client connection until it finishes its requested rounds or disconnects.
+    """
+    client_ip, client_port = writer.get_extra_info("peername")[:2]
+    sock = writer.get_extra_info("socket")
+    log = eventlog.LOG
+    stats = REGISTRY.shard()  # the event loop thread's shard, shared by every client coroutine
+    gate = admission.ADMISSION
+
+    reason = gate.admit(client_ip)
+    if reason is not None:
+        reset_on_close(sock)
+        writer.transport.abort()
+        stats.inc(REJECTED)
+        log.warning(CLIENT_REJECTED, ip=client_ip, port=client_port, reason=reason)
+        return
+
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # No per-read wait_for(): the deadline wheel aborts the transport, ending any pending read/drain
+    deadline = gate.watch(writer.transport.abort)
+    stats.inc(ACTIVE_CONNECTIONS)
+    session = None
+
+    try:
+        first = await recv_exact(reader, HEADER_LEN)
+        if first[4] == MUX_TYPE:  # type byte, right after the cookie
+            log.info(MUX_CONNECTED, ip=client_ip, port=client_port)
+            deadline.clear_session()
+            sessions = await play_mux(reader, writer, first, deadline)
+            if deadline.expired:
+                raise ConnectionError("Connection deadline passed.")
+            log.info(MUX_FINISHED, ip=client_ip, port=client_port, sessions=sessions)
+            return
+
+        num_rounds, team_name, policy = await read_request(reader, first)
+        deadline.touch()
+
+        log.info(CLIENT_CONNECTED, ip=client_ip, port=client_port, team=team_name, rounds=num_rounds,
+                 policy=policy is not None)
+
+        if policy is None and table.TABLES is not None:
+            seat = await play_table(reader, writer, team_name, num_rounds, deadline)
+            log.info(TABLE_FINISHED, team=team_name, ip=client_ip, port=client_port, table=seat.table.number,
+                     seat=seat.number, timeouts=seat.timeouts)
+            stats.inc(SESSIONS_COMPLETED)
+            return
+
+        session = GameSession(team_name)
+        if policy is not None:
+            await play_policy_rounds(writer, session, num_rounds, policy)
+        else:
+            frames = FrameBuffer()
+            for r in range(1, num_rounds + 1):
+                log.debug(ROUND_START, team=team_name, round=r, rounds=num_rounds)
+                await play_one_round(reader, writer, session, frames, deadline)
+                log.debug(ROUND_END, team=team_name, round=r, rounds=num_rounds)
+
+        log.info(CLIENT_FINISHED, team=team_name, ip=client_ip, port=client_port)
+        stats.inc(SESSIONS_COMPLETED)
+
+    except ConnectionError as e:
+        error = str(e)
+        if deadline.expired:  # the wheel closed it, not the client
+            stats.inc(TIMEOUTS)
+            error = f"{deadline.expired} timeout"
+        log.warning(CLIENT_DISCONNECTED, ip=client_ip, port=client_port, error=error)
+    except ProtocolError as e:
+        stats.inc(PROTOCOL_ERRORS)
+        log.warning(CLIENT_PROTOCOL_ERROR, ip=client_ip, port=client_port, error=str(e))
+    except Exception as e:
+        log.error(CLIENT_UNEXPECTED_ERROR, ip=client_ip, port=client_port, error=repr(e))
+    finally:
+        if session is not None:  # finished or not: replay.py handles a record that ends mid-round
+            log.record(SESSION_RECORD, team=team_name, **session.record())
+        deadline.cancel()
+        gate.release(client_ip)
+        stats.inc(ACTIVE_CONNECTIONS, -1)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+
+# -----------------------------
+# Accept loop
+# -----------------------------
+async def serve(tcp: socket.socket) -> None:
+    """
+    Accept clients on an already bound + listening TCP socket, forever.
+    """
+    gate = admission.ADMISSION
+    ticker = asyncio.create_task(gate.wheel.run_async())  # idle/session deadlines
+    # start_server() listens again on the socket; keep the configured backlog
+    server = await asyncio.start_server(handle_client, sock=tcp, backlog=gate.backlog)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        ticker.cancel()
+
+
+def run(tcp: socket.socket) -> None:
+    """
+    Blocking entry point used by server.main for `--engine asyncio`.
+    """
+    asyncio.run(serve(tcp))
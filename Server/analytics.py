@@ -0,0 +1,386 @@
+"""
+Streaming analytics over game journal segments (journal.py).
+
+One pass over the records, a chunk at a time, straight off the memory-mapped
+segments as a NumPy structured array (constant memory however large the
+journal is). Tallies:
+- win / tie / loss per team
+- house edge per hour (UTC): (losses - wins) / rounds, the house's
+  expected gain per unit bet at even money
+- dealer busts by dealer up-card value, over the rounds the dealer played
+  (the player did not bust)
+
+Every round's recorded result is also re-derived from its cards with the
+game.py rules; rounds that disagree are counted as "inconsistent" (0 means
+the journal matches what the server served).
+
+Usage (from the repository root):
+    python Server/analytics.py journal/*.bjj [--jobs 4] [--csv out/] [--check]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import functools
+import multiprocessing
+import os
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+from Formats import cards as card_tables
+from Formats.cards import CARD_COUNT, SOFT_ACE_BONUS, hand_value
+from Formats.codec import decode_name
+from Formats.packet_formats import ROUND_WIN, ROUND_LOSS, ROUND_TIE
+from journal import RECORD_LEN, MAX_CARDS, FLAG_TRUNCATED, map_segment, iter_records
+
+# journal.RECORD as a NumPy dtype (big-endian, packed)
+RECORD_DTYPE = np.dtype([
+    ("time", ">f8"),
+    ("seed", ">u8"),
+    ("round", ">u2"),
+    ("team", "S32"),
+    ("result", "u1"),
+    ("n_player", "u1"),
+    ("n_dealer", "u1"),
+    ("flags", "u1"),
+    ("cards", "u1", (MAX_CARDS,)),
+])
+assert RECORD_DTYPE.itemsize == RECORD_LEN
+
+DEFAULT_CHUNK = 1 << 18  # records per vectorized step
+
+# Tally columns, in vector_sim.py order
+OUTCOMES = ("win", "tie", "loss")
+WIN, TIE, LOSS = range(3)
+OTHER = 3  # not a finished-round result; never counted
+
+# Result code -> tally column
+RESULT_COLUMN = np.full(256, OTHER, dtype=np.int64)
+RESULT_COLUMN[[ROUND_WIN, ROUND_TIE, ROUND_LOSS]] = [WIN, TIE, LOSS]
+
+# Card code -> hard value / is Ace / up-card value, from the Formats.cards tables
+# (widened to any byte: the journal's PAD_CARD -> 0)
+CARD_HARD = np.zeros(256, dtype=np.int16)
+CARD_ACE = np.zeros(256, dtype=bool)
+CARD_VALUE = np.zeros(256, dtype=np.int64)
+CARD_HARD[:CARD_COUNT] = np.frombuffer(card_tables.CARD_HARD, dtype=np.uint8)[:CARD_COUNT]
+CARD_ACE[:CARD_COUNT] = np.frombuffer(card_tables.CARD_ACE, dtype=np.uint8)[:CARD_COUNT]
+CARD_VALUE[:CARD_COUNT] = np.frombuffer(card_tables.CARD_VALUE, dtype=np.uint8)[:CARD_COUNT]
+
+UP_VALUES = range(2, 12)  # dealer up-card values (Ace = 11)
+SECONDS_PER_HOUR = 3600
+
+
+class Tally:
+    """
+    Mergeable analytics totals (small and picklable, one per worker process).
+    """
+
+    def __init__(self):
+        self.teams: dict[str, np.ndarray] = {}  # team -> [win, tie, loss]
+        self.hours: dict[int, np.ndarray] = {}  # hours since the epoch -> [win, tie, loss]
+        self.dealer_played = np.zeros(12, dtype=np.int64)  # by up-card value
+        self.dealer_busts = np.zeros(12, dtype=np.int64)
+        self.truncated = 0     # rounds with cards cut off (left out of the bust table)
+        self.inconsistent = 0  # recorded result != result re-derived from the cards
+
+    @property
+    def rounds(self) -> int:
+        return int(sum(counts.sum() for counts in self.teams.values()))
+
+    def add_counts(self, table: dict, keys: Iterable, counts: np.ndarray) -> None:
+        for key, row in zip(keys, counts):
+            if key in table:
+                table[key] += row
+            else:
+                table[key] = row.copy()
+
+    def merge(self, other: "Tally") -> "Tally":
+        self.add_counts(self.teams, other.teams, other.teams.values())
+        self.add_counts(self.hours, other.hours, other.hours.values())
+        self.dealer_played += other.dealer_played
+        self.dealer_busts += other.dealer_busts
+        self.truncated += other.truncated
+        self.inconsistent += other.inconsistent
+        return self
+
+    def same_as(self, other: "Tally") -> bool:
+        def same(a: dict, b: dict) -> bool:
+            return a.keys() == b.keys() and all(np.array_equal(a[k], b[k]) for k in a)
+
+        return (
+            same(self.teams, other.teams)
+            and same(self.hours, other.hours)
+            and np.array_equal(self.dealer_played, other.dealer_played)
+            and np.array_equal(self.dealer_busts, other.dealer_busts)
+            and self.truncated == other.truncated
+            and self.inconsistent == other.inconsistent
+        )
+
+
+# -----------------------------
+# Vectorized scan
+# -----------------------------
+def grouped_counts(keys: np.ndarray, column: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct keys and, for each, how many rows fall in each outcome column.
+    """
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse * 3 + column, minlength=len(uniq) * 3)
+    return uniq, counts.reshape(len(uniq), 3)
+
+
+def team_counts(recs: np.ndarray, column: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-team outcome counts (a team may appear more than once in the result).
+    Groups on the session seed first: integers sort far faster than 32-byte
+    names, and every record of one session carries the same team.
+    """
+    seeds, first, inverse = np.unique(recs["seed"], return_index=True, return_inverse=True)
+    names = np.ascontiguousarray(recs["team"]).view(np.uint64).reshape(-1, 4)
+    if not (names == names[first][inverse]).all():
+        # Same seed used by sessions of different teams (e.g. --seed reused): group on the names
+        return grouped_counts(recs["team"], column)
+    counts = np.bincount(inverse * 3 + column, minlength=len(seeds) * 3)
+    return recs["team"][first], counts.reshape(len(seeds), 3)
+
+
+def best_totals(hard: np.ndarray, mask: np.ndarray, cards: np.ndarray) -> np.ndarray:
+    """
+    Best total (as Formats.cards.hand_value) of the cards selected by `mask`.
+    """
+    total = np.where(mask, hard, 0).sum(axis=1)
+    soft = (np.take(CARD_ACE, cards) & mask).any(axis=1) & (total + SOFT_ACE_BONUS <= 21)
+    return total + SOFT_ACE_BONUS * soft
+
+
+def scan_records(recs: np.ndarray, tally: Tally) -> None:
+    column = RESULT_COLUMN[recs["result"]]
+    finished = column != OTHER
+    if not finished.all():
+        recs, column = recs[finished], column[finished]
+    if not len(recs):
+        return
+
+    teams, counts = team_counts(recs, column)
+    tally.add_counts(tally.teams, (decode_name(t) for t in teams), counts)
+    hours, counts = grouped_counts((recs["time"] // SECONDS_PER_HOUR).astype(np.int64), column)
+    tally.add_counts(tally.hours, hours.tolist(), counts)
+
+    # Hand totals from the card codes: player cards first, then the dealer's
+    complete = (recs["flags"] & FLAG_TRUNCATED) == 0
+    tally.truncated += int(len(recs) - complete.sum())
+    if not complete.all():
+        recs, column = recs[complete], column[complete]
+    n_player = recs["n_player"].astype(np.int64)[:, None]
+    n_dealer = recs["n_dealer"].astype(np.int64)[:, None]
+    width = int((n_player + n_dealer).max(initial=1))  # rounds rarely use more than a dozen cards
+    cards = recs["cards"][:, :width]
+    pos = np.arange(width)
+    player_mask = pos < n_player
+    dealer_mask = (pos >= n_player) & (pos < n_player + n_dealer)
+
+    hard = np.take(CARD_HARD, cards)
+    player = best_totals(hard, player_mask, cards)
+    dealer = best_totals(hard, dealer_mask, cards)
+    up = np.take(CARD_VALUE, cards[np.arange(len(cards)), n_player[:, 0]])
+
+    # Dealer only plays out (and can bust) when the player stood without busting
+    played = player <= 21
+    busts = played & (dealer > 21)
+    tally.dealer_played += np.bincount(up[played], minlength=12)
+    tally.dealer_busts += np.bincount(up[busts], minlength=12)
+
+    expected = np.where(
+        ~played | (~busts & (dealer > player)), LOSS,
+        np.where(busts | (player > dealer), WIN, TIE),
+    )
+    tally.inconsistent += int((expected != column).sum())
+
+
+def scan_segment(path: str, chunk: int = DEFAULT_CHUNK) -> Tally:
+    """
+    Tally one segment, `chunk` records at a time.
+    """
+    tally = Tally()
+    view = map_segment(path)
+    recs = np.frombuffer(view, dtype=RECORD_DTYPE)
+    for start in range(0, len(recs), chunk):
+        scan_records(recs[start:start + chunk], tally)
+    return tally
+
+
+def scan(paths: list[str], jobs: int = 1, chunk: int = DEFAULT_CHUNK) -> Tally:
+    """
+    Tally every segment; with jobs > 1 segments are spread over a process pool.
+    """
+    total = Tally()
+    if jobs > 1 and len(paths) > 1:
+        with multiprocessing.Pool(min(jobs, len(paths))) as pool:
+            for tally in pool.imap_unordered(functools.partial(scan_segment, chunk=chunk), paths):
+                total.merge(tally)
+    else:
+        for path in paths:
+            total.merge(scan_segment(path, chunk))
+    return total
+
+
+# -----------------------------
+# Reference (one record at a time)
+# -----------------------------
+def scan_scalar(paths: list[str]) -> Tally:
+    """
+    Same tallies from journal.iter_records, with Formats.cards.hand_value,
+    to check the vectorized scan against.
+    """
+    tally = Tally()
+    columns = {ROUND_WIN: WIN, ROUND_TIE: TIE, ROUND_LOSS: LOSS}
+
+    def totals(cards: list) -> int:
+        hard = sum(card_tables.CARD_HARD[c] for c in cards)
+        return hand_value(hard, sum(card_tables.CARD_ACE[c] for c in cards))[0]
+
+    def count(table: dict, key, col: int) -> None:
+        if key not in table:
+            table[key] = np.zeros(3, dtype=np.int64)
+        table[key][col] += 1
+
+    for path in paths:
+        for rec in iter_records(path):
+            col = columns.get(rec.result)
+            if col is None:
+                continue
+            count(tally.teams, rec.team, col)
+            count(tally.hours, int(rec.time // SECONDS_PER_HOUR), col)
+            if rec.flags & FLAG_TRUNCATED:
+                tally.truncated += 1
+                continue
+
+            player, dealer = totals(rec.player), totals(rec.dealer)
+            up = card_tables.CARD_VALUE[rec.dealer[0]]
+            if player > 21:
+                expected = LOSS
+            else:
+                tally.dealer_played[up] += 1
+                if dealer > 21:
+                    tally.dealer_busts[up] += 1
+                    expected = WIN
+                elif player > dealer:
+                    expected = WIN
+                elif player == dealer:
+                    expected = TIE
+                else:
+                    expected = LOSS
+            tally.inconsistent += expected != col
+    return tally
+
+
+# -----------------------------
+# Output
+# -----------------------------
+def hour_label(hour: int) -> str:
+    return time.strftime("%Y-%m-%d %H:00", time.gmtime(hour * SECONDS_PER_HOUR))
+
+
+def team_rows(tally: Tally) -> list[list]:
+    rows = []
+    for team, counts in sorted(tally.teams.items(), key=lambda item: (-item[1].sum(), item[0])):
+        n = int(counts.sum())
+        rows.append([team, n, *map(int, counts), *(round(int(k) / n, 6) for k in counts)])
+    return rows
+
+
+def hour_rows(tally: Tally) -> list[list]:
+    rows = []
+    for hour, counts in sorted(tally.hours.items()):
+        n = int(counts.sum())
+        rows.append([hour_label(hour), n, *map(int, counts), round(int(counts[LOSS] - counts[WIN]) / n, 6)])
+    return rows
+
+
+def upcard_rows(tally: Tally) -> list[list]:
+    rows = []
+    for up in UP_VALUES:
+        played, busts = int(tally.dealer_played[up]), int(tally.dealer_busts[up])
+        rows.append(["A" if up == 11 else up, played, busts, round(busts / played, 6) if played else ""])
+    return rows
+
+
+TEAM_HEADER = ["team", "rounds", *OUTCOMES, *(f"{name}_rate" for name in OUTCOMES)]
+HOUR_HEADER = ["hour_utc", "rounds", *OUTCOMES, "house_edge"]
+UPCARD_HEADER = ["dealer_up", "dealer_played", "dealer_busts", "bust_rate"]
+
+
+def print_report(tally: Tally) -> None:
+    print(f"\n{'team':<24}{'rounds':>10}{'win':>9}{'tie':>9}{'loss':>9}")
+    for team, n, _w, _t, _l, win, tie, loss in team_rows(tally):
+        print(f"{team[:23]:<24}{n:>10,}{win:>9.2%}{tie:>9.2%}{loss:>9.2%}")
+
+    print(f"\n{'hour (UTC)':<18}{'rounds':>10}{'house edge':>12}")
+    for label, n, *_counts, edge in hour_rows(tally):
+        print(f"{label:<18}{n:>10,}{edge:>+12.2%}")
+
+    print(f"\n{'dealer up':<11}{'played':>10}{'busts':>10}{'bust rate':>11}")
+    for up, played, busts, rate in upcard_rows(tally):
+        print(f"{up!s:<11}{played:>10,}{busts:>10,}{rate:>11.2%}" if played else f"{up!s:<11}{0:>10}")
+
+    if tally.truncated:
+        print(f"\n{tally.truncated} round(s) with truncated cards left out of the dealer table")
+    print(f"inconsistent results: {tally.inconsistent}")
+
+
+def write_csv(tally: Tally, directory: str) -> None:
+    os.makedirs(directory, exist_ok=True)
+    for name, header, rows in (
+        ("teams.csv", TEAM_HEADER, team_rows(tally)),
+        ("hourly.csv", HOUR_HEADER, hour_rows(tally)),
+        ("dealer_upcard.csv", UPCARD_HEADER, upcard_rows(tally)),
+    ):
+        with open(os.path.join(directory, name), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+
+# -----------------------------
+# Main
+# -----------------------------
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Analytics over game journal segments")
+    parser.add_argument("segments", nargs="+", help="journal segment files (.bjj)")
+    parser.add_argument("--jobs", type=int, default=1, help="scan segments in this many processes")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="records per vectorized step")
+    parser.add_argument("--csv", default=None, metavar="DIR",
+                        help="write teams.csv, hourly.csv and dealer_upcard.csv to DIR")
+    parser.add_argument("--check", action="store_true",
+                        help="also tally record by record and compare with the vectorized scan")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    tally = scan(args.segments, args.jobs, args.chunk)
+    elapsed = time.perf_counter() - t0
+    n = tally.rounds
+    print(f"{n:,} rounds in {len(args.segments)} segment(s), scanned in {elapsed:.3f}s "
+          f"({n / elapsed if elapsed else 0:,.0f} rounds/s)")
+
+    if args.csv:
+        write_csv(tally, args.csv)
+        print(f"CSV written to {args.csv}")
+    else:
+        print_report(tally)
+
+    failed = tally.inconsistent > 0
+    if args.check:
+        t0 = time.perf_counter()
+        ok = scan_scalar(args.segments).same_as(tally)
+        print(f"record-by-record check ({time.perf_counter() - t0:.3f}s):", "OK" if ok else "MISMATCH")
+        failed |= not ok
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
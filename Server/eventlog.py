@@ -0,0 +1,201 @@
+"""
+Non-blocking event log for the server.
+
+Game threads / coroutines only put (time, level, template, fields) on a
+queue: no formatting, no stdout lock, no I/O. A background writer thread
+drains the queue in batches, formats each record once, and writes a batch
+with one write() per output:
+  - console: the same human-readable lines the server always printed
+  - JSON-lines file (optional): {"ts", "level", "msg", ...fields}
+
+Per-level sampling keeps 1 in N records of a level (e.g. DEBUG=1000 for the
+per-round events). The queue is bounded: when the writer can't keep up,
+records are dropped and counted instead of slowing down gameplay.
+Session records (record(), read back by replay.py) are never sampled or dropped.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
+import queue
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+# Levels (same numbers as the stdlib logging module)
+DEBUG = 10     # per-round events
+INFO = 20      # connect / finish
+WARNING = 30   # disconnect, timeout, protocol error, rejected connection
+ERROR = 40     # unexpected exceptions
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+# Server events (templates shared by both engines)
+CLIENT_CONNECTED = "Client connected from {ip}:{port} | team='{team}' | rounds={rounds}"
+ROUND_START = "[{team}] Round {round}/{rounds} start"
+ROUND_END = "[{team}] Round {round}/{rounds} end"
+CLIENT_FINISHED = "Client finished: {team} ({ip}:{port})"
+TABLE_FINISHED = "Client finished: {team} ({ip}:{port}) | table {table} seat {seat}"
+SESSION_RECORD = ("Session record: team={team} seed={seed} decks={decks} rounds={rounds_played} "
+                  "decisions={decisions} results={results}")
+MUX_CONNECTED = "Client connected from {ip}:{port} | multiplexed sessions"
+MUX_FINISHED = "Multiplexed client finished: {ip}:{port} | sessions={sessions}"
+CLIENT_DISCONNECTED = "Client {ip}:{port} disconnected/timeout: {error}"
+CLIENT_REJECTED = "Rejected connection from {ip}:{port}: {reason}"
+CLIENT_PROTOCOL_ERROR = "Protocol error from {ip}:{port}: {error}"
+CLIENT_UNEXPECTED_ERROR = "Unexpected error with {ip}:{port}: {error}"
+
+MAX_QUEUED = 100_000  # records waiting for the writer before new ones are dropped
+BATCH = 1024          # most records formatted + written per write()
+
+
+class EventLog:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        sample: Optional[dict[int, int]] = None,
+        console: bool = True,
+        min_level: int = DEBUG,
+    ):
+        self.path = path
+        self.console = console
+        self.min_level = min_level
+        # level -> counter; a record is kept when next(counter) % n == 0
+        self.sample = {level: n for level, n in (sample or {}).items() if n > 1}
+        self._counters = {level: itertools.count() for level in self.sample}
+        self.dropped = 0
+
+        self._queue: "queue.SimpleQueue[Optional[tuple]]" = queue.SimpleQueue()
+        self._file: Optional[TextIO] = open(path, "a", encoding="utf-8") if path else None
+        self._writer = threading.Thread(target=self._run, name="eventlog-writer", daemon=True)
+        self._writer.start()
+
+    # -----------------------------
+    # Producer side (hot path)
+    # -----------------------------
+    def log(self, level: int, template: str, **fields) -> None:
+        """
+        Queue a record. `template` is str.format()-ed with `fields` by the writer.
+        """
+        if level < self.min_level:
+            return
+        n = self.sample.get(level)
+        if n and next(self._counters[level]) % n:
+            return
+        if self._queue.qsize() >= MAX_QUEUED:
+            self.dropped += 1
+            return
+        self._queue.put((time.time(), level, template, fields))
+
+    def record(self, template: str, **fields) -> None:
+        """
+        Queue an INFO record that must not be lost (SESSION_RECORD):
+        no sampling, and queued even when the queue is full.
+        """
+        self._queue.put((time.time(), INFO, template, fields))
+
+    def debug(self, template: str, **fields) -> None:
+        self.log(DEBUG, template, **fields)
+
+    def info(self, template: str, **fields) -> None:
+        self.log(INFO, template, **fields)
+
+    def warning(self, template: str, **fields) -> None:
+        self.log(WARNING, template, **fields)
+
+    def error(self, template: str, **fields) -> None:
+        self.log(ERROR, template, **fields)
+
+    # -----------------------------
+    # Writer thread
+    # -----------------------------
+    def _run(self) -> None:
+        """
+        Block for one record, then take whatever else is already queued
+        (up to BATCH) and write it all at once. Under load batches fill up;
+        when idle a record is written as soon as it arrives.
+        """
+        q = self._queue
+        while True:
+            record = q.get()
+            batch = []
+            while record is not None:
+                batch.append(record)
+                if len(batch) >= BATCH:
+                    break
+                try:
+                    record = q.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            if record is None:  # close()
+                return
+
+    def _write(self, batch: list[tuple]) -> None:
+        text_lines = []
+        json_lines = []
+        for ts, level, template, fields in batch:
+            msg = template.format(**fields) if fields else template
+            if self.console:
+                text_lines.append(msg)
+            if self._file is not None:
+                rec = {"ts": round(ts, 6), "level": LEVEL_NAMES.get(level, str(level)), "msg": msg}
+                rec.update(fields)
+                json_lines.append(json.dumps(rec, default=str))
+
+        try:
+            if text_lines:
+                sys.stdout.write("\n".join(text_lines) + "\n")
+                sys.stdout.flush()
+            if json_lines:
+                self._file.write("\n".join(json_lines) + "\n")
+                self._file.flush()
+        except (OSError, ValueError):
+            pass  # a closed / broken output must not kill the writer
+
+    def close(self) -> None:
+        """
+        Write out everything queued so far and stop the writer.
+        """
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def parse_sample(specs: list[str]) -> dict[int, int]:
+    """
+    ["DEBUG=1000", "INFO=10"] -> {DEBUG: 1000, INFO: 10}
+    """
+    sample = {}
+    for spec in specs:
+        name, _, n = spec.partition("=")
+        if name.upper() not in LEVELS or not n.isdigit() or int(n) < 1:
+            raise ValueError(f"Invalid log sample {spec!r} (expected LEVEL=N, e.g. DEBUG=1000)")
+        sample[LEVELS[name.upper()]] = int(n)
+    return sample
+
+
+# Process-wide log used by the server engines
+LOG = EventLog()
+
+
+def configure(**kwargs) -> EventLog:
+    """
+    Replace the process-wide log (flushing the old one). Takes EventLog's arguments.
+    """
+    global LOG
+    old, LOG = LOG, EventLog(**kwargs)
+    old.close()
+    return LOG
+
+
+atexit.register(lambda: LOG.close())
@@ -1,35 +1,63 @@
 # Server/game.py
 
 import random
-from Formats.cards import SUITS, RANK_VALUE_MAP
+from array import array
+from typing import Optional
+
+from Formats.cards import CARD_COUNT, CARD_HARD, CARD_ACE, hand_value
 from Formats.packet_formats import (
     ROUND_ONGOING,
     ROUND_WIN,
     ROUND_LOSS,
     ROUND_TIE,
-    HIT,
-    STAND,
 )
 
+# Dealer keeps drawing while below this total
+DEALER_STANDS_ON = 17
+
+# Shoe defaults: decks in the shoe, and fraction dealt before the cut card
+DEFAULT_DECKS = 6
+DEFAULT_PENETRATION = 0.75
+
+
+def max_hand_cards(num_decks: int) -> int:
+    """
+    Most cards one hand can take from num_decks decks: the lowest cards (Aces as 1)
+    while they stay within 21, plus the card that busts it.
+    1 deck: A A A A 2 2 2 2 3 3 3 is 21, the 12th card busts it; 21+ Aces: 22 cards.
+    """
+    total = cards = 0
+    for value in range(1, 10):
+        for _ in range(4 * num_decks):
+            if total + value > 21:
+                return cards + 1
+            total += value
+            cards += 1
+    return cards + 1
+
 
 class Deck:
-    def __init__(self):
-        self.cards = []  # [(rank, suit),..]
+    __slots__ = ("cards", "rng")
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        """
+        rng: shuffle with this generator (e.g. a session's seeded random.Random);
+             None = the shared module-level one.
+        """
+        self.cards = []  # card codes (Formats.cards)
+        self.rng = rng or random
         self._build_deck()
         self.shuffle()
 
     def _build_deck(self):
         """
         Create a standard 52-card deck.
-        Each card is represented as (rank, suit)
+        Each card is its code 0..51 (Formats.cards.card_code)
         """
-        self.cards = []
-        for suit in SUITS.keys():  # 0..3
-            for rank in range(1, 14):  # 1..13
-                self.cards.append((rank, suit))
+        self.cards = list(range(CARD_COUNT))
 
     def shuffle(self):
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
 
     def draw_card(self):
         """
@@ -41,45 +69,135 @@ class Deck:
         return self.cards.pop()
 
 
+class Shoe:
+    """
+    num_decks decks held as one compact array of card codes (0..51, Formats.cards).
+    Shuffled once, dealt front to back until the cut card, then reshuffled
+    between rounds (BlackjackGame.start_round checks needs_shuffle). The cut
+    is at `penetration` of the shoe but always leaves a worst-case round
+    (2 * hand_cards: player + dealer), so a round started before the cut
+    cannot run the shoe dry.
+    With a `supply` (shoe_pool.ShoePool) the next shuffle is prepared in the
+    background and a reshuffle just swaps it in; the result is the same.
+    """
+
+    __slots__ = ("cards", "hand_cards", "cut", "pos", "rng", "supply", "ticket", "ahead")
+
+    def __init__(
+        self,
+        num_decks: int = DEFAULT_DECKS,
+        penetration: float = DEFAULT_PENETRATION,
+        rng: Optional[random.Random] = None,
+    ):
+        if num_decks < 1:
+            raise ValueError("Shoe needs at least one deck")
+        if not 0.0 < penetration <= 1.0:
+            raise ValueError("Penetration must be in (0, 1]")
+        self.cards = array("B", range(CARD_COUNT)) * num_decks
+        self.hand_cards = max_hand_cards(num_decks)
+        self.cut = min(int(len(self.cards) * penetration), len(self.cards) - 2 * self.hand_cards)
+        if self.cut < 1:
+            raise ValueError("Penetration leaves no room for a round before the cut card")
+        self.pos = 0
+        self.rng = rng or random  # same as Deck
+        self.supply = None  # set by ShoePool.attach()
+        self.ticket = None  # identifies the latest next-shuffle request
+        self.ahead = None   # (ticket, shuffled cards, generator after) once it is ready
+        self.shuffle()
+
+    def shuffle(self):
+        supply = self.supply
+        if supply is None or not supply.swap_in(self):
+            self.rng.shuffle(self.cards)
+        self.pos = 0
+        if supply is not None:
+            supply.prepare(self)
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return self.pos >= self.cut
+
+    def draw_card(self):
+        """
+        Draw one card (its code) from the shoe.
+        Raises error if the shoe runs out mid-round.
+        """
+        pos = self.pos
+        if pos >= len(self.cards):
+            raise RuntimeError("Shoe is empty")
+        self.pos = pos + 1
+        return self.cards[pos]
+
+
 class Hand:
+    """
+    Keeps a running hard total (Aces = 1) and Ace count as cards are added,
+    so value / bust / soft checks are O(1). Cards are codes (Formats.cards).
+    One Ace counts 11 whenever that doesn't bust the hand (Formats.cards.hand_value).
+    """
+
+    __slots__ = ("cards", "hard_total", "aces")
+
     def __init__(self):
         self.cards = []
+        self.hard_total = 0
+        self.aces = 0
 
     def add_card(self, card):
         """
-        card is a tuple: (rank, suit)
+        card is a card code (0..51)
         """
         self.cards.append(card)
+        self.hard_total += CARD_HARD[card]
+        self.aces += CARD_ACE[card]
+
+    def clear(self):
+        self.cards.clear()
+        self.hard_total = 0
+        self.aces = 0
 
     def get_value(self) -> int:
         """
-        Calculate total value of the hand.
+        Best total of the hand (Formats.cards.hand_value, as the bots compute it).
         """
-        total = 0
-        for rank, _ in self.cards:
-            total += RANK_VALUE_MAP[rank]
-        return total
+        return hand_value(self.hard_total, self.aces)[0]
+
+    def is_soft(self) -> bool:
+        """
+        True if an Ace is currently counted as 11 (e.g. soft 17 = A + 6).
+        """
+        return hand_value(self.hard_total, self.aces)[1]
 
     def is_bust(self) -> bool:
-        return self.get_value() > 21
+        # A soft Ace is only counted when it fits, so only the hard total can bust
+        return self.hard_total > 21
 
 
 class BlackjackGame:
-    def __init__(self):
-        self.deck = None
+    def __init__(self, shoe: Optional[Shoe] = None, rng: Optional[random.Random] = None):
+        """
+        shoe: deal every round from this Shoe (kept across rounds).
+              None = a fresh single Deck each round, shuffled with rng.
+        """
+        self.shoe = shoe
+        self.rng = rng
+        self.deck = shoe
         self.player = Hand()
         self.dealer = Hand()
         self.round_over = False
 
     def start_round(self):
         """
-        Start a new round: fresh deck, clear hands, initial deal.
+        Start a new round: fresh deck (or shoe, reshuffled past the cut card), clear hands, initial deal.
         Returns: (result, card)
-        card is the last dealt card to the PLAYER (rank, suit) or None
+        card is the last dealt card to the PLAYER (card code) or None
         """
-        self.deck = Deck()
-        self.player = Hand()
-        self.dealer = Hand()
+        if self.shoe is None:
+            self.deck = Deck(self.rng)
+        elif self.shoe.needs_shuffle:
+            self.shoe.shuffle()
+        self.player.clear()
+        self.dealer.clear()
         self.round_over = False
 
         # Initial deal (example: player gets 2, dealer gets 2)
@@ -119,13 +237,13 @@ class BlackjackGame:
         Player stands; dealer draws until >= 17; decide winner.
         Returns:
             (final_result, dealer_drawn_cards)
-        dealer_drawn_cards is a list of (rank, suit) drawn by dealer during this stand.
+        dealer_drawn_cards is a list of card codes drawn by dealer during this stand.
         """
         if self.round_over:
             raise RuntimeError("Round already finished")
 
         dealer_drawn = []
-        while self.dealer.get_value() < 17:
+        while self.dealer.get_value() < DEALER_STANDS_ON:
             card = self.deck.draw_card()
             self.dealer.add_card(card)
             dealer_drawn.append(card)
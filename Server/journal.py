@@ -0,0 +1,243 @@
+"""
+Append-only binary game journal: one fixed-width record per finished round.
+
+Segment file layout:
+    magic (4B) b"BJGJ" | version (1B) | record length (2B) | records...
+
+Record (RECORD_LEN bytes, big-endian like the protocol):
+    time (8B, float seconds) | session seed (8B) | round number (2B)
+    | team name (32B, as in REQUEST) | result (1B, ROUND_* code)
+    | player card count (1B) | dealer card count (1B) | flags (1B)
+    | cards (32B): player cards in deal order, then dealer cards, 1 byte each
+                   (card code, Formats.cards), unused bytes = PAD_CARD
+
+Game threads only pack a record and put it on a queue; a background thread
+writes batches with one write() and fsyncs at most every `fsync_interval`
+seconds. Segments roll over at `segment_bytes`. Each process writes its own
+segments (pid in the name), so worker processes never interleave.
+
+Reading memory-maps a segment and unpacks records in place.
+
+Usage (from the repository root):
+    python Server/journal.py journal/*.bjj [--show N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Iterator, Optional
+
+from Formats.cards import CARD_TUPLES
+from Formats.codec import decode_name
+from Formats.packet_formats import ROUND_WIN, ROUND_LOSS, ROUND_TIE
+
+MAGIC = b"BJGJ"
+VERSION = 1
+SEGMENT_HEADER = struct.Struct("!4sBH")
+RECORD = struct.Struct("!dQH32sBBBB32s")
+RECORD_LEN = RECORD.size  # 86
+MAX_CARDS = 32
+PAD_CARD = 0xFF
+
+FLAG_TRUNCATED = 0x1  # more than MAX_CARDS cards in the round; the rest are not stored
+
+SEGMENT_SUFFIX = ".bjj"
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_FSYNC_INTERVAL = 1.0
+
+
+def encode_record(ts: float, seed: int, round_no: int, team_raw: bytes, result: int,
+                  player_cards: list, dealer_cards: list) -> bytes:
+    """
+    team_raw: the 32-byte protocol encoding of the team name (encode_name).
+    """
+    codes = bytes(player_cards) + bytes(dealer_cards)  # card codes are already bytes
+    flags = 0
+    if len(codes) > MAX_CARDS:
+        codes = codes[:MAX_CARDS]
+        flags |= FLAG_TRUNCATED
+    return RECORD.pack(
+        ts, seed & 0xFFFFFFFFFFFFFFFF, round_no, team_raw, result,
+        len(player_cards), len(dealer_cards), flags, codes.ljust(MAX_CARDS, bytes([PAD_CARD])),
+    )
+
+
+# -----------------------------
+# Writer
+# -----------------------------
+class Journal:
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = max(segment_bytes, SEGMENT_HEADER.size + RECORD_LEN)
+        self.fsync_interval = fsync_interval
+        self.records_written = 0
+
+        self._queue: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._file = None
+        self._segment_no = 0
+        self._size = 0
+        self._writer = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, seed: int, round_no: int, team_raw: bytes, result: int,
+               player_cards: list, dealer_cards: list) -> None:
+        """
+        Journal one finished round (called from game threads; never blocks on I/O).
+        """
+        self._queue.put(encode_record(time.time(), seed, round_no, team_raw, result, player_cards, dealer_cards))
+
+    def _open_segment(self) -> None:
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+        self._segment_no += 1
+        name = f"journal-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._segment_no:04d}{SEGMENT_SUFFIX}"
+        self._file = open(os.path.join(self.directory, name), "ab")
+        self._file.write(SEGMENT_HEADER.pack(MAGIC, VERSION, RECORD_LEN))
+        self._size = SEGMENT_HEADER.size
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _run(self) -> None:
+        q = self._queue
+        last_sync = time.monotonic()
+        dirty = False
+        while True:
+            try:
+                record = q.get(timeout=self.fsync_interval if dirty else None)
+            except queue.Empty:
+                record = b""  # idle: just fall through to the fsync below
+
+            batch = []
+            while record:
+                batch.append(record)
+                try:
+                    record = q.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                if self._file is None or self._size + len(batch) * RECORD_LEN > self.segment_bytes:
+                    self._open_segment()
+                # One segment never splits a batch, except when the batch alone is bigger
+                data = b"".join(batch)
+                self._file.write(data)
+                self._size += len(data)
+                self.records_written += len(batch)
+                dirty = True
+
+            now = time.monotonic()
+            if dirty and (record is None or now - last_sync >= self.fsync_interval):
+                self._sync()
+                last_sync = now
+                dirty = False
+            if record is None:  # close()
+                if self._file is not None:
+                    self._file.close()
+                return
+
+    def close(self) -> None:
+        """
+        Write and fsync everything queued so far, then stop the writer.
+        """
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+
+# -----------------------------
+# Reader
+# -----------------------------
+class JournalRecord:
+    __slots__ = ("time", "seed", "round_no", "team", "result", "player", "dealer", "flags")
+
+    def __init__(self, fields: tuple):
+        ts, seed, round_no, team_raw, result, n_player, n_dealer, flags, codes = fields
+        self.time = ts
+        self.seed = seed
+        self.round_no = round_no
+        self.team = decode_name(team_raw)
+        self.result = result
+        self.player = list(codes[:n_player])  # card codes
+        self.dealer = [c for c in codes[n_player:n_player + n_dealer] if c != PAD_CARD]
+        self.flags = flags
+
+
+def map_segment(path: str) -> memoryview:
+    """
+    Memory-map a segment; returns a view of its whole records (a record cut
+    off by a crash at the end is left out).
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < SEGMENT_HEADER.size:
+            raise ValueError(f"{path} is not a game journal")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, record_len = SEGMENT_HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a game journal")
+    if version != VERSION or record_len != RECORD_LEN:
+        raise ValueError(f"{path}: unsupported journal version")
+
+    body = size - SEGMENT_HEADER.size
+    return memoryview(data)[SEGMENT_HEADER.size:SEGMENT_HEADER.size + body - body % RECORD_LEN]
+
+
+def iter_raw(path: str) -> Iterator[tuple]:
+    """
+    Record tuples (RECORD field order) straight off the mapped file.
+    """
+    return RECORD.iter_unpack(map_segment(path))
+
+
+def iter_records(path: str) -> Iterator[JournalRecord]:
+    for fields in iter_raw(path):
+        yield JournalRecord(fields)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scan game journal segments")
+    parser.add_argument("segments", nargs="+", help="journal segment files (.bjj)")
+    parser.add_argument("--show", type=int, default=0, help="print the first N records")
+    args = parser.parse_args()
+
+    names = {ROUND_WIN: "win", ROUND_LOSS: "loss", ROUND_TIE: "tie"}
+    counts = {result: 0 for result in names}
+    shown = 0
+    t0 = time.perf_counter()
+    for path in args.segments:
+        for fields in iter_raw(path):
+            counts[fields[4]] = counts.get(fields[4], 0) + 1
+            if shown < args.show:
+                rec = JournalRecord(fields)
+                print(f"{time.strftime('%H:%M:%S', time.localtime(rec.time))} {rec.team} seed={rec.seed} "
+                      f"round={rec.round_no} player={[CARD_TUPLES[c] for c in rec.player]} "
+                      f"dealer={[CARD_TUPLES[c] for c in rec.dealer]} -> {names.get(rec.result)}")
+                shown += 1
+    elapsed = time.perf_counter() - t0
+
+    total = sum(counts.values())
+    print(f"{total} rounds in {len(args.segments)} segment(s), scanned in {elapsed:.3f}s "
+          f"({total / elapsed if elapsed else 0:,.0f} rounds/s)")
+    for result, name in names.items():
+        if total:
+            print(f"  {name}: {counts[result]} ({counts[result] / total:.2%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Server metrics registry with a Prometheus text endpoint.
+
+Recording never takes a lock: every thread writes into its own Shard
+(plain lists of ints/floats), found through a threading.local. Shards are
+only summed when the endpoint is scraped. A connection thread hands its
+shard back with release() when it ends, which folds it into the retired
+totals (one locked merge per connection, not per message).
+
+With several worker processes each worker has its own registry and
+serves it on its own port (see server.py --metrics-port).
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Counters / gauges (index into Shard.counters)
+ACTIVE_CONNECTIONS = 0
+SESSIONS_COMPLETED = 1
+ROUNDS_COMPLETED = 2
+PROTOCOL_ERRORS = 3
+TIMEOUTS = 4
+REJECTED = 5
+DECISION_TIMEOUTS = 6
+SHOE_POOL_HITS = 7
+SHOE_POOL_MISSES = 8
+
+COUNTERS = (
+    # (name, type, help)
+    ("blackjack_active_connections", "gauge", "Client connections currently open"),
+    ("blackjack_sessions_completed_total", "counter", "Sessions that played all requested rounds"),
+    ("blackjack_rounds_completed_total", "counter", "Rounds played to a result"),
+    ("blackjack_protocol_errors_total", "counter", "Connections dropped for a malformed message"),
+    ("blackjack_timeouts_total", "counter", "Connections dropped on an idle or session deadline"),
+    ("blackjack_connections_rejected_total", "counter", "Connections reset at accept by admission limits"),
+    ("blackjack_decision_timeouts_total", "counter", "Shared-table decisions not made in time (seat stood)"),
+    ("blackjack_shoe_pool_hits_total", "counter", "Shuffles served ready-made by the shoe pool"),
+    ("blackjack_shoe_pool_misses_total", "counter", "Shuffles done inline because the shoe pool had none ready"),
+)
+
+# Latency histograms (index into Shard.histograms), phases of one round
+PHASE_INITIAL_DEAL = 0
+PHASE_DECISION_WAIT = 1
+PHASE_DEALER_REVEAL = 2
+
+PHASES = ("initial_deal", "decision_wait", "dealer_reveal")
+
+# Other latency histograms (index into Shard.histograms, after the phases)
+SHOE_REFILL_LAG = len(PHASES)
+
+HISTOGRAMS = (
+    # (name, help)
+    ("blackjack_shoe_refill_lag_seconds", "Time from a shoe pool request to its shuffled cards being ready"),
+)
+
+# Bucket upper bounds in seconds (Prometheus "le"); one extra slot for +Inf
+BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class Shard:
+    """
+    One thread's private counters and histograms.
+    A histogram is [bucket counts..., +Inf count, sum of observations].
+    """
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = [0] * len(COUNTERS)
+        self.histograms = [[0] * (len(BUCKETS) + 1) + [0.0] for _ in range(len(PHASES) + len(HISTOGRAMS))]
+
+    def inc(self, counter: int, n: int = 1) -> None:
+        self.counters[counter] += n
+
+    def observe(self, histogram: int, seconds: float) -> None:
+        h = self.histograms[histogram]
+        h[bisect_left(BUCKETS, seconds)] += 1
+        h[-1] += seconds
+
+    def merge(self, other: "Shard") -> None:
+        for i, v in enumerate(other.counters):
+            self.counters[i] += v
+        for mine, theirs in zip(self.histograms, other.histograms):
+            for i, v in enumerate(theirs):
+                mine[i] += v
+
+
+class Registry:
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()  # only for shard list changes and scrapes
+        self._shards: list[Shard] = []
+        self._retired = Shard()
+
+    def shard(self) -> Shard:
+        """
+        The calling thread's shard (created on first use).
+        """
+        try:
+            return self._local.shard
+        except AttributeError:
+            s = self._local.shard = Shard()
+            with self._lock:
+                self._shards.append(s)
+            return s
+
+    def release(self) -> None:
+        """
+        Called by a thread that is about to end: fold its shard into the totals.
+        """
+        s = getattr(self._local, "shard", None)
+        if s is None:
+            return
+        del self._local.shard
+        with self._lock:
+            self._shards.remove(s)
+            self._retired.merge(s)
+
+    def snapshot(self) -> Shard:
+        total = Shard()
+        with self._lock:
+            total.merge(self._retired)
+            shards = list(self._shards)
+        for s in shards:
+            total.merge(s)  # live shards are read without stopping their threads
+        return total
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        snap = self.snapshot()
+        lines = []
+        for (name, kind, help_text), value in zip(COUNTERS, snap.counters):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+
+        name = "blackjack_phase_seconds"
+        lines.append(f"# HELP {name} Time spent in each phase of a round")
+        lines.append(f"# TYPE {name} histogram")
+        for phase, h in zip(PHASES, snap.histograms):
+            cumulative = 0
+            for le, count in zip(BUCKETS, h):
+                cumulative += count
+                lines.append(f'{name}_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+            cumulative += h[len(BUCKETS)]
+            lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {cumulative}')
+            lines.append(f'{name}_sum{{phase="{phase}"}} {h[-1]}')
+            lines.append(f'{name}_count{{phase="{phase}"}} {cumulative}')
+
+        for (name, help_text), h in zip(HISTOGRAMS, snap.histograms[len(PHASES):]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for le, count in zip(BUCKETS, h):
+                cumulative += count
+                lines.append(f'{name}_bucket{{le="{le}"}} {cumulative}')
+            cumulative += h[len(BUCKETS)]
+            lines.append(f'{name}_bucket{{le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum {h[-1]}")
+            lines.append(f"{name}_count {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by the server
+REGISTRY = Registry()
+
+
+# -----------------------------
+# HTTP endpoint
+# -----------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes are not worth a log line each
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve GET /metrics on host:port from a daemon thread.
+    """
+    httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
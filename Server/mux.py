@@ -0,0 +1,154 @@
+"""
+Multiplexed game sessions over one TCP connection.
+
+A connection whose first message has type MUX_TYPE carries many independent
+sessions. Every message, in both directions, is wrapped in an envelope:
+
+    cookie (4B) | type MUX (1B) | session id (2B) | body length (2B) | body
+
+Client -> server body: one REQUEST or POLICY_REQUEST (opens that session id),
+or one or more decision frames for an open session.
+Server -> client body: the PAYLOAD (or SUMMARY) frames of one session,
+concatenated, exactly as a plain connection would receive them.
+
+A session closes after its last round and its id can be opened again.
+MuxConnection does no I/O, like GameSession: the engines read into a
+FrameBuffer, call receive(), and send what it returns.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+from Formats.codec import (
+    ProtocolError,
+    FrameBuffer,
+    HEADER_LEN,
+    MUX_HEADER_LEN,
+    PAYLOAD_DECISION_LEN,
+    decode_mux_header_from,
+    encode_mux,
+)
+from Formats.packet_formats import REQUEST_TYPE, POLICY_REQUEST_TYPE, PAYLOAD_TYPE
+from protocolServer import (
+    decode_request,
+    decode_policy_request,
+    decode_payload_decision_from,
+)
+from session import GameSession
+from metrics import REGISTRY, SESSIONS_COMPLETED
+
+MAX_SESSIONS = 1024  # open sessions per connection
+MAX_BODY = 1024      # longest client body (a whole envelope must fit the FrameBuffer)
+
+
+class MuxConnection:
+    def __init__(self, on_finish: Optional[Callable[[str, GameSession], None]] = None):
+        """
+        on_finish(team_name, session) is called as each session completes
+        (the engines log its replay record).
+        """
+        self.on_finish = on_finish
+        self.sessions: dict[int, GameSession] = {}
+        self.teams: dict[int, str] = {}
+        self.rounds_left: dict[int, int] = {}
+        self.sessions_finished = 0
+        self.stray_decisions = 0  # for session ids that are not open
+        self.metrics = REGISTRY.shard()
+
+    def receive(self, frames: FrameBuffer) -> bytes:
+        """
+        Consume every complete envelope in `frames` (a partial one stays there).
+        Returns the envelopes to send back (may be empty).
+        Raises ProtocolError on a malformed envelope or body.
+        """
+        buf = frames.buf
+        out = []
+        while len(frames) >= MUX_HEADER_LEN:
+            session_id, length = decode_mux_header_from(buf, frames.start)
+            if length > MAX_BODY:
+                raise ProtocolError("Mux body too long")
+            if len(frames) < MUX_HEADER_LEN + length:
+                break
+            offset = frames.take(MUX_HEADER_LEN + length) + MUX_HEADER_LEN
+            self._on_body(session_id, buf, offset, length, out)
+
+        return b"".join(out)
+
+    def _on_body(self, session_id: int, buf, offset: int, length: int, out: list) -> None:
+        if length < HEADER_LEN:
+            raise ProtocolError("Mux body too short")
+        msg_type = buf[offset + 4]  # type byte, right after the cookie
+
+        if msg_type == PAYLOAD_TYPE:
+            if length % PAYLOAD_DECISION_LEN:
+                raise ProtocolError("Invalid payload length")
+            self._on_decisions(session_id, buf, offset, length, out)
+            return
+
+        if msg_type not in (REQUEST_TYPE, POLICY_REQUEST_TYPE):
+            raise ProtocolError("Invalid message type")
+        if session_id in self.sessions:
+            raise ProtocolError("Session id already open")
+        if len(self.sessions) >= MAX_SESSIONS:
+            raise ProtocolError("Too many sessions on one connection")
+
+        data = bytes(buf[offset:offset + length])
+        if msg_type == POLICY_REQUEST_TYPE:
+            num_rounds, team_name, hit_table, summary = decode_policy_request(data)
+            session = GameSession(team_name)
+            for chunk in session.autoplay(num_rounds, hit_table, summary):
+                out.append(encode_mux(session_id, chunk))
+            self._finish(team_name, session)
+            return
+
+        num_rounds, team_name = decode_request(data)
+        session = GameSession(team_name)
+        if not num_rounds:
+            self._finish(team_name, session)
+            return
+        self.sessions[session_id] = session
+        self.teams[session_id] = team_name
+        self.rounds_left[session_id] = num_rounds
+        out.append(encode_mux(session_id, session.start_round()))
+
+    def _on_decisions(self, session_id: int, buf, offset: int, length: int, out: list) -> None:
+        session = self.sessions.get(session_id)
+        if session is None:
+            # Late decisions for a session that already ended (or never opened)
+            self.stray_decisions += length // PAYLOAD_DECISION_LEN
+            return
+
+        parts = []
+        end = offset + length
+        for off in range(offset, end, PAYLOAD_DECISION_LEN):
+            part = session.decide(decode_payload_decision_from(buf, off))
+            parts.append(part)
+            if part and session.round_over:
+                # The rest of the envelope was sent before the client saw this round end:
+                # stray, never applied to the next round
+                session.stray_decisions += (end - off) // PAYLOAD_DECISION_LEN - 1
+                self.rounds_left[session_id] -= 1
+                if not self.rounds_left[session_id]:
+                    del self.sessions[session_id], self.rounds_left[session_id]
+                    self._finish(self.teams.pop(session_id), session)
+                else:
+                    parts.append(session.start_round())
+                break
+
+        body = b"".join(parts)
+        if body:
+            out.append(encode_mux(session_id, body))
+
+    def open_sessions(self) -> list[tuple[str, GameSession]]:
+        """
+        (team_name, session) for every session not finished yet: the engines log
+        their replay records when the connection ends.
+        """
+        return [(self.teams[sid], session) for sid, session in self.sessions.items()]
+
+    def _finish(self, team_name: str, session: GameSession) -> None:
+        self.sessions_finished += 1
+        self.metrics.inc(SESSIONS_COMPLETED)
+        if self.on_finish is not None:
+            self.on_finish(team_name, session)
@@ -0,0 +1,200 @@
+"""
+Multi-core Blackjack simulator on the real game engine.
+
+vector_sim.py re-implements the rules in NumPy; this one plays every round
+through game.BlackjackGame (the server's own Shoe / Hand / dealer code), so
+it measures exactly what clients face. The requested rounds are split
+across a process pool:
+- worker i plays its share with its own random.Random(seed + i), one
+  BlackjackGame per strategy, all dealing from that generator
+- tallies (win, tie, loss per strategy) are written into one shared-memory
+  array, row i belonging to worker i, so nothing is pickled back and no
+  lock is needed
+Nothing is shared while rounds are played, so throughput grows with cores.
+
+Usage (from the repository root):
+    python Server/pool_sim.py --rounds 100000000 --threshold 15 16 17 --table basic_strategy.bin
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from functools import partial
+from typing import Optional
+
+import numpy as np
+
+from Formats.cards import CARD_VALUE
+from Formats.packet_formats import ROUND_WIN, ROUND_LOSS, ROUND_TIE
+from Formats.strategy_table import MAX_UP_VALUE, TABLE_SHAPE, threshold_table, load_table
+from game import BlackjackGame, Shoe, DEFAULT_DECKS
+from session import new_seed
+from vector_sim import rate_ci, conforms, simulate
+
+CHUNK = 100_000  # rounds per strategy between tally writes
+
+# Tally column of each round result
+COLUMN = {ROUND_WIN: 0, ROUND_TIE: 1, ROUND_LOSS: 2}
+
+
+# -----------------------------
+# Strategies
+# -----------------------------
+def parse_strategies(thresholds: list[int], tables: list[str]) -> list[tuple[str, bytes]]:
+    """
+    (label, hit table) per strategy, hit tables as in Formats/strategy_table.py.
+    """
+    strategies = [(f"threshold:{n}", threshold_table(n)) for n in thresholds]
+    strategies += [(f"table:{path}", bytes(load_table(path, use_mmap=False))) for path in tables]
+    return strategies
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+_tallies: Optional[np.ndarray] = None  # (workers, strategies, 3) view of the shared array, per process
+
+
+def _attach(shared, shape: tuple[int, int, int]) -> None:
+    """
+    Pool initializer: map the shared tally array into this worker.
+    """
+    global _tallies
+    _tallies = np.frombuffer(shared, dtype=np.int64).reshape(shape)
+
+
+def play_rounds(game: BlackjackGame, hit: bytes, n: int, counts: list[int]) -> None:
+    """
+    n rounds of one strategy through BlackjackGame; counts[COLUMN[result]] += 1.
+    The strategy sees the player's best total, soft flag and dealer up-card value.
+    """
+    player = game.player
+    dealer = game.dealer
+    stride = MAX_UP_VALUE + 1
+    for _ in range(n):
+        game.start_round()
+        up = CARD_VALUE[dealer.cards[0]]
+        while hit[(player.get_value() * 2 + player.is_soft()) * stride + up]:
+            result, _card = game.player_hit()
+            if result == ROUND_LOSS:
+                break
+        else:
+            result, _drawn = game.player_stand()
+        counts[COLUMN[result]] += 1
+
+
+def run_worker(worker: int, rounds: int, seed: int, decks: int, hit_tables: list[bytes]) -> None:
+    """
+    One worker's share: `rounds` rounds per strategy. Writes its running
+    tallies to row `worker` of the shared array after every chunk.
+    """
+    rng = random.Random(seed + worker)
+    row = _tallies[worker]
+    for s, hit in enumerate(hit_tables):
+        game = BlackjackGame(Shoe(decks, rng=rng)) if decks else BlackjackGame(rng=rng)
+        counts = [0, 0, 0]
+        left = rounds
+        while left > 0:
+            n = min(CHUNK, left)
+            play_rounds(game, hit, n, counts)
+            row[s] = counts
+            left -= n
+
+
+# -----------------------------
+# Pool
+# -----------------------------
+def split(rounds: int, jobs: int) -> list[int]:
+    """
+    Rounds per worker, as even as possible.
+    """
+    share, extra = divmod(rounds, jobs)
+    return [share + (i < extra) for i in range(jobs)]
+
+
+def simulate_pool(
+    hit_tables: list[bytes], rounds: int, jobs: int, seed: int, decks: int = DEFAULT_DECKS
+) -> np.ndarray:
+    """
+    Play `rounds` rounds of every strategy across `jobs` processes.
+    Returns the (strategies, 3) win/tie/loss totals.
+    """
+    shape = (jobs, len(hit_tables), 3)
+    shared = multiprocessing.RawArray("q", jobs * len(hit_tables) * 3)  # zeroed
+    work = partial(run_worker, seed=seed, decks=decks, hit_tables=hit_tables)
+    with multiprocessing.Pool(jobs, initializer=_attach, initargs=(shared, shape)) as pool:
+        pool.starmap(work, enumerate(split(rounds, jobs)))
+    return np.frombuffer(shared, dtype=np.int64).reshape(shape).sum(axis=0)
+
+
+# -----------------------------
+# Report
+# -----------------------------
+def print_strategy(label: str, counts: tuple[int, int, int]) -> None:
+    """
+    Outcome rates with 95% confidence intervals, and the house edge.
+    """
+    n = sum(counts)
+    print(f"{label}: {n:,} rounds")
+    for name, k in zip(("win", "tie", "loss"), counts):
+        p, hw = rate_ci(k, n)
+        print(f"  {name:<5}{p:8.4%} ± {hw:.4%}  [{p - hw:.4%}, {p + hw:.4%}]")
+    # Per-round house result is +1 (loss), 0 (tie) or -1 (win), as in vector_sim.print_summary
+    edge = (counts[2] - counts[0]) / n
+    var = (counts[0] + counts[2]) / n - edge * edge
+    print(f"  house edge {edge:+.4%} ± {1.96 * (var / n) ** 0.5:.4%}")
+
+
+# -----------------------------
+# Main
+# -----------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Multi-core Blackjack simulator (BlackjackGame rounds)")
+    parser.add_argument("--rounds", type=int, default=1_000_000, help="rounds per strategy")
+    parser.add_argument("--threshold", type=int, nargs="*", default=None,
+                        help="strategies: hit while player total is below N (default 17 without --table)")
+    parser.add_argument("--table", nargs="*", default=[], help="strategies: strategy_solver.py table files")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=None, help="worker i seeds with SEED + i (default random)")
+    parser.add_argument("--decks", type=int, default=DEFAULT_DECKS,
+                        help="decks per worker shoe, as the server deals; 0 = fresh deck every round")
+    parser.add_argument("--check", type=int, default=0, metavar="N",
+                        help="also play N rounds per strategy with vector_sim.py and compare (needs --decks 0)")
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.check and args.decks:
+        parser.error("--check compares against fresh-deck rounds; use --decks 0")
+
+    thresholds = args.threshold if args.threshold is not None else ([] if args.table else [17])
+    strategies = parse_strategies(thresholds, args.table)
+    if not strategies:
+        parser.error("no strategy given")
+    seed = args.seed if args.seed is not None else new_seed()
+
+    t0 = time.perf_counter()
+    totals = simulate_pool([hit for _label, hit in strategies], args.rounds, args.jobs, seed, args.decks)
+    seconds = time.perf_counter() - t0
+
+    played = int(totals.sum())
+    print(f"{played:,} rounds, {len(strategies)} strategies, {args.jobs} workers, seed {seed}: "
+          f"{seconds:.2f}s ({played / seconds:,.0f} rounds/s)")
+    ok = True
+    for (label, hit), counts in zip(strategies, totals):
+        counts = tuple(int(k) for k in counts)
+        print_strategy(label, counts)
+        if args.check:
+            policy = np.frombuffer(hit, dtype=np.uint8).reshape(TABLE_SHAPE).astype(bool)
+            same = conforms(counts, simulate(policy, args.check, seed=seed))
+            print("  vector_sim conformance:", "OK" if same else "MISMATCH")
+            ok &= same
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
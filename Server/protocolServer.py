@@ -1,11 +1,31 @@
 # Server/protocolClient.py
 
-import struct
+from Formats.cards import CARD_COUNT, CARD_RANK, CARD_SUIT
+from Formats.strategy_table import unpack_table
+from Formats.codec import (
+    ProtocolError,
+    OFFER,
+    REQUEST,
+    PAYLOAD_DECISION,
+    PAYLOAD_SERVER,
+    POLICY_REQUEST,
+    SUMMARY,
+    REQUEST_LEN,
+    PAYLOAD_DECISION_LEN,
+    POLICY_REQUEST_LEN,
+    check_header,
+    encode_name,
+    decode_name,
+)
 from Formats.packet_formats import (
     MAGIC_COOKIE,
     OFFER_TYPE,
     REQUEST_TYPE,
     PAYLOAD_TYPE,
+    POLICY_REQUEST_TYPE,
+    SUMMARY_TYPE,
+    REPLY_FRAMES,
+    REPLY_SUMMARY,
     HIT,
     STAND,
     ROUND_ONGOING,
@@ -14,33 +34,9 @@ from Formats.packet_formats import (
     ROUND_TIE,
 )
 
-# =====================
-# Exceptions
-# =====================
-
-class ProtocolError(Exception):
-    pass
-
-
-# =====================
-# Helpers
-# =====================
-
-def check_cookie_and_type(data: bytes, expected_type: int):
-    cookie, msg_type = struct.unpack("!IB", data[:5])
-    if cookie != MAGIC_COOKIE:
-        raise ProtocolError("Invalid magic cookie")
-    if msg_type != expected_type:
-        raise ProtocolError("Invalid message type")
-
-
-def encode_name(text: str, length: int) -> bytes:
-    raw = text.encode("utf-8")
-    return raw[:length].ljust(length, b"\x00")
-
-
-def decode_name(raw: bytes) -> str:
-    return raw.rstrip(b"\x00").decode("utf-8")
+# Bound once; these run for every frame
+_unpack_decision = PAYLOAD_DECISION.unpack_from
+_pack_payload_server = PAYLOAD_SERVER.pack
 
 
 # =====================
@@ -52,11 +48,10 @@ def encode_offer(tcp_port: int, server_name: str) -> bytes:
     Offer format:
     cookie (4B) | type (1B) | server port (2B) | server name (32B)
     """
-    return struct.pack(
-        "!IBH32s",
+    return OFFER.pack(
         MAGIC_COOKIE,  # I = 4 bytes
         OFFER_TYPE,  # B = 1 byte
-        tcp_port,  # B = 1 byte
+        tcp_port,  # H = 2 bytes
         encode_name(server_name, 32),  # 32 bytes
     )
 
@@ -65,42 +60,66 @@ def encode_offer(tcp_port: int, server_name: str) -> bytes:
 # Request (TCP) — Client → Server
 # =====================
 
-def decode_request(data: bytes):
+def decode_request(data) -> tuple[int, str]:
     """
     Request format:
     cookie (4B) | type (1B) | num rounds (1B) | team name (32B)
     """
-    if len(data) != 38:
+    if len(data) != REQUEST_LEN:
         raise ProtocolError("Invalid request length")
 
-    check_cookie_and_type(data, REQUEST_TYPE)
+    cookie, msg_type, num_rounds, raw_name = REQUEST.unpack_from(data)
+    check_header(cookie, msg_type, REQUEST_TYPE)
 
-    _, _, num_rounds = struct.unpack("!IBB", data[:6])
-    team_name = decode_name(data[6:38])
+    return num_rounds, decode_name(raw_name)
+
+
+def decode_policy_request(data) -> tuple[int, str, bytes, bool]:
+    """
+    Policy request format (the server plays every round with this policy):
+    cookie (4B) | type (1B) | num rounds (1B) | team name (32B) | reply mode (1B) | packed hit table (96B)
+    Returns: (num_rounds, team_name, hit table (TABLE_LEN bytes), summary reply?)
+    """
+    if len(data) != POLICY_REQUEST_LEN:
+        raise ProtocolError("Invalid policy request length")
 
-    return num_rounds, team_name
+    cookie, msg_type, num_rounds, raw_name, reply_mode, packed = POLICY_REQUEST.unpack_from(data)
+    check_header(cookie, msg_type, POLICY_REQUEST_TYPE)
+    if reply_mode not in (REPLY_FRAMES, REPLY_SUMMARY):
+        raise ProtocolError("Invalid reply mode")
+
+    return num_rounds, decode_name(raw_name), unpack_table(packed), reply_mode == REPLY_SUMMARY
 
 
 # =====================
 # Payload — Client → Server
 # =====================
 
-def decode_payload_decision(data: bytes) -> bytes:
+def decode_payload_decision_from(buf, offset: int) -> bytes:
     """
-    Payload from client:
-    cookie (4B) | type (1B) | decision (5B)
+    Decode the 10-byte decision frame at buf[offset:] in place.
+    Caller guarantees the whole frame is there.
     """
-    if len(data) != 10:
-        raise ProtocolError("Invalid payload length")
+    cookie, msg_type, decision = _unpack_decision(buf, offset)
+    if cookie != MAGIC_COOKIE or msg_type != PAYLOAD_TYPE:
+        check_header(cookie, msg_type, PAYLOAD_TYPE)
 
-    check_cookie_and_type(data, PAYLOAD_TYPE)
+    if decision == HIT:
+        return HIT
+    if decision == STAND:
+        return STAND
+    raise ProtocolError("Invalid player decision")
 
-    _, _, decision = struct.unpack("!IB5s", data)
 
-    if decision not in (HIT, STAND):
-        raise ProtocolError("Invalid player decision")
+def decode_payload_decision(data) -> bytes:
+    """
+    Payload from client:
+    cookie (4B) | type (1B) | decision (5B)
+    """
+    if len(data) != PAYLOAD_DECISION_LEN:
+        raise ProtocolError("Invalid payload length")
 
-    return decision
+    return decode_payload_decision_from(data, 0)
 
 
 # =====================
@@ -112,11 +131,26 @@ def encode_payload_server(result: int, rank: int = 0, suit: int = 0) -> bytes:
     Payload to client:
     cookie (4B) | type (1B) | result (1B) | rank (2B) | suit (1B)
     """
-    return struct.pack(
-        "!IBBHB",
+    return _pack_payload_server(
         MAGIC_COOKIE,
         PAYLOAD_TYPE,
         result,
         rank,
         suit,
     )
+
+
+def encode_summary(result: int, player_total: int, dealer_total: int) -> bytes:
+    """
+    Round summary (policy sessions with summary reply):
+    cookie (4B) | type (1B) | result (1B) | player total (1B) | dealer total (1B)
+    """
+    return SUMMARY.pack(MAGIC_COOKIE, SUMMARY_TYPE, result, player_total, dealer_total)
+
+
+# Every frame the server can send is known up front: 4 results x (52 cards + no card).
+# Built once at import; PAYLOAD_FRAMES[result][card code or NO_CARD] -> ready-to-send 9 bytes.
+PAYLOAD_FRAMES = tuple(
+    tuple(encode_payload_server(result, CARD_RANK[card], CARD_SUIT[card]) for card in range(CARD_COUNT + 1))
+    for result in range(max(ROUND_ONGOING, ROUND_TIE, ROUND_LOSS, ROUND_WIN) + 1)
+)
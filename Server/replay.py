@@ -0,0 +1,152 @@
+"""
+Deterministic session replay.
+
+Every GameSession shuffles with its own random.Random(seed), and logs a
+"Session record" (seed, decks, the decisions it applied, round results).
+Given that record, this re-deals the same shoe through BlackjackGame and
+re-applies the decisions, with no network and no waiting on a player:
+every card and result comes out exactly as the client saw them.
+
+Usage (from the repository root):
+    python Server/replay.py --seed 123 --decks 6 --decisions HSS... [--results 3121...] [--show]
+    python Server/replay.py --log server.jsonl [--team NAME] [--seed N] [--show]
+      (records from a server run with --log-file; exits 1 if any replayed
+       result differs from the recorded one)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Optional
+
+from Formats.cards import CARD_RANK, CARD_SUIT
+from Formats.packet_formats import ROUND_ONGOING, ROUND_WIN, ROUND_LOSS, ROUND_TIE
+from game import BlackjackGame, Shoe, DEFAULT_DECKS
+
+RESULT_NAMES = {ROUND_WIN: "win", ROUND_LOSS: "loss", ROUND_TIE: "tie"}
+
+
+class ReplayedRound:
+    __slots__ = ("player", "dealer", "result")
+
+    def __init__(self, player: list, dealer: list, result: int):
+        self.player = player  # card codes, as dealt
+        self.dealer = dealer
+        self.result = result  # ROUND_ONGOING = the record stops mid-round
+
+
+def replay(seed: int, decks: int, decisions: str, rounds: Optional[int] = None) -> list[ReplayedRound]:
+    """
+    Re-run a session: same shoe as GameSession(seed) with `decks` decks,
+    decisions "H"/"S" applied in order. Plays `rounds` rounds, or until the
+    decisions run out.
+    """
+    game = BlackjackGame(Shoe(decks, rng=random.Random(seed)))
+    i = 0
+    out = []
+
+    # Every round takes at least one decision, so no decisions left = no more rounds
+    while i < len(decisions) and (rounds is None or len(out) < rounds):
+        game.start_round()
+        result = ROUND_ONGOING
+        while result == ROUND_ONGOING and i < len(decisions):
+            move = decisions[i]
+            i += 1
+            if move == "H":
+                result, _card = game.player_hit()
+            elif move == "S":
+                result, _dealer_drawn = game.player_stand()
+            else:
+                raise ValueError(f"Invalid decision code {move!r}")
+
+        out.append(ReplayedRound(list(game.player.cards), list(game.dealer.cards), result))
+        if result == ROUND_ONGOING:
+            break  # record ends mid-round (client disconnected)
+
+    return out
+
+
+def read_records(path: str, team: Optional[str] = None, seed: Optional[int] = None) -> list[dict]:
+    """
+    Session records from an eventlog JSON-lines file, optionally filtered.
+    """
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            rec = json.loads(line)
+            if "decisions" not in rec or "seed" not in rec:
+                continue
+            if team is not None and rec.get("team") != team:
+                continue
+            if seed is not None and rec["seed"] != seed:
+                continue
+            records.append(rec)
+    return records
+
+
+def format_hand(cards: list) -> str:
+    return " ".join(f"{CARD_RANK[c]}/{CARD_SUIT[c]}" for c in cards)
+
+
+def check(rec: dict, show: bool) -> tuple[bool, int]:
+    """
+    Replay one record; print it with --show.
+    Returns: (every result matches, rounds replayed)
+    """
+    rounds = replay(rec["seed"], rec["decks"], rec["decisions"])
+    recorded = rec.get("results")
+    ok = True
+
+    for i, rnd in enumerate(rounds):
+        expected = int(recorded[i]) if recorded is not None and i < len(recorded) else None
+        mismatch = expected is not None and expected != rnd.result
+        ok &= not mismatch
+        if show or mismatch:
+            status = RESULT_NAMES.get(rnd.result, "unfinished")
+            note = f"  MISMATCH (recorded {RESULT_NAMES.get(expected, expected)})" if mismatch else ""
+            print(f"  round {i + 1}: player [{format_hand(rnd.player)}] dealer [{format_hand(rnd.dealer)}] -> {status}{note}")
+
+    if recorded is not None and len(recorded) != sum(r.result != ROUND_ONGOING for r in rounds):
+        ok = False
+        print(f"  MISMATCH: {len(recorded)} results recorded, {len(rounds)} rounds replayed")
+    return ok, len(rounds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded Blackjack sessions")
+    parser.add_argument("--log", default=None, help="eventlog JSON-lines file with session records")
+    parser.add_argument("--team", default=None, help="with --log: only this team's sessions")
+    parser.add_argument("--seed", type=int, default=None, help="session seed (with --log: filter)")
+    parser.add_argument("--decks", type=int, default=DEFAULT_DECKS)
+    parser.add_argument("--decisions", default=None, help='applied decisions, e.g. "HSSHS"')
+    parser.add_argument("--results", default=None, help="recorded results to compare against, e.g. \"3121\"")
+    parser.add_argument("--show", action="store_true", help="print every replayed round")
+    args = parser.parse_args()
+
+    if args.log:
+        records = read_records(args.log, args.team, args.seed)
+    elif args.seed is not None and args.decisions is not None:
+        records = [{"seed": args.seed, "decks": args.decks, "decisions": args.decisions, "results": args.results}]
+    else:
+        parser.error("give --log, or --seed and --decisions")
+
+    t0 = time.perf_counter()
+    failed = 0
+    total_rounds = 0
+    for rec in records:
+        print(f"team={rec.get('team', '?')} seed={rec['seed']} decks={rec['decks']}")
+        ok, n = check(rec, args.show)
+        failed += not ok
+        total_rounds += n
+    elapsed = time.perf_counter() - t0
+
+    print(f"{len(records)} session(s), {total_rounds} rounds replayed in {elapsed:.3f}s, {failed} mismatched")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
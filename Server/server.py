@@ -11,27 +11,63 @@ Responsibilities (per PDF + shared protocol):
 
 Uses:
 - protocolServer.py for packet encode/decode
+- session.py for the per-connection round state machine
 - game.py for Blackjack logic (deck/hand/winner)
 - packet_formats.py for constants
+- metrics.py for the Prometheus metrics endpoint (--metrics-port)
+- eventlog.py for queued, non-blocking client event logging (--log-file, --log-sample)
+- journal.py for the binary per-round audit journal (--journal)
+- admission.py for connection limits, fast rejects and idle/session deadlines
+- table.py for shared-table mode (--table-seats)
+- shoe_pool.py for shoes shuffled in the background (--shoe-pool)
+- Formats/transport.py for in-process connections (connect_memory)
 """
 
 from __future__ import annotations
 
+import argparse
+import multiprocessing
+import queue
 import socket
 import sys
 import threading
 import time
 from typing import Optional
 
-from Formats.packet_formats import CLIENT_UDP_PORT, ROUND_ONGOING, HIT, STAND
+from Formats.codec import FrameBuffer, HEADER_LEN, REQUEST_LEN, POLICY_REQUEST_LEN
+from Formats.packet_formats import CLIENT_UDP_PORT, POLICY_REQUEST_TYPE, MUX_TYPE
+from Formats.transport import Transport, memory_pair
 from protocolServer import (
     ProtocolError,
     encode_offer,
     decode_request,
-    decode_payload_decision,
-    encode_payload_server,
+    decode_policy_request,
 )
-from game import BlackjackGame
+from session import GameSession
+from mux import MuxConnection
+import aio_server
+import admission
+import metrics
+import table
+from admission import Deadline, reset_on_close
+from journal import Journal
+from shoe_pool import ShoePool, DEFAULT_POOL_SIZE
+import eventlog
+from eventlog import (
+    CLIENT_CONNECTED,
+    ROUND_START,
+    ROUND_END,
+    CLIENT_FINISHED,
+    TABLE_FINISHED,
+    SESSION_RECORD,
+    MUX_CONNECTED,
+    MUX_FINISHED,
+    CLIENT_DISCONNECTED,
+    CLIENT_REJECTED,
+    CLIENT_PROTOCOL_ERROR,
+    CLIENT_UNEXPECTED_ERROR,
+)
+from metrics import REGISTRY, ACTIVE_CONNECTIONS, SESSIONS_COMPLETED, PROTOCOL_ERRORS, TIMEOUTS, REJECTED
 
 
 # -----------------------------
@@ -52,43 +88,6 @@ def get_local_ip() -> str:
         return "127.0.0.1"
 
 
-def recv_exact(sock: socket.socket, n: int) -> bytes:
-    """
-    Receive exactly n bytes from a TCP socket, or raise if connection closes / timeout.
-    """
-    chunks = []
-    received = 0
-    while received < n:
-        chunk = sock.recv(n - received)
-        if not chunk:
-            raise ConnectionError("Client closed the TCP connection.")
-        chunks.append(chunk)
-        received += len(chunk)
-    return b"".join(chunks)
-
-
-def safe_drain_decisions(sock: socket.socket, attempts: int = 1) -> None:
-    """
-    Client implementation may send a decision after every ROUND_ONGOING payload it receives.
-    During phases where the server doesn't *need* a decision (initial reveal / dealer reveal),
-    we non-blockingly drain a few decisions so the TCP stream stays aligned.
-    """
-    prev_timeout = sock.gettimeout()
-    try:
-        sock.settimeout(0.01)
-        for _ in range(attempts):
-            try:
-                data = recv_exact(sock, 10)  # client->server payload length
-                _ = decode_payload_decision(data)  # validate & ignore
-            except (TimeoutError, socket.timeout):
-                break
-            except (ProtocolError, ConnectionError):
-                # If it's garbage/closed, just stop draining; caller will handle later.
-                break
-    finally:
-        sock.settimeout(prev_timeout)
-
-
 # -----------------------------
 # UDP offer broadcaster
 # -----------------------------
@@ -117,147 +116,500 @@ def offer_broadcaster(stop_event: threading.Event, tcp_port: int, server_name: s
 # -----------------------------
 # Game flow (per-client)
 # -----------------------------
-def send_payload(sock: socket.socket, result: int, card: Optional[tuple[int, int]]) -> None:
+def play_one_round(
+    conn: Transport, session: GameSession, frames: FrameBuffer, deadline: Optional[Deadline] = None
+) -> None:
     """
-    Send server->client payload (9 bytes):
-      cookie(4) | type(1) | result(1) | rank(2) | suit(1)
+    One blackjack round, driven by the session state machine.
+    We reveal player's 2 cards + dealer up-card, then answer each Hit/Stand
+    as soon as it arrives. On Stand the hidden card, dealer draws and the
+    final result go out together. No waiting on a timer, except once per
+    session while settling (settle_replies).
+    Every read pushes the connection's idle deadline back.
     """
-    if card is None:
-        rank, suit = 0, 0
-    else:
-        rank, suit = card
-    sock.sendall(encode_payload_server(result=result, rank=rank, suit=suit))
+    if session.settling:
+        settle_replies(conn, session, frames, deadline)
+    conn.sendall(session.start_round())
+
+    while not session.round_over:
+        if not frames.recv_into(conn):
+            raise ConnectionError("Client closed the TCP connection.")
+        if deadline is not None:
+            deadline.touch()
+        out = session.receive(frames)
+        if out:
+            conn.sendall(out)
 
 
-def play_one_round(sock: socket.socket) -> None:
+def settle_replies(
+    conn: Transport, session: GameSession, frames: FrameBuffer, deadline: Optional[Deadline] = None
+) -> None:
     """
-    One blackjack round using BlackjackGame.
-    We reveal:
-    - Player 2 cards (one-by-one)
-    - Dealer up-card
-    Then:
-    - Player decisions Hit/Stand
-    - If Stand: reveal dealer hidden card + any dealer draws
-    - Finally: send final result (with rank/suit = 0)
+    Before the next deal, wait up to session.reply_grace for the client to
+    answer the dealer's reveal (once per session, see GameSession.settling).
     """
-    game = BlackjackGame()  # create game
-    game.start_round()
+    conn.settimeout(session.reply_grace)
+    try:
+        while session.settling:
+            if not frames.recv_into(conn):
+                raise ConnectionError("Client closed the TCP connection.")
+            if deadline is not None:
+                deadline.touch()
+            session.receive(frames)  # no round in progress: nothing to send back
+    except TimeoutError:
+        session.no_replies()
+    finally:
+        conn.settimeout(None)
 
-    # Initial reveal sequence (PDF: player gets 2 face-up; dealer shows 1 card)
-    player_cards = list(game.player.cards)  # 2 cards
-    dealer_up = game.dealer.cards[0]  # visible
-    dealer_hidden = game.dealer.cards[1]  # hidden until dealer turn
 
-    # Reveal player cards (ongoing)
-    for c in player_cards:
-        send_payload(sock, ROUND_ONGOING, c)
-        safe_drain_decisions(sock, attempts=1)
+def read_request(conn: Transport, frames: FrameBuffer) -> tuple[int, str, Optional[tuple[bytes, bool]]]:
+    """
+    Read a REQUEST, or a POLICY_REQUEST (same first 38 bytes, then the policy).
+    Returns: (num_rounds, team_name, policy) with policy = (hit_table, summary) or None.
+    """
+    head = frames.recv_exact(conn, REQUEST_LEN)
+    if head[4] != POLICY_REQUEST_TYPE:  # type byte, right after the cookie
+        num_rounds, team_name = decode_request(head)
+        return num_rounds, team_name, None
+
+    head = bytes(head)  # the next read may reuse the buffer
+    data = head + bytes(frames.recv_exact(conn, POLICY_REQUEST_LEN - REQUEST_LEN))
+    num_rounds, team_name, hit_table, summary = decode_policy_request(data)
+    return num_rounds, team_name, (hit_table, summary)
 
-    # Reveal dealer up-card (ongoing)
-    send_payload(sock, ROUND_ONGOING, dealer_up)
-    safe_drain_decisions(sock, attempts=1)
 
-    # Player turn
-    while True:
-        # Wait for decision
-        data = recv_exact(sock, 10)
-        decision = decode_payload_decision(data)
+def play_policy_rounds(conn: Transport, session: GameSession, num_rounds: int, policy: tuple[bytes, bool]) -> None:
+    """
+    POLICY_REQUEST session: the server makes every decision from the client's
+    table, so nothing is read; the frames (or summaries) go out in batches.
+    """
+    hit_table, summary = policy
+    for chunk in session.autoplay(num_rounds, hit_table, summary):
+        conn.sendall(chunk)
 
-        if decision == HIT:
-            result, card = game.player_hit()
-            send_payload(sock, result, card)
 
-            # If bust, round is over (result will be LOSS). Stop.
-            if result != ROUND_ONGOING:
-                return
+def play_table(
+    conn: Transport, frames: FrameBuffer, team_name: str, num_rounds: int, deadline: Deadline
+) -> table.Seat:
+    """
+    Shared-table session (--table-seats): this thread only feeds the client's
+    decisions to the table. Cards and results are queued by whichever thread
+    moves the table on (another seat's, or the deadline ticker's) and written
+    by this seat's sender thread, so neither the table's lock nor the ticker
+    ever waits on a client that stops reading.
+    Returns the seat once it played all its rounds.
+    """
+    outbox: queue.SimpleQueue = queue.SimpleQueue()  # frames to write; None = stop
 
-        elif decision == STAND:
-            # Dealer turn begins:
-            # 1) reveal hidden card
-            send_payload(sock, ROUND_ONGOING, dealer_hidden)
-            safe_drain_decisions(sock, attempts=1)
+    def send(data: bytes) -> None:
+        deadline.touch()  # waiting for the other seats is not idling
+        outbox.put(data)
 
-            # 2) dealer draws until >=17 (game.player_stand does that)
-            final_result, dealer_drawn = game.player_stand()
+    def sender() -> None:
+        try:
+            while (data := outbox.get()) is not None:
+                conn.sendall(data)
+        except OSError:
+            pass  # client gone (or the deadline shut the connection); the recv loop sees it too
 
-            for c in dealer_drawn:
-                send_payload(sock, ROUND_ONGOING, c)
-                safe_drain_decisions(sock, attempts=1)
+    writer = threading.Thread(target=sender, name=f"table-send-{team_name}", daemon=True)
+    writer.start()
+    # When the seat is done, end this thread's blocking recv
+    seat = table.TABLES.seat(team_name, num_rounds, send, lambda: conn.shutdown(socket.SHUT_RD))
+    try:
+        while frames.recv_into(conn):
+            deadline.touch()
+            seat.table.receive(seat, frames)
+    finally:
+        seat.table.leave(seat)
+        outbox.put(None)
+        writer.join()  # everything queued is on the wire before the connection closes
+    if not seat.done:
+        raise ConnectionError("Client closed the TCP connection.")
+    return seat
 
-            # 3) final result
-            send_payload(sock, final_result, None)
-            return
 
-        else:
-            # Should not happen (protocol validates), but keep safe:
-            send_payload(sock, ROUND_ONGOING, None)
+def play_mux(conn: Transport, frames: FrameBuffer, deadline: Optional[Deadline] = None) -> int:
+    """
+    Multiplexed connection: route envelopes to their sessions until the client
+    closes the connection. Returns the number of sessions completed.
+    """
+    log = eventlog.LOG
+    mux = MuxConnection(lambda team, session: log.record(SESSION_RECORD, team=team, **session.record()))
+    try:
+        while frames.recv_into(conn):
+            if deadline is not None:
+                deadline.touch()
+            out = mux.receive(frames)
+            if out:
+                conn.sendall(out)
+    finally:
+        for team, session in mux.open_sessions():  # cut off mid-session
+            log.record(SESSION_RECORD, team=team, **session.record())
+    return mux.sessions_finished
 
 
-def handle_client(conn: socket.socket, addr: tuple[str, int]) -> None:
+def handle_client(conn: Transport, addr: tuple[str, int]) -> None:
     """
-    Serve one TCP client connection until it finishes its requested rounds or disconnects.
+    Serve one client connection until it finishes its requested rounds or disconnects.
+    The connection was admitted by serve_threads (or connect_memory); its slot is released here.
     """
     client_ip, client_port = addr
-    conn.settimeout(30.0)
+    log = eventlog.LOG
+    gate = admission.ADMISSION
+    # No socket timeout: the deadline wheel shuts the socket down, which wakes up a blocked recv/send
+    deadline = gate.watch(lambda: conn.shutdown(socket.SHUT_RDWR))
+    stats = REGISTRY.shard()
+    stats.inc(ACTIVE_CONNECTIONS)
+    session = None
 
     try:
-        # REQUEST is 38 bytes in our protocolServer.decode_request
-        req = recv_exact(conn, 38)
-        num_rounds, team_name = decode_request(req)
+        frames = FrameBuffer()  # reused for every read on this connection
+        frames.fill(conn, HEADER_LEN)
+        if frames.buf[frames.start + 4] == MUX_TYPE:  # first message's type byte
+            log.info(MUX_CONNECTED, ip=client_ip, port=client_port)
+            deadline.clear_session()
+            sessions = play_mux(conn, frames, deadline)
+            if deadline.expired:
+                raise ConnectionError("Connection deadline passed.")
+            log.info(MUX_FINISHED, ip=client_ip, port=client_port, sessions=sessions)
+            return
 
-        print(f"Client connected from {client_ip}:{client_port} | team='{team_name}' | rounds={num_rounds}")
+        num_rounds, team_name, policy = read_request(conn, frames)
+        deadline.touch()
 
-        for r in range(1, num_rounds + 1):
-            print(f"[{team_name}] Round {r}/{num_rounds} start")
-            play_one_round(conn)
-            print(f"[{team_name}] Round {r}/{num_rounds} end")
+        log.info(CLIENT_CONNECTED, ip=client_ip, port=client_port, team=team_name, rounds=num_rounds,
+                 policy=policy is not None)
 
-        print(f"Client finished: {team_name} ({client_ip}:{client_port})")
+        if policy is None and table.TABLES is not None:
+            seat = play_table(conn, frames, team_name, num_rounds, deadline)
+            log.info(TABLE_FINISHED, team=team_name, ip=client_ip, port=client_port, table=seat.table.number,
+                     seat=seat.number, timeouts=seat.timeouts)
+            stats.inc(SESSIONS_COMPLETED)
+            return
 
-    except (ConnectionError, TimeoutError, socket.timeout) as e:
-        print(f"Client {client_ip}:{client_port} disconnected/timeout: {e}")
+        session = GameSession(team_name)
+        if policy is not None:
+            play_policy_rounds(conn, session, num_rounds, policy)
+        else:
+            for r in range(1, num_rounds + 1):
+                log.debug(ROUND_START, team=team_name, round=r, rounds=num_rounds)
+                play_one_round(conn, session, frames, deadline)
+                log.debug(ROUND_END, team=team_name, round=r, rounds=num_rounds)
+
+        log.info(CLIENT_FINISHED, team=team_name, ip=client_ip, port=client_port)
+        stats.inc(SESSIONS_COMPLETED)
+
+    except ConnectionError as e:
+        error = str(e)
+        if deadline.expired:  # the wheel closed it, not the client
+            stats.inc(TIMEOUTS)
+            error = f"{deadline.expired} timeout"
+        log.warning(CLIENT_DISCONNECTED, ip=client_ip, port=client_port, error=error)
     except ProtocolError as e:
-        print(f"Protocol error from {client_ip}:{client_port}: {e}")
+        stats.inc(PROTOCOL_ERRORS)
+        log.warning(CLIENT_PROTOCOL_ERROR, ip=client_ip, port=client_port, error=str(e))
     except Exception as e:
-        print(f"Unexpected error with {client_ip}:{client_port}: {e}")
+        log.error(CLIENT_UNEXPECTED_ERROR, ip=client_ip, port=client_port, error=repr(e))
     finally:
+        if session is not None:  # finished or not: replay.py handles a record that ends mid-round
+            log.record(SESSION_RECORD, team=team_name, **session.record())
+        deadline.cancel()
         try:
             conn.close()
         except OSError:
             pass
+        gate.release(client_ip)
+        stats.inc(ACTIVE_CONNECTIONS, -1)
+        REGISTRY.release()  # this thread ends here; fold its counts into the totals
+
+
+# -----------------------------
+# Accept loops / worker processes
+# -----------------------------
+def serve_threads(tcp: socket.socket) -> None:
+    """
+    Thread-per-connection accept loop. Connections over the admission limits
+    are reset right here, before a thread is started for them.
+    """
+    gate = admission.ADMISSION
+    gate.wheel.start()
+    stats = REGISTRY.shard()
+    while True:
+        conn, addr = tcp.accept()  # conn = client's socket, addr = (IP, port)
+        reason = gate.admit(addr[0])
+        if reason is not None:
+            reset_on_close(conn)
+            conn.close()
+            stats.inc(REJECTED)
+            eventlog.LOG.warning(CLIENT_REJECTED, ip=addr[0], port=addr[1], reason=reason)
+            continue
+        # Frames are tiny and answered one at a time; don't let Nagle hold them for a delayed ACK
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        th = threading.Thread(target=handle_client, args=(conn, addr), daemon=True)
+        th.start()
+
+
+def connect_memory(addr: tuple[str, int] = ("memory", 0)) -> Transport:
+    """
+    In-process client connection: same admission and handle_client thread as
+    a TCP client, over a memory_pair() instead of a socket. Returns the
+    client's end, for client.play_session() or any other blocking client.
+    """
+    gate = admission.ADMISSION
+    gate.wheel.start()
+    reason = gate.admit(addr[0])
+    if reason is not None:
+        raise ConnectionRefusedError(reason)
+    client, conn = memory_pair()
+    threading.Thread(target=handle_client, args=(conn, addr), daemon=True).start()
+    return client
+
+
+def serve(tcp: socket.socket, engine: str) -> None:
+    """
+    Accept clients forever with the chosen engine ("thread" or "asyncio").
+    """
+    if engine == "asyncio":
+        aio_server.run(tcp)
+    else:
+        serve_threads(tcp)
+
+
+def open_listener(port: int = 0, reuse_port: bool = False) -> socket.socket:
+    """
+    Bound (not yet listening) TCP socket. port=0 picks any free port.
+    With reuse_port, every process binding the same port gets its own accept queue.
+    """
+    tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)  # create TCP socket with IPv4 protocol
+    tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # avoid bind
+    if reuse_port:
+        tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    tcp.bind(("", port))
+    return tcp
+
+
+def worker_main(
+    listener: "socket.socket | int",
+    engine: str,
+    decks: int,
+    metrics_port: int = 0,
+    log_options: Optional[dict] = None,
+    seed: Optional[int] = None,
+    journal_options: Optional[dict] = None,
+    admission_options: Optional[dict] = None,
+    table_options: Optional[dict] = None,
+    shoe_pool: int = 0,
+) -> None:
+    """
+    Worker process body. `listener` is either the shared listening socket,
+    or a port number to bind again with SO_REUSEPORT.
+    Each worker serves its own metrics on `metrics_port` (0 = off),
+    writes its own journal segments and fills its own shoe pool.
+    """
+    GameSession.decks = decks  # spawned (not forked) workers don't inherit it
+    if seed is not None:
+        GameSession.seed_from(seed)
+    if journal_options:
+        GameSession.journal = Journal(**journal_options)
+    admission.configure(**(admission_options or {}))
+    table.configure(**(table_options or {}))
+    if shoe_pool:
+        GameSession.shoes = ShoePool(shoe_pool, decks, GameSession.next_seed).start()
+    # A forked child has no log writer thread; start its own (appending to the same file)
+    eventlog.configure(**(log_options or {}))
+    if metrics_port:
+        metrics.start_http_server(metrics_port)
+    if isinstance(listener, int):
+        tcp = open_listener(listener, reuse_port=True)
+        tcp.listen(admission.ADMISSION.backlog)
+    else:
+        tcp = listener
+    try:
+        serve(tcp, engine)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tcp.close()
+
+
+def start_workers(
+    tcp: socket.socket,
+    workers: int,
+    engine: str,
+    reuse_port: bool,
+    metrics_port: int = 0,
+    log_options: Optional[dict] = None,
+    seed: Optional[int] = None,
+    journal_options: Optional[dict] = None,
+    admission_options: Optional[dict] = None,
+    table_options: Optional[dict] = None,
+    shoe_pool: int = 0,
+) -> list[multiprocessing.Process]:
+    """
+    Start `workers` accept processes for the port `tcp` is bound to.
+    With metrics_port, worker i serves its metrics on metrics_port + i.
+    With seed, worker i numbers its session seeds from seed + i * 2**32.
+    Admission limits and shared tables are per worker.
+    """
+    listener = tcp.getsockname()[1] if reuse_port else tcp
+    procs = []
+    for i in range(workers):
+        port = metrics_port + i if metrics_port else 0
+        worker_seed = None if seed is None else seed + (i << 32)
+        p = multiprocessing.Process(
+            target=worker_main,
+            args=(listener, engine, GameSession.decks, port, log_options, worker_seed, journal_options,
+                  admission_options, table_options, shoe_pool),
+            daemon=True,
+        )
+        p.start()
+        procs.append(p)
+    return procs
 
 
 # -----------------------------
 # Main (runs forever)
 # -----------------------------
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Blackjack hackathon server")
+    parser.add_argument(
+        "--engine",
+        choices=("thread", "asyncio"),
+        default="thread",
+        help="thread: one thread per client (default); asyncio: all clients on one event loop",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="accept in N worker processes sharing the TCP port (default 1: serve in this process)",
+    )
+    parser.add_argument(
+        "--decks",
+        type=int,
+        default=GameSession.decks,
+        help=f"decks in each session's shoe (default {GameSession.decks})",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="serve Prometheus metrics on 127.0.0.1:PORT/metrics (workers use PORT, PORT+1, ...; default off)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="number session seeds from this value (reproducible runs; default: random seed per session)",
+    )
+    parser.add_argument("--max-sessions", type=int, default=0,
+                        help="serve at most N connections at once and reset the rest (default 0: no limit)")
+    parser.add_argument("--max-per-ip", type=int, default=0,
+                        help="at most N connections at once from one client IP (default 0: no limit)")
+    parser.add_argument("--backlog", type=int, default=admission.DEFAULT_BACKLOG,
+                        help=f"listen backlog: connections waiting to be accepted (default {admission.DEFAULT_BACKLOG})")
+    parser.add_argument("--idle-timeout", type=float, default=admission.DEFAULT_IDLE_TIMEOUT, metavar="SECONDS",
+                        help="drop a client that sends no complete message for this long (default 30, 0 = never)")
+    parser.add_argument("--session-timeout", type=float, default=admission.DEFAULT_SESSION_TIMEOUT, metavar="SECONDS",
+                        help="drop a non-multiplexed connection open this long (default 3600, 0 = never)")
+    parser.add_argument("--table-seats", type=int, default=0, metavar="N",
+                        help="seat clients at shared tables of N seats (one shoe and dealer per table; "
+                             "default 0: a private game per client)")
+    parser.add_argument("--decision-timeout", type=float, default=table.DEFAULT_DECISION_TIMEOUT, metavar="SECONDS",
+                        help=f"at a shared table, stand for a seat that has not decided in this long "
+                             f"(default {table.DEFAULT_DECISION_TIMEOUT:g}, 0 = wait)")
+    parser.add_argument("--shoe-pool", type=int, default=0, metavar="N", const=DEFAULT_POOL_SIZE, nargs="?",
+                        help=f"keep N shuffled shoes ready and shuffle every shoe in the background "
+                             f"(--shoe-pool alone: {DEFAULT_POOL_SIZE}; default 0: shuffle inline)")
+    parser.add_argument("--journal", default=None, metavar="DIR",
+                        help="append every finished round to binary journal segments in DIR")
+    parser.add_argument("--journal-fsync", type=float, default=1.0, metavar="SECONDS",
+                        help="fsync the journal at most this often (default 1.0)")
+    parser.add_argument("--log-file", default=None, help="also write client events as JSON lines to this file")
+    parser.add_argument(
+        "--log-sample",
+        action="append",
+        default=[],
+        metavar="LEVEL=N",
+        help="keep 1 in N events of LEVEL, e.g. DEBUG=1000 for per-round lines (repeatable)",
+    )
+    parser.add_argument(
+        "--log-console",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="print client events to stdout (default on)",
+    )
+    args = parser.parse_args(argv)
+    try:
+        args.log_sample = eventlog.parse_sample(args.log_sample)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
 def main() -> None:
+    args = parse_args()
+    GameSession.decks = args.decks
+    if args.seed is not None:
+        GameSession.seed_from(args.seed)
+    log_options = {"path": args.log_file, "sample": args.log_sample, "console": args.log_console}
+    eventlog.configure(**log_options)
+    journal_options = {"directory": args.journal, "fsync_interval": args.journal_fsync} if args.journal else None
+    admission_options = {
+        "max_sessions": args.max_sessions,
+        "max_per_ip": args.max_per_ip,
+        "idle_timeout": args.idle_timeout,
+        "session_timeout": args.session_timeout,
+        "backlog": args.backlog,
+    }
+    admission.configure(**admission_options)
+    table_options = {"seats": args.table_seats, "decision_timeout": args.decision_timeout}
+    table.configure(**table_options)
     server_name = input("Enter server/team name: ").strip() or "BlackjackServer"
 
-    # TCP server socket (pick any available port)
-    tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)  # create TCP socket with IPv4 protocol
-    tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # avoid bind
-    tcp.bind(("", 0))  # any port
-    tcp.listen()  # listen
+    # TCP server socket (pick any available port).
+    # With several workers and SO_REUSEPORT, this socket only reserves the port:
+    # each worker binds its own socket to it and the kernel spreads connections.
+    # Without SO_REUSEPORT the workers share this one listening socket.
+    reuse_port = args.workers > 1 and hasattr(socket, "SO_REUSEPORT")
+    tcp = open_listener(reuse_port=reuse_port)
+    if not reuse_port:
+        tcp.listen(args.backlog)  # listen; a full queue makes new clients wait or retry
 
     tcp_port = tcp.getsockname()[1]
     ip = get_local_ip()
 
-    print(f"Server started, listening on IP address {ip} (TCP port {tcp_port})")
+    print(f"Server started, listening on IP address {ip} "
+          f"(TCP port {tcp_port}, {args.engine} engine, {args.workers} worker(s))")
 
-    # UDP offer broadcaster thread
+    # UDP offer broadcaster thread - only here, so the network sees one OFFER per second
     stop_event = threading.Event()
     t = threading.Thread(target=offer_broadcaster, args=(stop_event, tcp_port, server_name), daemon=True)
     t.start()
 
     try:
-        while True:
-            conn, addr = tcp.accept()  # conn = client's socket, addr = (IP, port)
-            th = threading.Thread(target=handle_client, args=(conn, addr), daemon=True)
-            th.start()
+        if args.workers > 1:
+            procs = start_workers(
+                tcp, args.workers, args.engine, reuse_port, args.metrics_port, log_options, args.seed,
+                journal_options, admission_options, table_options, args.shoe_pool,
+            )
+            for p in procs:
+                p.join()
+        else:
+            if args.metrics_port:
+                metrics.start_http_server(args.metrics_port)
+            if journal_options:
+                GameSession.journal = Journal(**journal_options)
+            if args.shoe_pool:
+                GameSession.shoes = ShoePool(args.shoe_pool, GameSession.decks, GameSession.next_seed).start()
+            serve(tcp, args.engine)
     except KeyboardInterrupt:
         print("\nServer exiting.")
     finally:
         stop_event.set()
+        if GameSession.journal is not None:
+            GameSession.journal.close()  # last batch + fsync
         try:
             tcp.close()
         except OSError:
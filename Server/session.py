@@ -0,0 +1,298 @@
+"""
+Per-connection round state machine for the Blackjack server.
+
+GameSession does no I/O: the engines (thread / asyncio) read client bytes
+into a per-connection FrameBuffer, hand it to receive(), and send back
+whatever it returns.
+Because the machine knows when a decision is due (after the initial deal and
+after every Hit card), decisions arriving at any other time are consumed and
+dropped as they come in, instead of polling the socket with a short timeout.
+
+A client may also answer every ROUND_ONGOING frame, including the dealer's
+reveal after a Stand. Those answers can reach the server after the next
+round was dealt, so the session counts the reveal frames still unanswered
+and drops that many decisions before applying any. Whether the client
+answers them at all is learned once per session: after its first Stand the
+engine waits up to reply_grace for an answer before dealing on (settling).
+
+Uses:
+- protocolServer.py for packet encode/decode
+- game.py for Blackjack logic (deck/hand/winner)
+- metrics.py for rounds completed and per-phase latency histograms
+- journal.py (optional) for the per-round audit trail
+- shoe_pool.py (optional) for shoes shuffled off the request path
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+from time import perf_counter
+from typing import Iterator, Optional
+
+from Formats.cards import CARD_VALUE, NO_CARD
+from Formats.codec import FrameBuffer, PAYLOAD_DECISION_LEN, encode_name
+from Formats.packet_formats import ROUND_ONGOING, HIT, STAND
+from Formats.strategy_table import table_index
+from protocolServer import PAYLOAD_FRAMES, decode_payload_decision_from, encode_summary
+from game import BlackjackGame, Shoe, DEFAULT_DECKS
+from journal import Journal
+from shoe_pool import ShoePool
+from metrics import (
+    REGISTRY,
+    ROUNDS_COMPLETED,
+    PHASE_INITIAL_DEAL,
+    PHASE_DECISION_WAIT,
+    PHASE_DEALER_REVEAL,
+)
+
+
+# Decision log codes (GameSession.decisions, replay.py)
+DECISION_CODES = {HIT: ord("H"), STAND: ord("S")}
+
+
+def new_seed() -> int:
+    """
+    Fresh 64-bit session seed (from the OS, not the shared module RNG).
+    """
+    return random.SystemRandom().getrandbits(64)
+
+
+# Policy sessions: rounds played per chunk handed to the engine (one send each)
+AUTOPLAY_BATCH = 32
+
+# Longest the engines wait, once per session, for a client to answer the dealer's reveal
+REPLY_GRACE = 0.05
+
+
+def payload_frame(result: int, card: int = NO_CARD) -> bytes:
+    """
+    Server->client payload (9 bytes) for a card code, or rank/suit = 0 for NO_CARD.
+    Looked up in the pre-encoded table, nothing is packed per frame.
+    """
+    return PAYLOAD_FRAMES[result][card]
+
+
+class GameSession:
+    # Phases
+    ROUND_OVER = 0   # no round in progress; any decision is stray
+    PLAYER_TURN = 1  # a Hit/Stand decision is due
+
+    # Decks per session shoe; server.py sets this from --decks
+    decks = DEFAULT_DECKS
+    # server.py --seed: sessions get seeds base, base + 1, ... instead of random ones
+    seeds: Optional[Iterator[int]] = None
+    # server.py --journal: every finished round is appended here
+    journal: Optional[Journal] = None
+    # server.py --shoe-pool: new sessions take a ready shuffled shoe from here
+    shoes: Optional[ShoePool] = None
+
+    def __init__(self, team_name: str = "", seed: Optional[int] = None):
+        shoe = None
+        pool = self.shoes
+        if seed is None:
+            entry = pool.take() if pool is not None else None
+            seed, shoe = entry if entry is not None else (self.next_seed(), None)
+        if shoe is None:
+            shoe = Shoe(self.decks, rng=random.Random(seed))
+            if pool is not None:
+                pool.attach(shoe)
+        # The shoe's own generator: it replays exactly from (seed, decks)
+        self.seed = seed
+        self.team_raw = encode_name(team_name, 32)  # journal records carry the REQUEST encoding
+        # One shoe for the whole session: shuffled once, reshuffled at the cut card
+        self.game = BlackjackGame(shoe)
+        self.phase = GameSession.ROUND_OVER
+        self.result = ROUND_ONGOING
+        self.rounds_played = 0
+        self.stray_decisions = 0
+        # Dealer reveal frames the client may still answer; echoes: does it answer them (None = not known yet)
+        self.unanswered = 0
+        self.echoes: Optional[bool] = None
+        # Every applied decision (b"H" / b"S") and round result, for replay.py
+        self.decisions = bytearray()
+        self.results = bytearray()
+        # The creating thread's metrics shard (the engine drives a session from one thread)
+        self.metrics = REGISTRY.shard()
+        self.turn_started = 0.0  # when the current decision became due
+        self.slowest_decision = 0.0  # longest decision wait so far (seconds)
+
+    @classmethod
+    def seed_from(cls, base: int) -> None:
+        cls.seeds = itertools.count(base)
+
+    @classmethod
+    def next_seed(cls) -> int:
+        """
+        Seed for a new session or table: the next --seed number, else a random one.
+        """
+        return next(cls.seeds) if cls.seeds is not None else new_seed()
+
+    def record(self) -> dict:
+        """
+        Everything replay.py needs to re-run this session exactly.
+        """
+        return {
+            "seed": self.seed,
+            "decks": self.decks,
+            "rounds_played": self.rounds_played,
+            "decisions": self.decisions.decode("ascii"),
+            "results": "".join(map(str, self.results)),
+        }
+
+    @property
+    def round_over(self) -> bool:
+        return self.phase == GameSession.ROUND_OVER
+
+    @property
+    def settling(self) -> bool:
+        """
+        True if the engine should wait (up to reply_grace) for an answer to the
+        dealer's reveal before dealing the next round: it is not known yet
+        whether this client answers those frames.
+        """
+        return self.unanswered > 0 and self.echoes is None
+
+    @property
+    def reply_grace(self) -> float:
+        """
+        Seconds to wait while settling: a few times this client's slowest
+        decision so far (it answers a reveal about as fast), at most REPLY_GRACE.
+        """
+        return min(REPLY_GRACE, 0.001 + 4 * self.slowest_decision)
+
+    def no_replies(self) -> None:
+        """
+        The grace passed without an answer: this client doesn't answer reveal frames.
+        """
+        self.echoes = False
+        self.unanswered = 0
+
+    def start_round(self) -> bytes:
+        """
+        Deal a new round.
+        Returns the initial reveal: player's 2 cards, then the dealer up-card.
+        """
+        if not self.round_over:
+            raise RuntimeError("Round already in progress")
+
+        t0 = perf_counter()
+        self.game.start_round()
+        self.result = ROUND_ONGOING
+        self.phase = GameSession.PLAYER_TURN
+
+        p1, p2 = self.game.player.cards
+        dealer_up = self.game.dealer.cards[0]
+        out = b"".join((
+            payload_frame(ROUND_ONGOING, p1),
+            payload_frame(ROUND_ONGOING, p2),
+            payload_frame(ROUND_ONGOING, dealer_up),
+        ))
+        self.turn_started = t1 = perf_counter()
+        self.metrics.observe(PHASE_INITIAL_DEAL, t1 - t0)
+        return out
+
+    def receive(self, frames: FrameBuffer) -> bytes:
+        """
+        Consume every complete decision frame the engine has read into `frames`
+        (a partial frame stays there for the next read).
+        Returns the payload bytes to send back (may be empty).
+        Raises ProtocolError on a malformed decision.
+        """
+        out = []
+        while len(frames) >= PAYLOAD_DECISION_LEN:
+            decision = decode_payload_decision_from(frames.buf, frames.take(PAYLOAD_DECISION_LEN))
+            out.append(self.decide(decision))
+
+        return b"".join(out)
+
+    def decide(self, decision: bytes) -> bytes:
+        """
+        Apply one decoded decision (HIT / STAND). Returns the payload bytes to send;
+        empty if no decision was due (the decision is counted as stray and dropped).
+        """
+        if self.unanswered and (self.echoes or self.phase != GameSession.PLAYER_TURN):
+            # An answer to one of the dealer's reveal frames (may arrive after the next deal)
+            self.unanswered -= 1
+            self.echoes = True
+            self.stray_decisions += 1
+            return b""
+        if self.phase != GameSession.PLAYER_TURN:
+            # Sent while no decision was due
+            self.stray_decisions += 1
+            return b""
+        wait = perf_counter() - self.turn_started
+        if wait > self.slowest_decision:
+            self.slowest_decision = wait
+        self.metrics.observe(PHASE_DECISION_WAIT, wait)
+        return self._on_decision(decision)
+
+    def autoplay_round(self, hit_table, summary: bool = False) -> bytes:
+        """
+        Play a whole round with a client-declared policy (POLICY_REQUEST):
+        no decisions are read, `hit_table` (strategy_table layout) makes them.
+        Returns every frame of the round, exactly as an interactive round would
+        send them, or with `summary` just one SUMMARY frame.
+        """
+        frames = [self.start_round()]
+        game = self.game
+        player = game.player
+        dealer_up = CARD_VALUE[game.dealer.cards[0]]
+
+        while not self.round_over and hit_table[table_index(player.get_value(), player.is_soft(), dealer_up)]:
+            frames.append(self._on_decision(HIT))
+        if not self.round_over:
+            frames.append(self._on_decision(STAND))
+
+        if summary:
+            return encode_summary(self.result, player.get_value(), game.dealer.get_value())
+        return b"".join(frames)
+
+    def autoplay(self, num_rounds: int, hit_table, summary: bool = False) -> Iterator[bytes]:
+        """
+        autoplay_round() num_rounds times, yielded in chunks of AUTOPLAY_BATCH rounds.
+        """
+        for first in range(0, num_rounds, AUTOPLAY_BATCH):
+            yield b"".join(
+                self.autoplay_round(hit_table, summary)
+                for _ in range(min(AUTOPLAY_BATCH, num_rounds - first))
+            )
+
+    def _on_decision(self, decision: bytes) -> bytes:
+        game = self.game
+        self.decisions.append(DECISION_CODES[decision])
+
+        if decision == HIT:
+            result, card = game.player_hit()
+            if result != ROUND_ONGOING:  # bust
+                self._finish(result)
+            else:
+                self.turn_started = perf_counter()
+            return payload_frame(result, card)
+
+        # STAND: reveal hidden card, dealer draws until >= 17, then final result.
+        # All of it goes out as one buffer -> one sendall().
+        t0 = perf_counter()
+        ongoing = PAYLOAD_FRAMES[ROUND_ONGOING]
+        out = [ongoing[game.dealer.cards[1]]]
+        final_result, dealer_drawn = game.player_stand()
+        for c in dealer_drawn:
+            out.append(ongoing[c])
+        if self.echoes is not False:
+            self.unanswered += len(out)  # the client may answer each of these
+        out.append(PAYLOAD_FRAMES[final_result][NO_CARD])
+        self._finish(final_result)
+        reveal = b"".join(out)
+        self.metrics.observe(PHASE_DEALER_REVEAL, perf_counter() - t0)
+        return reveal
+
+    def _finish(self, result: int) -> None:
+        self.result = result
+        self.phase = GameSession.ROUND_OVER
+        self.rounds_played += 1
+        self.results.append(result)
+        self.metrics.inc(ROUNDS_COMPLETED)
+        if self.journal is not None:
+            game = self.game
+            self.journal.append(self.seed, self.rounds_played, self.team_raw, result,
+                                game.player.cards, game.dealer.cards)
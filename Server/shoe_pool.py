@@ -0,0 +1,126 @@
+"""
+Background supply of shuffled shoes, so no client waits on a shuffle.
+
+Building and shuffling a shoe costs far more than dealing a round from
+it, and it used to happen on the request path: when a session starts
+(its first card waits for the new shoe) and at every cut card. A ShoePool
+moves that work to one background thread:
+- new sessions take a ready shoe from a bounded pool of `size` shoes,
+  each already built and shuffled with its own seed; every take queues
+  one refill
+- every shoe in play (pooled or not, see attach()) has its *next* shuffle
+  computed ahead from a copy of its cards and generator state; at the
+  cut card the shoe swaps the prepared cards and generator in, O(1)
+
+Both are exactly what the inline shuffle would have produced: a shoe is
+still random.Random(seed) shuffling the same cards in the same order, so
+replay.py re-deals a session from (seed, decks) as before. When nothing is
+ready (pool empty, or the lookahead not done yet) the shuffle happens
+inline, as without a pool. Hits, misses and the refill lag (request to
+ready) are exported through metrics.py.
+"""
+
+from __future__ import annotations
+
+import collections
+import queue
+import random
+import threading
+from time import perf_counter
+from typing import Callable, Optional
+
+from game import Shoe
+from metrics import REGISTRY, SHOE_POOL_HITS, SHOE_POOL_MISSES, SHOE_REFILL_LAG
+
+DEFAULT_POOL_SIZE = 32
+
+
+class ShoePool:
+    def __init__(self, size: int, decks: int, next_seed: Callable[[], int]):
+        """
+        size: ready shoes kept for new sessions; decks: decks per shoe;
+        next_seed(): seed for each new shoe (e.g. GameSession.next_seed).
+        """
+        self.size = size
+        self.decks = decks
+        self.next_seed = next_seed
+        self.ready: collections.deque[tuple[int, Shoe]] = collections.deque()
+        # (requested at, shoe, ticket); shoe None = build a new pooled shoe
+        self.jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        for _ in range(size):
+            self.jobs.put((perf_counter(), None, None))
+
+    def take(self) -> Optional[tuple[int, Shoe]]:
+        """
+        A ready (seed, shoe) for a new session, or None (shuffle inline).
+        """
+        stats = REGISTRY.shard()
+        try:
+            entry = self.ready.popleft()
+        except IndexError:
+            stats.inc(SHOE_POOL_MISSES)
+            return None
+        stats.inc(SHOE_POOL_HITS)
+        self.jobs.put((perf_counter(), None, None))
+        return entry
+
+    def attach(self, shoe: Shoe) -> Shoe:
+        """
+        Have this (already shuffled) shoe's reshuffles prepared ahead too.
+        """
+        shoe.supply = self
+        self.prepare(shoe)
+        return shoe
+
+    def prepare(self, shoe: Shoe) -> None:
+        """
+        Queue the shoe's next shuffle (called right after each shuffle).
+        A new ticket voids any older preparation still in flight.
+        """
+        ticket = shoe.ticket = object()
+        shoe.ahead = None
+        self.jobs.put((perf_counter(), shoe, ticket))
+
+    def swap_in(self, shoe: Shoe) -> bool:
+        """
+        Called by Shoe.shuffle(): install the prepared order if it is ready.
+        """
+        ahead = shoe.ahead
+        if ahead is None or ahead[0] is not shoe.ticket:
+            REGISTRY.shard().inc(SHOE_POOL_MISSES)
+            return False
+        _ticket, shoe.cards, shoe.rng = ahead
+        shoe.ahead = None
+        REGISTRY.shard().inc(SHOE_POOL_HITS)
+        return True
+
+    def start(self) -> "ShoePool":
+        """
+        Start the refill thread. Starting again is a no-op.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="shoe-pool", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        stats = REGISTRY.shard()
+        while True:
+            requested, shoe, ticket = self.jobs.get()
+            if shoe is None:
+                seed = self.next_seed()
+                shoe = Shoe(self.decks, rng=random.Random(seed))
+                self.attach(shoe)
+                self.ready.append((seed, shoe))
+            elif shoe.ticket is ticket:  # else: shuffled inline meanwhile, a newer request is queued
+                # The owner leaves cards and generator alone until its next shuffle, so they can be
+                # copied here; a copy taken during an inline shuffle carries a void ticket
+                rng = random.Random()
+                rng.setstate(shoe.rng.getstate())
+                cards = shoe.cards[:]
+                rng.shuffle(cards)
+                shoe.ahead = (ticket, cards, rng)
+            else:
+                continue
+            stats.observe(SHOE_REFILL_LAG, perf_counter() - requested)
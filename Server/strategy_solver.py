@@ -0,0 +1,187 @@
+"""
+Offline basic-strategy solver for the BlackjackGame rules.
+
+Computes, for every dealer up-card, the exact distribution of the dealer's
+final total (17..21 or bust) when drawing while below DEALER_STANDS_ON,
+then the expected value of Hit and Stand for every
+(player total, soft, dealer up-card) state and keeps the better action.
+
+Cards are drawn with replacement (infinite-deck model: each rank 1/13),
+the standard approximation for a 6-deck shoe.
+Rules follow game.py / Formats.cards: Aces count 1, or 11 when that
+doesn't bust; Hit over 21 loses at once; dealer bust wins; equal totals tie.
+
+The table is written in the Formats/strategy_table.py layout.
+
+Usage (from the repository root):
+    python Server/strategy_solver.py [--out basic_strategy.bin] [--show]
+"""
+
+from __future__ import annotations
+
+import argparse
+from functools import lru_cache
+
+from Formats.cards import RANK_VALUE_MAP, HARD_VALUE_MAP, ACE, hand_value
+from Formats.strategy_table import (
+    DEFAULT_TABLE_PATH,
+    MAX_UP_VALUE,
+    TABLE_LEN,
+    encode_table,
+    table_index,
+)
+from game import DEALER_STANDS_ON
+
+BUST = 22  # key for "dealer busted" in the outcome distributions
+DEALER_FINALS = tuple(range(DEALER_STANDS_ON, 22)) + (BUST,)
+
+# (hard value, is Ace, probability) for one card drawn with replacement
+DRAWS = tuple(
+    (hard, rank == ACE, sum(1 for r in RANK_VALUE_MAP if HARD_VALUE_MAP[r] == hard) / len(RANK_VALUE_MAP))
+    for rank, hard in HARD_VALUE_MAP.items()
+    if rank <= 10  # J/Q/K share the 10 entry
+)
+
+UP_VALUES = tuple(range(2, MAX_UP_VALUE + 1))  # 2..10, 11 = Ace
+
+
+# -----------------------------
+# Dealer
+# -----------------------------
+@lru_cache(maxsize=None)
+def dealer_finals(hard: int, has_ace: bool) -> dict[int, float]:
+    """
+    Distribution of the dealer's final total from a hand with this hard total.
+    """
+    if hard > 21:
+        return {BUST: 1.0}
+    total, _soft = hand_value(hard, int(has_ace))
+    if total >= DEALER_STANDS_ON:
+        return {total: 1.0}
+
+    dist: dict[int, float] = {}
+    for value, is_ace, p in DRAWS:
+        for final, q in dealer_finals(hard + value, has_ace or is_ace).items():
+            dist[final] = dist.get(final, 0.0) + p * q
+    return dist
+
+
+def up_card_state(up: int) -> tuple[int, bool]:
+    """
+    (hard total, has Ace) of a dealer hand holding only the up-card.
+    """
+    if up == RANK_VALUE_MAP[ACE]:
+        return HARD_VALUE_MAP[ACE], True
+    return up, False
+
+
+def dealer_table() -> dict[int, dict[int, float]]:
+    """
+    up-card value -> {final total or BUST: probability}
+    """
+    return {up: dealer_finals(*up_card_state(up)) for up in UP_VALUES}
+
+
+# -----------------------------
+# Player
+# -----------------------------
+def stand_ev(total: int, finals: dict[int, float]) -> float:
+    ev = 0.0
+    for final, p in finals.items():
+        if final == BUST or total > final:
+            ev += p
+        elif total < final:
+            ev -= p
+    return ev
+
+
+def solve(dealer: dict[int, dict[int, float]]) -> tuple[bytearray, dict]:
+    """
+    Returns: (hit table in strategy_table layout, {(total, soft, up): (stand_ev, hit_ev)})
+    """
+    table = bytearray(TABLE_LEN)
+    evs = {}
+
+    for up in UP_VALUES:
+        finals = dealer[up]
+
+        @lru_cache(maxsize=None)
+        def best(hard: int, has_ace: bool) -> float:
+            total, soft = hand_value(hard, int(has_ace))
+            s = stand_ev(total, finals)
+            h = hit(hard, has_ace)
+            evs[total, soft, up] = (s, h)
+            table[table_index(total, soft, up)] = h > s
+            return max(s, h)
+
+        def hit(hard: int, has_ace: bool) -> float:
+            ev = 0.0
+            for value, is_ace, p in DRAWS:
+                if hard + value > 21:
+                    ev -= p
+                else:
+                    ev += p * best(hard + value, has_ace or is_ace)
+            return ev
+
+        # Every 2-card start (and everything reachable by hitting from it)
+        for hard in range(2, 22):
+            for has_ace in (False, True):
+                best(hard, has_ace)
+
+    return table, evs
+
+
+def round_ev(dealer: dict[int, dict[int, float]], evs: dict) -> float:
+    """
+    Expected player result per round when following the table.
+    """
+    ev = 0.0
+    for up_value, up_ace, p_up in DRAWS:
+        up = RANK_VALUE_MAP[ACE] if up_ace else up_value
+        for v1, a1, p1 in DRAWS:
+            for v2, a2, p2 in DRAWS:
+                total, soft = hand_value(v1 + v2, int(a1) + int(a2))
+                ev += p_up * p1 * p2 * max(evs[total, soft, up])
+    return ev
+
+
+# -----------------------------
+# Output
+# -----------------------------
+def print_tables(dealer: dict[int, dict[int, float]], table: bytearray) -> None:
+    labels = [str(f) for f in DEALER_FINALS[:-1]] + ["bust"]
+    print("dealer final-total distribution by up-card")
+    print("up  " + "".join(f"{l:>8}" for l in labels))
+    for up in UP_VALUES:
+        print(f"{'A' if up == 11 else up:<4}" + "".join(f"{dealer[up].get(f, 0.0):8.4f}" for f in DEALER_FINALS))
+
+    for soft in (False, True):
+        print(f"\n{'soft' if soft else 'hard'} totals (H = hit, S = stand)")
+        print("     " + " ".join(f"{'A' if u == 11 else u:>2}" for u in UP_VALUES))
+        for total in range(12 if soft else 4, 22):
+            row = " ".join(" H" if table[table_index(total, soft, u)] else " S" for u in UP_VALUES)
+            print(f"{total:>4} {row}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Basic-strategy solver. Dealer outcomes and EVs are exact for an infinite deck "
+                    "(each rank 1/13), an approximation of the server's 6-deck shoe."
+    )
+    parser.add_argument("--out", default=DEFAULT_TABLE_PATH, help="where to write the table")
+    parser.add_argument("--show", action="store_true", help="print dealer outcomes and the strategy chart")
+    args = parser.parse_args()
+
+    dealer = dealer_table()
+    table, evs = solve(dealer)
+
+    with open(args.out, "wb") as f:
+        f.write(encode_table(bytes(table)))
+
+    if args.show:
+        print_tables(dealer, table)
+    print(f"\nexpected result per round: {round_ev(dealer, evs):+.4f}  (table written to {args.out})")
+
+
+if __name__ == "__main__":
+    main()
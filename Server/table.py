@@ -0,0 +1,347 @@
+"""
+Shared-table mode: up to N clients play at one table, against one dealer
+hand dealt from one shoe.
+
+Every seat sees exactly the frames a private GameSession would send
+(its 2 cards, the dealer up-card, each Hit card, and on Stand the dealer's
+hidden card, draws and the result), so clients need no changes. The
+difference is the order of work:
+- a round deals to every seated client at once
+- each seat's Hit/Stand is applied as it arrives; a seat that does not
+  decide within `decision_timeout` seconds stands
+- when the last seat is done the dealer plays once, and the same reveal
+  frames go to every seat that stood, followed by that seat's own result
+So per round the dealer logic runs once, and the rest grows with seats.
+
+Like GameSession, a Table does no socket I/O: the engines hand it each
+seat's `send` (write bytes to the client) and `on_done` (the seat played
+all its rounds) callbacks, and feed decisions in with receive(). A seat
+joining mid-round waits for the next round. Tables are driven from several
+threads in the thread engine (seat threads + the deadline ticker), so every
+entry point holds the table's lock. Callbacks run under that lock, possibly
+on the ticker, so they must not block: the thread engine's `send` queues
+to a per-seat sender thread, the asyncio engine's only buffers.
+
+Rounds go to the game journal (keyed by the table's seed) like private
+sessions, but no SESSION_RECORD is logged: replay.py re-deals one private
+shoe, and a seat's cards depend on everyone else at the table.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+import threading
+from functools import partial
+from time import perf_counter
+from typing import Callable, Optional
+
+from Formats.cards import NO_CARD
+from Formats.codec import FrameBuffer, PAYLOAD_DECISION_LEN, encode_name
+from Formats.packet_formats import ROUND_ONGOING, ROUND_WIN, ROUND_LOSS, ROUND_TIE, HIT, STAND
+from protocolServer import PAYLOAD_FRAMES, decode_payload_decision_from
+from game import Shoe, Hand, DEALER_STANDS_ON, max_hand_cards
+from session import GameSession, DECISION_CODES
+import admission
+from admission import Deadline
+from metrics import (
+    REGISTRY,
+    ROUNDS_COMPLETED,
+    DECISION_TIMEOUTS,
+    PHASE_INITIAL_DEAL,
+    PHASE_DECISION_WAIT,
+    PHASE_DEALER_REVEAL,
+)
+
+DEFAULT_DECISION_TIMEOUT = 15.0
+
+# A round starts on a fresh shoe unless Shoe.hand_cards are left per hand (seats + dealer).
+
+
+class Seat:
+    # States
+    WAITING = 0  # seated, plays from the next round
+    TURN = 1     # a Hit/Stand decision is due
+    STOOD = 2    # waits for the dealer
+    OUT = 3      # result already sent this round (bust)
+    DONE = 4     # played all its rounds
+    GONE = 5     # client disconnected
+
+    __slots__ = (
+        "table", "number", "team", "team_raw", "rounds_left", "send", "on_done", "hand", "state",
+        "deadline", "turn_started", "rounds_played", "decisions", "results", "stray_decisions", "timeouts",
+    )
+
+    def __init__(self, table: "Table", number: int, team: str, num_rounds: int,
+                 send: Callable[[bytes], None], on_done: Callable[[], None]):
+        self.table = table
+        self.number = number
+        self.team = team
+        self.team_raw = encode_name(team, 32)
+        self.rounds_left = num_rounds
+        self.send = send
+        self.on_done = on_done
+        self.hand = Hand()
+        self.state = Seat.WAITING
+        self.deadline: Optional[Deadline] = None  # current decision's
+        self.turn_started = 0.0
+        self.rounds_played = 0
+        self.decisions = bytearray()
+        self.results = bytearray()
+        self.stray_decisions = 0
+        self.timeouts = 0  # decisions made for the seat (stand) on the deadline
+
+    @property
+    def done(self) -> bool:
+        return self.state == Seat.DONE
+
+
+class Table:
+    def __init__(self, number: int, seats: int, decision_timeout: float = DEFAULT_DECISION_TIMEOUT):
+        self.number = number
+        self.max_seats = seats
+        self.decision_timeout = decision_timeout
+        # Seeded like a session (server.py --seed numbers tables and sessions alike)
+        self.seed = GameSession.next_seed()
+        decks = GameSession.decks
+        while 52 * decks < max_hand_cards(decks) * (seats + 1):
+            decks += 1  # a full table's worst round fits
+        self.shoe = Shoe(decks, rng=random.Random(self.seed))
+        if GameSession.shoes is not None:
+            GameSession.shoes.attach(self.shoe)  # reshuffles prepared ahead, like sessions'
+        self.dealer = Hand()
+        self.seats: list[Seat] = []
+        self.in_round = False
+        self.pending = 0  # seats whose decision is still due this round
+        self.rounds_played = 0
+        self._seat_numbers = itertools.count(1)
+        self._lock = threading.RLock()
+
+    @property
+    def free_seats(self) -> int:
+        return self.max_seats - len(self.seats)
+
+    # -----------------------------
+    # Engine entry points
+    # -----------------------------
+    def join(self, team: str, num_rounds: int, send: Callable[[bytes], None], on_done: Callable[[], None]) -> Seat:
+        """
+        Seat a client for num_rounds rounds (starts a round if the table is idle).
+        """
+        with self._lock:
+            seat = Seat(self, next(self._seat_numbers), team, num_rounds, send, on_done)
+            self.seats.append(seat)
+            if not num_rounds:
+                self._done(seat)
+            elif not self.in_round:
+                self._start_round()
+            return seat
+
+    def receive(self, seat: Seat, frames: FrameBuffer) -> None:
+        """
+        Apply every complete decision frame in `frames` for `seat`
+        (replies are sent through the seats' callbacks).
+        Raises ProtocolError on a malformed decision.
+        """
+        while len(frames) >= PAYLOAD_DECISION_LEN:
+            self.decide(seat, decode_payload_decision_from(frames.buf, frames.take(PAYLOAD_DECISION_LEN)))
+
+    def decide(self, seat: Seat, decision: bytes) -> None:
+        with self._lock:
+            if seat.state != Seat.TURN:
+                seat.stray_decisions += 1
+                return
+            REGISTRY.shard().observe(PHASE_DECISION_WAIT, perf_counter() - seat.turn_started)
+            self._apply(seat, decision)
+
+    def leave(self, seat: Seat) -> None:
+        """
+        The seat's connection ended (a no-op for a seat that finished).
+        """
+        with self._lock:
+            if seat.state in (Seat.DONE, Seat.GONE):
+                return
+            in_turn = seat.state == Seat.TURN
+            seat.state = Seat.GONE
+            if in_turn:
+                self._turn_over(seat)
+            elif not self.in_round:
+                self.seats.remove(seat)
+
+    def _expire(self, seat: Seat) -> None:
+        """
+        Decision deadline passed (called on the deadline ticker): the seat stands.
+        """
+        with self._lock:
+            if seat.state != Seat.TURN:
+                return
+            seat.timeouts += 1
+            REGISTRY.shard().inc(DECISION_TIMEOUTS)
+            self._apply(seat, STAND)
+
+    # -----------------------------
+    # Round flow
+    # -----------------------------
+    def _send(self, seat: Seat, data: bytes) -> None:
+        try:
+            seat.send(data)
+        except OSError:
+            # Client gone; its own handler sees the error too and calls leave()
+            pass
+
+    def _start_round(self) -> None:
+        playing = [s for s in self.seats if s.state == Seat.WAITING]
+        if not playing:
+            self.in_round = False
+            return
+
+        t0 = perf_counter()
+        shoe = self.shoe
+        if shoe.needs_shuffle or len(shoe.cards) - shoe.pos < shoe.hand_cards * (len(playing) + 1):
+            shoe.shuffle()
+        dealer = self.dealer
+        dealer.clear()
+        # Dealt like a real table: one card to each seat, dealer up-card, second round, hole card
+        for s in playing:
+            s.hand.clear()
+            s.hand.add_card(shoe.draw_card())
+        dealer.add_card(shoe.draw_card())
+        for s in playing:
+            s.hand.add_card(shoe.draw_card())
+        dealer.add_card(shoe.draw_card())
+
+        up = PAYLOAD_FRAMES[ROUND_ONGOING][dealer.cards[0]]
+        wheel = admission.ADMISSION.wheel
+        self.in_round = True
+        self.pending = len(playing)
+        for s in playing:
+            p1, p2 = s.hand.cards
+            s.state = Seat.TURN
+            s.turn_started = perf_counter()
+            if self.decision_timeout:
+                s.deadline = wheel.add(Deadline(partial(self._expire, s), self.decision_timeout, 0))
+            self._send(s, PAYLOAD_FRAMES[ROUND_ONGOING][p1] + PAYLOAD_FRAMES[ROUND_ONGOING][p2] + up)
+        REGISTRY.shard().observe(PHASE_INITIAL_DEAL, perf_counter() - t0)
+
+    def _apply(self, seat: Seat, decision: bytes) -> None:
+        seat.decisions.append(DECISION_CODES[decision])
+        if decision == HIT:
+            card = self.shoe.draw_card()
+            seat.hand.add_card(card)
+            if seat.hand.is_bust():
+                self._send(seat, PAYLOAD_FRAMES[ROUND_LOSS][card])
+                seat.state = Seat.OUT
+                self._result(seat, ROUND_LOSS)
+                self._turn_over(seat)
+            else:
+                self._send(seat, PAYLOAD_FRAMES[ROUND_ONGOING][card])
+                seat.turn_started = perf_counter()
+                if seat.deadline is not None:
+                    seat.deadline.touch()
+            return
+
+        seat.state = Seat.STOOD
+        self._turn_over(seat)
+
+    def _turn_over(self, seat: Seat) -> None:
+        if seat.deadline is not None:
+            seat.deadline.cancel()
+            seat.deadline = None
+        self.pending -= 1
+        if not self.pending:
+            self._finish_round()
+
+    def _finish_round(self) -> None:
+        stood = [s for s in self.seats if s.state == Seat.STOOD]
+        if stood:
+            # Dealer plays once for the whole table; every seat that stood gets the same reveal
+            t0 = perf_counter()
+            dealer = self.dealer
+            out = [PAYLOAD_FRAMES[ROUND_ONGOING][dealer.cards[1]]]
+            while dealer.get_value() < DEALER_STANDS_ON:
+                card = self.shoe.draw_card()
+                dealer.add_card(card)
+                out.append(PAYLOAD_FRAMES[ROUND_ONGOING][card])
+            reveal = b"".join(out)
+            dealer_total = dealer.get_value()
+            dealer_bust = dealer.is_bust()
+            for s in stood:
+                player = s.hand.get_value()
+                if dealer_bust or player > dealer_total:
+                    result = ROUND_WIN
+                elif player < dealer_total:
+                    result = ROUND_LOSS
+                else:
+                    result = ROUND_TIE
+                self._send(s, reveal + PAYLOAD_FRAMES[result][NO_CARD])
+                self._result(s, result)
+            REGISTRY.shard().observe(PHASE_DEALER_REVEAL, perf_counter() - t0)
+
+        self.rounds_played += 1
+        self.seats = [s for s in self.seats if s.state not in (Seat.DONE, Seat.GONE)]
+        for s in self.seats:
+            if s.state != Seat.WAITING:
+                s.state = Seat.WAITING
+        self._start_round()
+
+    def _result(self, seat: Seat, result: int) -> None:
+        seat.results.append(result)
+        seat.rounds_played += 1
+        seat.rounds_left -= 1
+        REGISTRY.shard().inc(ROUNDS_COMPLETED)
+        journal = GameSession.journal
+        if journal is not None:
+            # Keyed by the table's seed and round number (this round is not counted yet)
+            journal.append(self.seed, self.rounds_played + 1, seat.team_raw, result,
+                           seat.hand.cards, self.dealer.cards)
+        if not seat.rounds_left:
+            self._done(seat)
+
+    def _done(self, seat: Seat) -> None:
+        seat.state = Seat.DONE
+        if not self.in_round:
+            self.seats.remove(seat)
+        seat.on_done()
+
+
+# -----------------------------
+# Table scheduler
+# -----------------------------
+class TableScheduler:
+    """
+    Seats each new client at the first table with a free seat, opening a
+    new table when all are full.
+    """
+
+    def __init__(self, seats: int, decision_timeout: float = DEFAULT_DECISION_TIMEOUT):
+        if seats < 1:
+            raise ValueError("A table needs at least one seat")
+        self.seats = seats
+        self.decision_timeout = decision_timeout
+        self.tables: list[Table] = []
+        self._numbers = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def seat(self, team: str, num_rounds: int, send: Callable[[bytes], None], on_done: Callable[[], None]) -> Seat:
+        with self._lock:
+            # Tables nobody sits at any more are dropped
+            self.tables = [t for t in self.tables if t.seats]
+            table = next((t for t in self.tables if t.free_seats > 0), None)
+            if table is None:
+                table = Table(next(self._numbers), self.seats, self.decision_timeout)
+                self.tables.append(table)
+            # Joining under the scheduler lock keeps two clients from taking the last seat
+            return table.join(team, num_rounds, send, on_done)
+
+
+# Process-wide scheduler; None = every client plays a private GameSession
+TABLES: Optional[TableScheduler] = None
+
+
+def configure(seats: int = 0, decision_timeout: float = DEFAULT_DECISION_TIMEOUT) -> Optional[TableScheduler]:
+    """
+    seats = 0 turns shared tables off.
+    """
+    global TABLES
+    TABLES = TableScheduler(seats, decision_timeout) if seats else None
+    return TABLES
@@ -0,0 +1,253 @@
+"""
+Vectorized Monte Carlo simulator for the BlackjackGame rules.
+
+Plays whole batches of rounds as NumPy arrays instead of one BlackjackGame
+object at a time. The rules are the ones in game.py, dealt the way
+BlackjackGame() deals without a Shoe:
+- fresh shuffled 52-card deck per round, player 2 cards, dealer 2 cards
+- card values from Formats.cards: hard totals with Aces = 1, plus
+  SOFT_ACE_BONUS when an Ace can count 11 without busting
+- player Hit busts (> 21) -> LOSS immediately
+- on Stand the dealer draws while below DEALER_STANDS_ON, then:
+  dealer bust -> WIN, higher total wins, equal -> TIE
+
+A player policy is a boolean table hit[player_total, soft, dealer_up_value].
+
+Only fresh-deck play is modelled (and checked by --check). The server deals
+from a persistent multi-deck Shoe with a cut card (game.Shoe), whose rates
+differ slightly; for house-edge tuning against the server as it runs, use
+pool_sim.py --decks N, which plays the real Shoe.
+
+Usage (from the repository root):
+    python Server/vector_sim.py --rounds 10000000 --threshold 17 --check 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+from typing import Optional
+
+import numpy as np
+
+from Formats.cards import RANK_VALUE_MAP, CARD_COUNT, CARD_HARD, CARD_ACE, CARD_VALUE, SOFT_ACE_BONUS, ACE, hand_value
+from Formats.packet_formats import ROUND_WIN, ROUND_LOSS, ROUND_TIE
+from Formats.strategy_table import MAX_TOTAL, TABLE_SHAPE, load_table
+from game import BlackjackGame, DEALER_STANDS_ON
+
+# Hard value (Ace = 1) of each card of one deck, in card code (Deck._build_deck) order
+DECK_VALUES = np.frombuffer(CARD_HARD, dtype=np.uint8)[:CARD_COUNT].astype(np.int8)
+
+
+# -----------------------------
+# Policies
+# -----------------------------
+def threshold_policy(hit_below: int) -> np.ndarray:
+    """
+    "Hit while my total is below hit_below", whatever the dealer shows.
+    """
+    hit = np.zeros(TABLE_SHAPE, dtype=bool)
+    hit[:hit_below] = True
+    return hit
+
+
+def table_policy(path: str) -> np.ndarray:
+    """
+    Policy from a strategy_solver.py table file.
+    """
+    return np.frombuffer(load_table(path, use_mmap=False), dtype=np.uint8).reshape(TABLE_SHAPE).astype(bool)
+
+
+def best_total(hard: np.ndarray, aces: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized Formats.cards.hand_value: (total, soft) per hand.
+    """
+    soft = (aces > 0) & (hard + SOFT_ACE_BONUS <= 21)
+    return hard + SOFT_ACE_BONUS * soft, soft
+
+
+# -----------------------------
+# Simulation
+# -----------------------------
+def play_batch(rng: np.random.Generator, policy: np.ndarray, n: int) -> tuple[int, int, int]:
+    """
+    Play n independent rounds under `policy`.
+    Returns: (wins, ties, losses)
+    """
+    # One shuffled deck per row; columns are dealt left to right
+    decks = rng.permuted(np.broadcast_to(DECK_VALUES, (n, DECK_VALUES.size)), axis=1)
+    rows = np.arange(n)
+
+    # Initial deal: player 2 cards, dealer 2 cards (hard totals + Ace counts)
+    c0, c1, c2, c3 = decks[:, 0], decks[:, 1], decks[:, 2], decks[:, 3]
+    player = c0.astype(np.int16) + c1
+    player_aces = (c0 == 1).astype(np.int8) + (c1 == 1)
+    dealer = c2.astype(np.int16) + c3
+    dealer_aces = (c2 == 1).astype(np.int8) + (c3 == 1)
+    up = np.where(c2 == 1, RANK_VALUE_MAP[ACE], c2)
+    pos = np.full(n, 4, dtype=np.int64)
+
+    # Player turn: every round that still wants a card takes the next one
+    busted = np.zeros(n, dtype=bool)
+    deciding = np.ones(n, dtype=bool)
+    while True:
+        total, soft = best_total(player, player_aces)
+        hit = deciding & policy[np.minimum(total, MAX_TOTAL), soft.view(np.int8), up]
+        if not hit.any():
+            break
+        idx = rows[hit]
+        card = decks[idx, pos[idx]]
+        player[idx] += card
+        player_aces[idx] += card == 1
+        pos[idx] += 1
+        newly_busted = hit & (player > 21)
+        busted |= newly_busted
+        deciding = hit & ~newly_busted
+
+    # Dealer turn, only for rounds where the player stood
+    dealer_total, _ = best_total(dealer, dealer_aces)
+    drawing = ~busted & (dealer_total < DEALER_STANDS_ON)
+    while drawing.any():
+        idx = rows[drawing]
+        card = decks[idx, pos[idx]]
+        dealer[idx] += card
+        dealer_aces[idx] += card == 1
+        pos[idx] += 1
+        dealer_total, _ = best_total(dealer, dealer_aces)
+        drawing &= dealer_total < DEALER_STANDS_ON
+
+    player, _ = best_total(player, player_aces)
+    dealer = dealer_total
+
+    stood = ~busted
+    dealer_bust = stood & (dealer > 21)
+    settled = stood & ~dealer_bust
+    wins = int(dealer_bust.sum() + (settled & (player > dealer)).sum())
+    ties = int((settled & (player == dealer)).sum())
+    losses = n - wins - ties
+    return wins, ties, losses
+
+
+def simulate(policy: np.ndarray, rounds: int, seed: Optional[int] = None, batch: int = 200_000) -> tuple[int, int, int]:
+    """
+    Play `rounds` rounds in batches. Returns: (wins, ties, losses)
+    """
+    rng = np.random.default_rng(seed)
+    wins = ties = losses = 0
+    left = rounds
+    while left > 0:
+        n = min(batch, left)
+        w, t, l = play_batch(rng, policy, n)
+        wins += w
+        ties += t
+        losses += l
+        left -= n
+    return wins, ties, losses
+
+
+def simulate_scalar(policy: np.ndarray, rounds: int, seed: Optional[int] = None) -> tuple[int, int, int]:
+    """
+    Same policy driven through BlackjackGame one round at a time (reference),
+    a fresh deck per round as in play_batch.
+    The policy sees the totals a bot would compute from the revealed cards
+    (Formats.cards.hand_value); they are checked against the server's Hand.
+    """
+    rng = random.Random(seed)
+    counts = {ROUND_WIN: 0, ROUND_TIE: 0, ROUND_LOSS: 0}
+    for _ in range(rounds):
+        game = BlackjackGame(rng=rng)
+        game.start_round()
+        up = CARD_VALUE[game.dealer.cards[0]]
+        while True:
+            hand = game.player
+            total, soft = hand_value(
+                sum(CARD_HARD[c] for c in hand.cards),
+                sum(CARD_ACE[c] for c in hand.cards),
+            )
+            if total != hand.get_value() or soft != hand.is_soft():
+                raise AssertionError(f"Bot total {total} (soft={soft}) != server Hand {hand.get_value()}")
+
+            if policy[min(total, MAX_TOTAL), int(soft), up]:
+                result, _card = game.player_hit()
+                if result == ROUND_LOSS:
+                    break
+            else:
+                result, _drawn = game.player_stand()
+                break
+        counts[result] += 1
+    return counts[ROUND_WIN], counts[ROUND_TIE], counts[ROUND_LOSS]
+
+
+# -----------------------------
+# Statistics
+# -----------------------------
+def rate_ci(k: int, n: int, z: float = 1.96) -> tuple[float, float]:
+    """
+    Proportion k/n and its normal-approximation half-width (95% by default).
+    """
+    p = k / n
+    return p, z * math.sqrt(p * (1.0 - p) / n)
+
+
+def conforms(a: tuple[int, int, int], b: tuple[int, int, int], z: float = 4.0) -> bool:
+    """
+    True if every outcome rate of a and b agrees within z standard errors
+    of their difference (z=4 keeps false alarms negligible).
+    """
+    na, nb = sum(a), sum(b)
+    for ka, kb in zip(a, b):
+        pa, pb = ka / na, kb / nb
+        pooled = (ka + kb) / (na + nb)
+        se = math.sqrt(pooled * (1.0 - pooled) * (1.0 / na + 1.0 / nb))
+        if abs(pa - pb) > z * se:
+            return False
+    return True
+
+
+def print_summary(label: str, counts: tuple[int, int, int], seconds: float) -> None:
+    n = sum(counts)
+    print(f"{label}: {n:,} rounds in {seconds:.2f}s ({n / seconds:,.0f} rounds/s)")
+    for name, k in zip(("win", "tie", "loss"), counts):
+        p, hw = rate_ci(k, n)
+        print(f"  {name:<5}{p:8.4%} ± {hw:.4%}")
+    # Per-round house result is +1 (loss), 0 (tie) or -1 (win)
+    edge = (counts[2] - counts[0]) / n
+    var = (counts[0] + counts[2]) / n - edge * edge
+    print(f"  house edge {edge:+.4%} ± {1.96 * math.sqrt(var / n):.4%}")
+
+
+# -----------------------------
+# Main
+# -----------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vectorized Blackjack Monte Carlo simulator")
+    parser.add_argument("--rounds", type=int, default=1_000_000)
+    parser.add_argument("--threshold", type=int, default=17, help="policy: hit while player total is below this")
+    parser.add_argument("--table", default=None, help="policy: strategy_solver.py table file (overrides --threshold)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=200_000, help="rounds per NumPy batch")
+    parser.add_argument("--check", type=int, default=0, metavar="N",
+                        help="also play N fresh-deck rounds through BlackjackGame and compare outcome rates "
+                             "(the server's multi-deck Shoe is not modelled, see pool_sim.py --decks)")
+    args = parser.parse_args()
+
+    policy = table_policy(args.table) if args.table else threshold_policy(args.threshold)
+
+    t0 = time.perf_counter()
+    counts = simulate(policy, args.rounds, seed=args.seed, batch=args.batch)
+    print_summary("vectorized (fresh deck)", counts, time.perf_counter() - t0)
+
+    if args.check:
+        t0 = time.perf_counter()
+        ref = simulate_scalar(policy, args.check, seed=args.seed)
+        print_summary("BlackjackGame (fresh deck)", ref, time.perf_counter() - t0)
+        ok = conforms(counts, ref)
+        print("fresh-deck conformance:", "OK" if ok else "MISMATCH")
+        if not ok:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
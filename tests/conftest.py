@@ -0,0 +1,10 @@
+"""
+Make the repository modules importable the way the scripts run them:
+Formats as a package from the root, Server/ and Client/ modules flat.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "Server"), os.path.join(ROOT, "Client")]
@@ -0,0 +1,95 @@
+"""
+Hand totals: the server's Hand, vector_sim.best_total and the bots'
+Formats.cards.hand_value must agree card for card.
+"""
+
+import random
+from array import array
+
+import numpy as np
+import pytest
+
+from Formats.cards import ACE, CARD_ACE, CARD_HARD, card_code, hand_value
+from Formats.packet_formats import ROUND_ONGOING, ROUND_WIN, ROUND_LOSS
+from Formats.strategy_table import TABLE_SHAPE
+from game import BlackjackGame, Hand, Shoe
+from vector_sim import best_total, conforms, simulate, simulate_scalar
+
+K, Q = 13, 12
+
+# (ranks dealt in order, (total, soft) after each card)
+SEQUENCES = [
+    # soft 17, then hard 17
+    ([ACE, 6, 10], [(11, True), (17, True), (17, False)]),
+    # multi-ace soft -> hard transitions
+    ([ACE, ACE, 9, ACE, 8], [(11, True), (12, True), (21, True), (12, False), (20, False)]),
+    ([ACE, ACE, ACE, ACE, 2, 2, 2, 2, 3, 3, 3, 2],
+     [(11, True), (12, True), (13, True), (14, True), (16, True), (18, True), (20, True), (12, False),
+      (15, False), (18, False), (21, False), (23, False)]),
+    # bust after soft
+    ([ACE, 5, 10, 10], [(11, True), (16, True), (16, False), (26, False)]),
+    ([K, Q, 2], [(10, False), (20, False), (22, False)]),
+]
+
+
+@pytest.mark.parametrize("ranks, expected", SEQUENCES)
+def test_server_simulator_and_bots_agree(ranks, expected):
+    hand = Hand()
+    hard_total = aces = 0  # what a bot tracks from the revealed cards
+    for i, (rank, (total, soft)) in enumerate(zip(ranks, expected)):
+        card = card_code(rank, i % 4)
+        hand.add_card(card)
+        hard_total += CARD_HARD[card]
+        aces += CARD_ACE[card]
+
+        bust = total > 21
+        assert (hand.get_value(), hand.is_soft(), hand.is_bust()) == (total, soft, bust)
+        assert hand_value(hard_total, aces) == (total, soft)
+        vec_total, vec_soft = best_total(np.array([hard_total]), np.array([aces]))
+        assert (int(vec_total[0]), bool(vec_soft[0])) == (total, soft)
+
+
+def rigged_game(ranks):
+    """
+    BlackjackGame dealing `ranks` in order: player, player, dealer up, dealer hole, then draws.
+    """
+    shoe = Shoe(1, rng=random.Random(0))
+    cards = [card_code(rank, 0) for rank in ranks]
+    shoe.cards = array("B", cards + list(shoe.cards[len(cards):]))
+    shoe.pos = 0
+    game = BlackjackGame(shoe)
+    game.start_round()
+    return game
+
+
+def test_dealer_stands_on_soft_17():
+    game = rigged_game([10, 8, ACE, 6, 5])
+    result, drawn = game.player_stand()
+    assert drawn == []
+    assert (game.dealer.get_value(), game.dealer.is_soft()) == (17, True)
+    assert result == ROUND_WIN
+
+
+def test_dealer_draws_through_soft_16_to_hard_total():
+    game = rigged_game([10, 7, ACE, 5, 10, 3])
+    result, drawn = game.player_stand()
+    assert len(drawn) == 2  # soft 16 -> hard 16 -> hard 19
+    assert (game.dealer.get_value(), game.dealer.is_soft()) == (19, False)
+    assert result == ROUND_LOSS
+
+
+def test_player_busts_after_soft_total():
+    game = rigged_game([ACE, 5, 10, 9, 10, 10])
+    assert game.player_hit()[0] == ROUND_ONGOING  # soft 16 -> hard 16
+    result, _card = game.player_hit()
+    assert result == ROUND_LOSS and game.player.is_bust()
+
+
+def test_seeded_outcomes_match_with_soft_policy():
+    # Hit every soft total up to 17 and every hard total below 13: soft flags drive decisions
+    policy = np.zeros(TABLE_SHAPE, dtype=bool)
+    policy[:13, 0] = True
+    policy[:18, 1] = True
+    vectorized = simulate(policy, 100_000, seed=11)
+    reference = simulate_scalar(policy, 100_000, seed=11)
+    assert conforms(vectorized, reference)
@@ -0,0 +1,26 @@
+"""
+protocolClient.decode_payload_server: frames without a card are accepted for any result.
+"""
+
+import pytest
+
+from Formats.cards import NO_CARD, card_code
+from Formats.codec import ProtocolError
+from Formats.packet_formats import ROUND_ONGOING, ROUND_WIN, ROUND_LOSS, ROUND_TIE
+from protocolClient import decode_payload_server
+from protocolServer import encode_payload_server
+
+
+@pytest.mark.parametrize("result", [ROUND_ONGOING, ROUND_WIN, ROUND_LOSS, ROUND_TIE])
+def test_no_card_for_any_result(result):
+    assert decode_payload_server(encode_payload_server(result)) == (result, NO_CARD)
+
+
+def test_card():
+    assert decode_payload_server(encode_payload_server(ROUND_ONGOING, 13, 3)) == (ROUND_ONGOING, card_code(13, 3))
+
+
+@pytest.mark.parametrize("rank, suit", [(0, 1), (14, 0), (1, 4), (0xFFFF, 0)])
+def test_rejects_out_of_range_card(rank, suit):
+    with pytest.raises(ProtocolError):
+        decode_payload_server(encode_payload_server(ROUND_ONGOING, rank, suit))
@@ -0,0 +1,151 @@
+"""
+GameSession: decisions that answer the dealer's reveal never reach the next round,
+and every session leaves a replay record.
+"""
+
+import time
+
+import pytest
+
+from Formats.codec import FrameBuffer, PAYLOAD_SERVER_LEN, encode_mux
+from Formats.packet_formats import HIT, STAND, ROUND_ONGOING
+from protocolClient import decode_payload_server, encode_payload_decision, encode_request
+from mux import MuxConnection
+from session import GameSession
+import eventlog
+import replay
+import server
+
+
+def feed(session, *decisions):
+    frames = FrameBuffer()
+    frames.feed(b"".join(encode_payload_decision(d) for d in decisions))
+    return session.receive(frames)
+
+
+def read_frame(conn) -> tuple[int, int]:
+    buf = bytearray(PAYLOAD_SERVER_LEN)
+    got = 0
+    while got < PAYLOAD_SERVER_LEN:
+        n = conn.recv_into(memoryview(buf)[got:])
+        assert n, "server closed the connection"
+        got += n
+    return decode_payload_server(bytes(buf))
+
+
+def stood_session(min_reveal: int = 1) -> tuple[GameSession, int]:
+    """
+    A session whose first round just ended on Stand with at least min_reveal ONGOING reveal frames.
+    Returns: (session, reveal frames)
+    """
+    for seed in range(1000):
+        session = GameSession("t", seed=seed)
+        session.start_round()
+        reveal = len(session.decide(STAND)) // PAYLOAD_SERVER_LEN - 1
+        if reveal >= min_reveal:
+            return session, reveal
+    raise AssertionError("no seed gives a long enough reveal")
+
+
+def test_answers_before_next_deal_are_dropped():
+    session, reveal = stood_session()
+    assert session.unanswered == reveal and session.settling
+    assert feed(session, *[HIT] * reveal) == b""
+    assert not session.settling and session.echoes
+
+    session.start_round()
+    assert session.decide(STAND)
+    assert session.decisions == b"SS"
+
+
+def test_answers_after_next_deal_are_dropped():
+    session, reveal = stood_session(min_reveal=2)
+    feed(session, HIT)  # the first answer arrives within the grace
+    session.start_round()
+    # The rest arrive once round 2 is dealt: not applied to it
+    assert feed(session, *[HIT] * (reveal - 1)) == b""
+    assert len(session.game.player.cards) == 2 and not session.round_over
+    assert feed(session, STAND)
+    assert session.decisions == b"SS"
+    assert session.stray_decisions == reveal
+
+
+def test_client_that_never_answers_keeps_its_decisions():
+    session, _reveal = stood_session()
+    session.no_replies()
+    assert not session.settling
+    session.start_round()
+    assert feed(session, HIT)
+    assert len(session.game.player.cards) == 3
+    if not session.round_over:
+        session.decide(STAND)
+    assert session.unanswered == 0  # nothing is tracked once the client is known not to answer
+
+
+def test_mux_envelope_rest_is_not_applied_to_next_round():
+    mux = MuxConnection()
+    frames = FrameBuffer()
+    frames.feed(encode_mux(1, encode_request(3, "m")))
+    mux.receive(frames)
+    session = mux.sessions[1]
+    frames.feed(encode_mux(1, b"".join(encode_payload_decision(d) for d in (STAND, HIT, HIT))))
+    mux.receive(frames)
+    assert session.decisions == b"S"
+    assert session.stray_decisions == 2
+    assert session.phase == GameSession.PLAYER_TURN and len(session.game.player.cards) == 2
+
+
+@pytest.fixture
+def quiet_log():
+    eventlog.configure(console=False)
+
+
+def test_reveal_answers_over_memory_transport(quiet_log):
+    conn = server.connect_memory()
+    conn.sendall(encode_request(2, "echo"))
+    for _ in range(3):
+        read_frame(conn)
+    time.sleep(0.02)  # a slow first decision: the server waits up to the full REPLY_GRACE for answers
+    conn.sendall(encode_payload_decision(STAND))
+    while True:
+        result, _card = read_frame(conn)
+        if result != ROUND_ONGOING:
+            break
+        conn.sendall(encode_payload_decision(HIT))  # answers every dealer frame
+
+    for _ in range(3):
+        assert read_frame(conn)[0] == ROUND_ONGOING
+    conn.settimeout(0.3)
+    with pytest.raises(TimeoutError):
+        read_frame(conn)  # round 2 waits for this client's own decision
+    conn.settimeout(None)
+    conn.sendall(encode_payload_decision(STAND))
+    while read_frame(conn)[0] == ROUND_ONGOING:
+        pass
+    conn.close()
+
+
+def test_disconnect_mid_session_leaves_a_record(tmp_path):
+    path = tmp_path / "events.jsonl"
+    eventlog.configure(path=str(path), console=False, sample={eventlog.INFO: 1000})
+    try:
+        conn = server.connect_memory()
+        conn.sendall(encode_request(5, "quitter"))
+        for _ in range(3):
+            read_frame(conn)
+        conn.sendall(encode_payload_decision(HIT))
+        read_frame(conn)
+        conn.close()
+
+        deadline = time.monotonic() + 5
+        records = []
+        while not records and time.monotonic() < deadline:
+            time.sleep(0.01)
+            records = replay.read_records(str(path), team="quitter")
+    finally:
+        eventlog.configure(console=False)
+
+    # Kept even though INFO is sampled 1 in 1000
+    assert len(records) == 1 and records[0]["decisions"] == "H"
+    assert records[0]["rounds_played"] < 5
+    assert replay.check(records[0], show=False) == (True, 1)
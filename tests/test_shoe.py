@@ -0,0 +1,45 @@
+"""
+game.Shoe: the cut card always leaves room for a worst-case round.
+"""
+
+import random
+
+import pytest
+
+from Formats.cards import CARD_HARD
+from game import Hand, Shoe, max_hand_cards
+
+
+@pytest.mark.parametrize("decks, expected", [(1, 12), (2, 15), (3, 17), (5, 21), (6, 22), (8, 22)])
+def test_max_hand_cards(decks, expected):
+    assert max_hand_cards(decks) == expected
+
+
+@pytest.mark.parametrize("decks", [1, 2, 3, 6, 8])
+def test_longest_hand_fits_the_bound(decks):
+    # Lowest cards first is the longest a hand can get before it busts
+    shoe = Shoe(decks, rng=random.Random(7))
+    hand = Hand()
+    for card in sorted(shoe.cards, key=CARD_HARD.__getitem__):
+        hand.add_card(card)
+        if hand.get_value() > 21:
+            break
+    assert len(hand.cards) == shoe.hand_cards == max_hand_cards(decks)
+
+
+@pytest.mark.parametrize("decks, penetration", [(1, 1.0), (1, 0.95), (2, 0.9), (6, 1.0), (8, 1.0)])
+def test_cut_leaves_a_worst_case_round(decks, penetration):
+    shoe = Shoe(decks, penetration=penetration)
+    # The last round may start one card before the cut; player and dealer then draw their worst
+    assert len(shoe.cards) - (shoe.cut - 1) >= 2 * max_hand_cards(decks)
+
+
+@pytest.mark.parametrize("penetration", [0.0, 0.01, 1.5])
+def test_rejects_penetration_without_room_for_a_round(penetration):
+    with pytest.raises(ValueError):
+        Shoe(1, penetration=penetration)
+
+
+def test_default_cut_unchanged():
+    shoe = Shoe(6)
+    assert shoe.cut == int(6 * 52 * 0.75)
@@ -0,0 +1,29 @@
+"""
+vector_sim.py (NumPy batches) against BlackjackGame, fresh deck per round.
+"""
+
+import pytest
+
+from vector_sim import conforms, simulate, simulate_scalar, threshold_policy
+
+ROUNDS = 200_000
+SEED = 2024
+
+
+@pytest.mark.parametrize("hit_below", [12, 17])
+def test_simulate_conforms_to_blackjack_game(hit_below):
+    policy = threshold_policy(hit_below)
+    vectorized = simulate(policy, ROUNDS, seed=SEED)
+    reference = simulate_scalar(policy, ROUNDS, seed=SEED)
+    assert sum(vectorized) == sum(reference) == ROUNDS
+    assert conforms(vectorized, reference)
+
+
+def test_simulate_is_deterministic_per_seed():
+    policy = threshold_policy(17)
+    assert simulate(policy, 10_000, seed=SEED) == simulate(policy, 10_000, seed=SEED)
+    assert simulate_scalar(policy, 10_000, seed=SEED) == simulate_scalar(policy, 10_000, seed=SEED)
+
+
+def test_conforms_rejects_different_rates():
+    assert not conforms((45_000, 10_000, 45_000), (40_000, 10_000, 50_000))